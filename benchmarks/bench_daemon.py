@@ -0,0 +1,105 @@
+"""
+Latency benchmark for `srl daemon`.
+
+Starts a daemon against a throwaway HOME seeded with synthetic problems and
+reports p50/p95 latency for commands forwarded over the Unix socket, next to
+the same commands run in a fresh interpreter without the daemon:
+
+    python benchmarks/bench_daemon.py --problems 500 --runs 50
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+
+def seed(home: Path, problems: int):
+    data_dir = home / ".srl"
+    data_dir.mkdir(parents=True)
+    progress = {}
+    for i in range(problems):
+        day = date.today() - timedelta(days=i % 30)
+        progress[f"Problem {i}"] = {
+            "history": [{"rating": 1 + i % 4, "date": day.isoformat()}]
+        }
+    (data_dir / "problems_in_progress.json").write_text(json.dumps(progress))
+
+
+def percentiles(samples: list[float]) -> str:
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return f"p50 {statistics.median(samples):7.2f} ms   p95 {p95:7.2f} ms"
+
+
+def time_forwarded(argv: list[str], runs: int) -> list[float]:
+    from srl import client
+
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for _frame in client.request({"op": "run", "argv": argv, "cwd": os.getcwd()}):
+            pass
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def time_process(argv: list[str], runs: int, env: dict) -> list[float]:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "srl", *argv],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--problems", type=int, default=500)
+    parser.add_argument("-r", "--runs", type=int, default=50)
+    opts = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        home = Path(tmp)
+        seed(home, opts.problems)
+        os.environ["HOME"] = str(home)
+        env = dict(os.environ, SRL_NO_DAEMON="")
+        cold_env = dict(os.environ, SRL_NO_DAEMON="1")
+
+        daemon = subprocess.Popen(
+            [sys.executable, "-m", "srl", "daemon", "run"],
+            env=env,
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            from srl import daemon as srl_daemon
+
+            for _ in range(100):
+                if srl_daemon.is_running():
+                    break
+                time.sleep(0.05)
+
+            for argv in (["list"], ["take", "1"], ["calendar"]):
+                name = " ".join(argv)
+                print(f"srl {name}")
+                print(f"  socket round trip:  {percentiles(time_forwarded(argv, opts.runs))}")
+                runs = max(5, opts.runs // 5)
+                print(f"  client process:     {percentiles(time_process(argv, runs, env))}")
+                print(f"  in-process (cold):  {percentiles(time_process(argv, runs, cold_env))}")
+        finally:
+            daemon.terminate()
+            daemon.wait()
+
+
+if __name__ == "__main__":
+    main()
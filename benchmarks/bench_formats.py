@@ -0,0 +1,107 @@
+"""
+Size and speed of each `srl export --file-format` on synthetic data.
+
+Seeds a throwaway HOME with synthetic problems, exports them in every
+format whose package is installed, and reports file size, encode time
+(`srl export`) and decode time (reading every problem back through the
+import's format-sniffing reader):
+
+    python benchmarks/bench_formats.py --problems 50000 --runs 3
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+
+def seed(home: Path, problems: int):
+    data_dir = home / ".srl"
+    data_dir.mkdir(parents=True)
+    progress = {}
+    for i in range(problems):
+        history = []
+        for j in range(1 + i % 6):
+            day = date(2024, 1, 1) + timedelta(days=i % 200 + j * 3)
+            record = {"rating": 1 + (i + j) % 5, "date": day.isoformat()}
+            if j % 2:
+                record["note"] = f"two pointers, watch the off-by-one at index {j}"
+            history.append(record)
+        progress[f"Problem {i}"] = {"history": history, "leetcode_id": i}
+    (data_dir / "problems_in_progress.json").write_text(json.dumps(progress))
+
+
+def decode(path: Path) -> int:
+    from srl import formats
+
+    count = 0
+    with formats.open_stream(path) as stream:
+        for key in stream.members():
+            if key != "data":
+                stream.skip()
+                continue
+            for _section in stream.members():
+                for _name in stream.members():
+                    stream.value()
+                    count += 1
+    return count
+
+
+def timed(fn, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--problems", type=int, default=50000)
+    parser.add_argument("-r", "--runs", type=int, default=3)
+    opts = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        home = Path(tmp)
+        seed(home, opts.problems)
+        # DATA_DIR is read from HOME when srl.storage is first imported
+        os.environ["HOME"] = str(home)
+        from srl import formats
+        from srl.commands import export
+
+        print(f"{opts.problems} problems, median of {opts.runs} runs")
+        print(f"{'format':<16}{'size':>14}{'encode':>12}{'decode':>12}")
+        variants = [("json", False), ("json", True)] + [
+            (fmt, True) for fmt in formats.FORMATS if fmt != "json"
+        ]
+        for fmt, compact in variants:
+            label = f"{fmt} (compact)" if fmt == "json" and compact else fmt
+            output = home / f"export.{fmt}"
+            args = SimpleNamespace(
+                output=str(output),
+                include_config=False,
+                include_audit=False,
+                mastered_only=False,
+                progress_only=False,
+                compact=compact,
+                file_format=fmt,
+            )
+            result = export.run(args)
+            if result.error is not None:
+                print(f"{label:<16}  skipped: {result.error}")
+                continue
+            encode_ms = timed(lambda: export.run(args), opts.runs)
+            decode_ms = timed(lambda: decode(output), opts.runs)
+            size = output.stat().st_size
+            print(
+                f"{label:<16}{size:>12,} B{encode_ms:>9.0f} ms{decode_ms:>9.0f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Time of `srl export --sqlite` on synthetic data.
+
+Seeds a throwaway HOME with synthetic problems holding --attempts attempts
+in total (a million by default), builds the SQLite database from them and
+reports the build time and the rows written:
+
+    python benchmarks/bench_sqlite.py --attempts 1000000 --runs 3
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+ATTEMPTS_PER_PROBLEM = 5
+
+
+def seed(home: Path, attempts: int):
+    data_dir = home / ".srl"
+    data_dir.mkdir(parents=True)
+    progress = {}
+    for i in range(attempts // ATTEMPTS_PER_PROBLEM):
+        history = []
+        for j in range(ATTEMPTS_PER_PROBLEM):
+            day = date(2024, 1, 1) + timedelta(days=i % 200 + j * 3)
+            record = {"rating": 1 + (i + j) % 5, "date": day.isoformat()}
+            if j % 2:
+                record["note"] = f"two pointers, watch the off-by-one at index {j}"
+            history.append(record)
+        progress[f"Problem {i}"] = {"history": history, "leetcode_id": i}
+    (data_dir / "problems_in_progress.json").write_text(json.dumps(progress))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--attempts", type=int, default=1000000)
+    parser.add_argument("-r", "--runs", type=int, default=3)
+    opts = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        home = Path(tmp)
+        seed(home, opts.attempts)
+        # DATA_DIR is read from HOME when srl.storage is first imported
+        os.environ["HOME"] = str(home)
+        from srl import sqlite_export
+
+        output = home / "export.db"
+        samples = []
+        for _ in range(opts.runs):
+            start = time.perf_counter()
+            counts = sqlite_export.write_database(output)
+            samples.append(time.perf_counter() - start)
+
+        print(f"{counts['problems']:,} problems, {counts['attempts']:,} attempts")
+        print(
+            f"median {statistics.median(samples):.2f} s of {opts.runs} runs, "
+            f"{output.stat().st_size:,} B"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Startup benchmark for the srl CLI.
+
+Runs `python -X importtime -m srl <args>` against a throwaway HOME and
+reports the time spent importing modules once the srl package starts loading
+(including imports made while dispatching the command), together with the
+wall clock time of the whole process. Exits non-zero when the median import
+time is above the threshold, so it can be used as a regression check in CI:
+
+    python benchmarks/bench_startup.py --threshold-ms 50 take 1
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def import_time_us(stderr: str) -> int:
+    """Sum of top-level import times from the `srl` package onwards."""
+    total = 0
+    started = False
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        top_level = not name[1:].startswith(" ")
+        started = started or (top_level and name.strip() == "srl")
+        if started and top_level:
+            total += int(cumulative)
+    return total
+
+
+def run_once(argv: list[str], home: str) -> tuple[float, float]:
+    env = dict(os.environ, HOME=home)
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "srl", *argv],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    return import_time_us(proc.stderr) / 1000, wall_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-r", "--runs", type=int, default=15)
+    parser.add_argument(
+        "--threshold-ms",
+        type=float,
+        default=50.0,
+        help="Fail if the median srl import time exceeds this",
+    )
+    parser.add_argument("argv", nargs="*", default=["take", "1"])
+    opts = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        run_once(opts.argv, home)  # warm the bytecode cache
+        results = [run_once(opts.argv, home) for _ in range(opts.runs)]
+
+    imports = statistics.median(r[0] for r in results)
+    wall = statistics.median(r[1] for r in results)
+    print(f"srl {' '.join(opts.argv)}")
+    print(f"  srl imports  (median): {imports:7.1f} ms")
+    print(f"  process wall (median): {wall:7.1f} ms")
+    print(f"  threshold:             {opts.threshold_ms:7.1f} ms")
+
+    if imports > opts.threshold_ms:
+        print("FAIL: startup import time regressed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,10 @@ setup(
     name="srl",
     author="Hayes Barber",
     packages=find_packages(),
+    extras_require={
+        # Optional export and import formats: json.zst, msgpack, parquet, npy
+        "formats": ["zstandard", "msgpack", "pyarrow", "numpy"],
+    },
     entry_points={
         "console_scripts": [
             "srl = srl.main:main",
@@ -0,0 +1,288 @@
+"""
+Structured REST endpoints served next to POST /run.
+
+These call the command modules' data functions directly, on the server's
+worker pool, and never touch argparse or Rich. Responses go through
+pydantic response models, which FastAPI serializes straight to JSON bytes.
+GET endpoints answer conditional requests and reuse cached bodies until the
+data changes (see srl.httpcache).
+"""
+import os
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+from pydantic import BaseModel, Field, model_validator
+from starlette.background import BackgroundTask
+from srl import sqlite_export
+from srl.commands import add, calendar, export, list_, mastered, nextup, show
+from srl.httpcache import conditional
+from srl.storage import ensure_data_dir
+from srl.utils import today
+from srl.workers import WorkerPool
+
+router = APIRouter(dependencies=[Depends(ensure_data_dir)])
+
+
+def get_pool(request: Request) -> WorkerPool:
+    return request.app.state.pool
+
+
+class DueProblem(BaseModel):
+    name: str
+    leetcode_id: Optional[int] = None
+    days_overdue: Optional[int] = None
+    mastery_candidate: bool
+
+
+class DueResponse(BaseModel):
+    date: str
+    problems: List[DueProblem]
+
+
+class AttemptRequest(BaseModel):
+    name: Optional[str] = None
+    number: Optional[int] = None
+    leetcode_id: Optional[int] = None
+    rating: int = Field(ge=1, le=5)
+    id: Optional[int] = None
+    note: Optional[str] = None
+    mistake: Optional[str] = None
+    time: Optional[int] = None
+
+    @model_validator(mode="after")
+    def one_target(self):
+        given = [self.name, self.number, self.leetcode_id]
+        if sum(value is not None for value in given) != 1:
+            raise ValueError("Provide exactly one of name, number or leetcode_id")
+        return self
+
+
+class AttemptResponse(BaseModel):
+    status: str
+    name: str
+    rating: int
+    leetcode_id: Optional[int] = None
+
+
+class Attempt(BaseModel):
+    date: str
+    rating: int
+    note: Optional[str] = None
+    mistake: Optional[str] = None
+    time_spent: Optional[int] = None
+
+
+class ProblemResponse(BaseModel):
+    name: str
+    status: str
+    leetcode_id: Optional[int] = None
+    next_review: Optional[str] = None
+    days_until: Optional[int] = None
+    history: List[Attempt]
+
+
+class MasteredProblem(BaseModel):
+    name: str
+    leetcode_id: Optional[int] = None
+    attempts: int
+    mastered_date: str
+
+
+class MasteredResponse(BaseModel):
+    count: int
+    problems: List[MasteredProblem]
+
+
+class CalendarSummary(BaseModel):
+    total: int
+    active_days: int
+    most_active_day: Optional[str] = None
+    most_active_count: int
+    best_streak: int
+    current_streak: int
+
+
+class CalendarResponse(BaseModel):
+    today: str
+    months: int
+    days: dict[str, int]
+    summary: CalendarSummary
+
+
+class NextUpProblem(BaseModel):
+    name: str
+    leetcode_id: Optional[int] = None
+
+
+class NextUpResponse(BaseModel):
+    problems: List[NextUpProblem]
+
+
+class NextUpRequest(BaseModel):
+    name: str
+    allow_mastered: bool = False
+
+
+class NextUpOutcome(BaseModel):
+    name: str
+    status: str
+
+
+# add.run() statuses that mean nothing was recorded
+ATTEMPT_ERRORS = {
+    "invalid_number": (400, "Invalid problem number"),
+    "unknown_id": (404, "No problem found with that LeetCode ID"),
+    "already_mastered": (409, "Problem is already mastered"),
+}
+
+
+@router.get("/due", response_model=DueResponse)
+@conditional
+async def get_due(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1), pool: WorkerPool = Depends(get_pool)
+):
+    """Problems due today, most overdue first (falls back to Next Up)."""
+    problems = await pool.run(list_.due_problems, limit)
+    return DueResponse(
+        date=today().isoformat(),
+        problems=[DueProblem.model_validate(p, from_attributes=True) for p in problems],
+    )
+
+
+@router.post("/attempts", response_model=AttemptResponse, status_code=201)
+async def post_attempt(req: AttemptRequest, pool: WorkerPool = Depends(get_pool)):
+    result = await pool.run(add.run, SimpleNamespace(**req.model_dump()), write=True)
+    if result.status in ATTEMPT_ERRORS:
+        status_code, detail = ATTEMPT_ERRORS[result.status]
+        raise HTTPException(status_code=status_code, detail=detail)
+    return AttemptResponse.model_validate(result, from_attributes=True)
+
+
+@router.get("/problems/{name}", response_model=ProblemResponse)
+@conditional
+async def get_problem(
+    request: Request, name: str, pool: WorkerPool = Depends(get_pool)
+):
+    result = await pool.run(show.run, SimpleNamespace(name=name))
+    if result.error:
+        raise HTTPException(status_code=404, detail=f"Problem '{name}' not found")
+    return ProblemResponse.model_validate(result, from_attributes=True)
+
+
+@router.get("/mastered", response_model=MasteredResponse)
+@conditional
+async def get_mastered(request: Request, pool: WorkerPool = Depends(get_pool)):
+    problems = await pool.run(mastered.mastered_problems)
+    return MasteredResponse(
+        count=len(problems),
+        problems=[
+            MasteredProblem.model_validate(p, from_attributes=True) for p in problems
+        ],
+    )
+
+
+@router.get("/calendar", response_model=CalendarResponse)
+@conditional
+async def get_calendar(
+    request: Request,
+    months: int = Query(12, ge=1), pool: WorkerPool = Depends(get_pool)
+):
+    args = SimpleNamespace(months=months, summary=True)
+    result = await pool.run(calendar.run, args)
+    return CalendarResponse.model_validate(result, from_attributes=True)
+
+
+@router.get("/nextup", response_model=NextUpResponse)
+@conditional
+async def get_next_up(request: Request, pool: WorkerPool = Depends(get_pool)):
+    result = await pool.run(nextup.run, SimpleNamespace(action="list"))
+    return NextUpResponse.model_validate(result, from_attributes=True)
+
+
+@router.post("/nextup", response_model=NextUpOutcome, status_code=201)
+async def post_next_up(req: NextUpRequest, pool: WorkerPool = Depends(get_pool)):
+    outcome = await pool.run(
+        nextup.add_to_next_up, req.name, req.allow_mastered, write=True
+    )
+    if not outcome.added:
+        raise HTTPException(status_code=409, detail=f"'{req.name}' is {outcome.status}")
+    return NextUpOutcome.model_validate(outcome, from_attributes=True)
+
+
+@router.delete("/nextup/{name}", status_code=204)
+async def delete_next_up(name: str, pool: WorkerPool = Depends(get_pool)):
+    outcome = await pool.run(nextup.remove_from_next_up, name, write=True)
+    if outcome.status == "not_found":
+        raise HTTPException(status_code=404, detail=f"'{name}' not in Next Up")
+    return Response(status_code=204)
+
+
+@router.delete("/nextup", status_code=204)
+async def delete_all_next_up(pool: WorkerPool = Depends(get_pool)):
+    await pool.run(nextup.clear_next_up, write=True)
+    return Response(status_code=204)
+
+
+@router.get("/export")
+async def get_export(
+    type: str = Query("full", pattern="^(full|mastered_only|progress_only)$"),
+    include_config: bool = False,
+    include_audit: bool = False,
+    compact: bool = False,
+    pool: WorkerPool = Depends(get_pool),
+):
+    """
+    Download an export file (the same document `srl export` writes). Like
+    /export/sqlite it is written to a temporary file on the worker pool,
+    holding the write lock as `srl export` does, and deleted once sent.
+    """
+    fd, name = tempfile.mkstemp(prefix="srl-export-", suffix=".json")
+    os.close(fd)
+    path = Path(name)
+    args = SimpleNamespace(
+        output=name,
+        mastered_only=type == "mastered_only",
+        progress_only=type == "progress_only",
+        include_config=include_config,
+        include_audit=include_audit,
+        compact=compact,
+    )
+    try:
+        result = await pool.run(export.run, args, write=True)
+        if result.error:
+            raise HTTPException(status_code=500, detail=result.error)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return FileResponse(
+        path,
+        media_type="application/json",
+        filename="srl-export.json",
+        background=BackgroundTask(path.unlink, missing_ok=True),
+    )
+
+
+@router.get("/export/sqlite")
+async def get_export_sqlite(pool: WorkerPool = Depends(get_pool)):
+    """
+    Download the data as a SQLite database (the file `srl export --sqlite`
+    writes). It is built in a temporary file, deleted once it has been sent.
+    """
+    fd, name = tempfile.mkstemp(prefix="srl-export-", suffix=".db")
+    os.close(fd)
+    path = Path(name)
+    try:
+        await pool.run(sqlite_export.write_database, path)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return FileResponse(
+        path,
+        media_type="application/vnd.sqlite3",
+        filename="srl-export.db",
+        background=BackgroundTask(path.unlink, missing_ok=True),
+    )
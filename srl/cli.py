@@ -1,42 +1,133 @@
 import argparse
-from srl.commands import (
-    add,
-    list_,
-    mastered,
-    inprogress,
-    calendar,
-    nextup,
-    audit,
-    remove,
-    config,
-    take,
-    server,
-    random,
-    generate_preview,
-    show,
-    export,
-    import_,
-)
+from importlib import import_module
+from srl.output import FORMATS, write_records, write_result
+
+# Subcommand name -> (module, help). Modules are only imported once their
+# subcommand is dispatched, so `srl take 1` doesn't pay for Rich tables,
+# prompts or any of the other commands. This is the only copy of each
+# command's help: `srl --help` has to list it without importing the module.
+COMMANDS = {
+    "add": ("srl.commands.add", "Add or update a problem attempt"),
+    "list": ("srl.commands.list_", "List due problems"),
+    "mastered": ("srl.commands.mastered", "List mastered problems"),
+    "inprogress": ("srl.commands.inprogress", "List problems in progress"),
+    "calendar": ("srl.commands.calendar", "Graph of SRL activity"),
+    "nextup": ("srl.commands.nextup", "Next up problem queue"),
+    "audit": ("srl.commands.audit", "Random audit functionality"),
+    "remove": ("srl.commands.remove", "Remove a problem from in-progress"),
+    "config": ("srl.commands.config", "Update configuration values"),
+    "take": ("srl.commands.take", "Output a problem by index"),
+    "server": ("srl.commands.server", "Run HTTP server to expose CLI"),
+    "random": (
+        "srl.commands.random",
+        "Pick a random due problem (use --all to pick from progress, mastered and next up)",
+    ),
+    "show": ("srl.commands.show", "Show problem history and notes"),
+    "export": ("srl.commands.export", "Export your learning progress data"),
+    "import": ("srl.commands.import_", "Import learning progress data"),
+    "generate-preview": (
+        "srl.commands.generate_preview",
+        "Generate SVG preview for the README",
+    ),
+    "daemon": ("srl.commands.daemon", "Keep srl warm in a background process"),
+    "due-count": ("srl.commands.due_count", "Print the number of problems due today"),
+}
+
+# Commands with nothing but Rich output (no run() result or records()), so
+# they don't take --format
+RICH_ONLY_COMMANDS = {"server", "import", "generate-preview", "daemon", "due-count"}
+
+# Commands that never write anything, so the server can run them concurrently
+# and coalesce identical ones. Everything else is serialized per data
+# directory: that includes list/mastered/inprogress, which may start a random
+# audit, and export, which writes its output file and the change journal.
+READ_ONLY_COMMANDS = {"show", "random", "calendar", "due-count"}
+
+
+class _DeclaredParser:
+    """Hands a command module's add_subparser() the stub parser to fill in."""
+
+    def __init__(self, parser: argparse.ArgumentParser):
+        self.parser = parser
+
+    def add_parser(self, name, **kwargs):
+        if kwargs:
+            # The stub was created from COMMANDS before the module was loaded
+            raise TypeError(
+                f"{name}: declare {', '.join(kwargs)} in srl.cli.COMMANDS, "
+                "not in add_subparser()"
+            )
+        return self.parser
+
+
+class LazySubParsersAction(argparse._SubParsersAction):
+    """Subparsers action that declares a command's arguments on dispatch."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._loaded = set()
+
+    def load(self, name: str):
+        if name in self._loaded:
+            return
+        module = import_module(COMMANDS[name][0])
+        module.add_subparser(_DeclaredParser(self._name_parser_map[name]))
+        self._loaded.add(name)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        self.load(values[0])
+        super().__call__(parser, namespace, values, option_string)
+
+
+def preload(parser: argparse.ArgumentParser, names=None):
+    """Import and declare the given subcommands (all by default) up front."""
+    for action in parser._actions:
+        if isinstance(action, LazySubParsersAction):
+            for name in names or COMMANDS:
+                action.load(name)
+
+
+def _format_argument(parser: argparse.ArgumentParser, default):
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default=default,
+        help="Output format; plain, json and ndjson stream records without Rich",
+    )
 
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(prog="srl")
-    subparsers = parser.add_subparsers(dest="command")
-
-    add.add_subparser(subparsers)
-    list_.add_subparser(subparsers)
-    mastered.add_subparser(subparsers)
-    inprogress.add_subparser(subparsers)
-    calendar.add_subparser(subparsers)
-    nextup.add_subparser(subparsers)
-    audit.add_subparser(subparsers)
-    remove.add_subparser(subparsers)
-    config.add_subparser(subparsers)
-    take.add_subparser(subparsers)
-    server.add_subparser(subparsers)
-    random.add_subparser(subparsers)
-    show.add_subparser(subparsers)
-    export.add_subparser(subparsers)
-    import_.add_subparser(subparsers)
-    generate_preview.add_subparser(subparsers)
+    _format_argument(parser, "rich")
+    subparsers = parser.add_subparsers(dest="command", action=LazySubParsersAction)
+
+    # Also accepted after the subcommand; SUPPRESS keeps it from overriding
+    # a --format given before it
+    common = argparse.ArgumentParser(add_help=False)
+    _format_argument(common, argparse.SUPPRESS)
+
+    for name, (_, help_text) in COMMANDS.items():
+        parents = [] if name in RICH_ONLY_COMMANDS else [common]
+        subparsers.add_parser(name, help=help_text, parents=parents)
     return parser
+
+
+def dispatch(parser: argparse.ArgumentParser, args, console, out=None):
+    """
+    Run the parsed command.
+
+    With a non-rich --format the command's records() generator is streamed
+    through srl.output, or its run() result is written as plain text or
+    JSON. The console is never touched, so Rich is never imported.
+    """
+    fmt = getattr(args, "format", "rich")
+    if fmt == "rich":
+        return args.handler(args, console)
+
+    records = getattr(args, "records", None)
+    if records is not None:
+        write_records(records(args), fmt, out)
+    elif hasattr(args, "run"):
+        write_result(args.run(args), args.render_plain, fmt, out)
+    else:
+        parser.error(f"{args.command} does not support --format {fmt}")
@@ -0,0 +1,97 @@
+import json
+import os
+import socket
+import sys
+from srl import storage
+
+# Commands the daemon may run on the client's behalf. Anything interactive
+# (import prompts), long running (server, daemon) or otherwise unsuitable
+# stays in-process.
+FORWARDED_COMMANDS = {
+    "add",
+    "list",
+    "mastered",
+    "inprogress",
+    "calendar",
+    "nextup",
+    "audit",
+    "remove",
+    "config",
+    "take",
+    "random",
+    "show",
+    "export",
+}
+
+
+def socket_path():
+    return storage.DATA_DIR / "daemon.sock"
+
+
+def request(payload: dict, timeout: float | None = None):
+    """
+    Send one request to the daemon and yield its response frames.
+
+    Raises OSError if the daemon isn't reachable.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(socket_path()))
+        sock.sendall(json.dumps(payload).encode() + b"\n")
+        with sock.makefile("r", encoding="utf-8") as frames:
+            for line in frames:
+                yield json.loads(line)
+    finally:
+        sock.close()
+
+
+def forward(argv: list[str]) -> int | None:
+    """
+    Run argv through the daemon, streaming its output to stdout/stderr.
+
+    Returns the exit code, or None when the command should run in-process
+    (daemon disabled, not running, or the command isn't forwarded).
+    """
+    if os.environ.get("SRL_NO_DAEMON") or not argv or argv[0] not in FORWARDED_COMMANDS:
+        return None
+    if not socket_path().exists():
+        return None
+
+    try:
+        width = os.get_terminal_size(sys.stdout.fileno()).columns
+    except (OSError, ValueError):
+        width = None
+    payload = {
+        "op": "run",
+        "argv": argv,
+        "cwd": os.getcwd(),
+        "width": width,
+        "tty": sys.stdout.isatty(),
+        "env": {
+            key: os.environ[key]
+            for key in ("TERM", "COLORTERM", "NO_COLOR")
+            if key in os.environ
+        },
+    }
+
+    started = False
+    try:
+        for frame in request(payload):
+            started = True
+            if "out" in frame:
+                sys.stdout.write(frame["out"])
+                sys.stdout.flush()
+            elif "err" in frame:
+                sys.stderr.write(frame["err"])
+            elif "exit" in frame:
+                return frame["exit"]
+    except BrokenPipeError:
+        # Output was piped into something like `head` that stopped reading
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except OSError:
+        if started:
+            raise
+        return None
+    return 1
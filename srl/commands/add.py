@@ -1,4 +1,6 @@
-from rich.console import Console
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from dataclasses import dataclass
 from srl.utils import today
 from srl.storage import (
     load_json,
@@ -8,10 +10,24 @@ from srl.storage import (
     NEXT_UP_FILE,
 )
 from srl.commands.list_ import get_due_problems
+from srl import stats
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+
+@dataclass(slots=True)
+class AddResult:
+    # "added", "mastered", "already_mastered", "unknown_id" or "invalid_number"
+    status: str
+    name: str | None = None
+    rating: int | None = None
+    leetcode_id: int | None = None
+    number: int | None = None
 
 
 def add_subparser(subparsers):
-    add = subparsers.add_parser("add", help="Add or update a problem attempt")
+    add = subparsers.add_parser("add")
     group = add.add_mutually_exclusive_group(required=True)
     group.add_argument("name", nargs="?", type=str, help="Name of the problem")
     group.add_argument(
@@ -33,11 +49,11 @@ def add_subparser(subparsers):
     add.add_argument(
         "--time", type=int, help="Time spent in minutes"
     )
-    add.set_defaults(handler=handle)
+    add.set_defaults(handler=handle, run=run, render_plain=render_plain)
     return add
 
 
-def handle(args, console: Console):
+def run(args) -> AddResult:
     rating: int = args.rating
     leetcode_id = getattr(args, "id", None)
     
@@ -55,28 +71,21 @@ def handle(args, console: Console):
             mastered = load_json(MASTERED_FILE)
             for key, value in mastered.items():
                 if value.get("leetcode_id") == args.leetcode_id:
-                    console.print(
-                        f"[bold red]Problem with LeetCode ID {args.leetcode_id} is already mastered.[/bold red]"
+                    return AddResult(
+                        "already_mastered", rating=rating, leetcode_id=args.leetcode_id
                     )
-                    return
             
-            console.print(
-                f"[bold red]No problem found with LeetCode ID {args.leetcode_id}.[/bold red]"
-            )
-            console.print(
-                "[yellow]Hint:[/yellow] Add a new problem first with: srl add \"Problem Name\" --id {args.leetcode_id} <rating>"
-            )
-            return
+            return AddResult("unknown_id", rating=rating, leetcode_id=args.leetcode_id)
     elif hasattr(args, "number") and args.number is not None:
         problems = get_due_problems()
         if args.number > len(problems) or args.number <= 0:
-            console.print(f"[bold red]Invalid problem number: {args.number}[/bold red]")
-            return
+            return AddResult("invalid_number", rating=rating, number=args.number)
         name = problems[args.number - 1]
     else:
         name: str = args.name
 
     data = load_json(PROGRESS_FILE)
+    stats_before = stats.source_signature()
 
     # Check for existing entry case-insensitively
     existing_name = None
@@ -120,19 +129,61 @@ def handle(args, console: Console):
         save_json(MASTERED_FILE, mastered)
         if target_name in data:
             del data[target_name]
-        console.print(
-            f"[bold green]{target_name}[/bold green] moved to [cyan]mastered[/cyan]!"
-        )
+        status = "mastered"
     else:
         data[target_name] = entry
-        console.print(
-            f"Added rating [yellow]{rating}[/yellow] for '[cyan]{target_name}[/cyan]'"
-        )
+        status = "added"
 
     save_json(PROGRESS_FILE, data)
+    stats.record_activity(history_entry["date"], stats_before)
 
     # Remove from next up if it exists there
     next_up = load_json(NEXT_UP_FILE)
     if target_name in next_up:
         del next_up[target_name]
         save_json(NEXT_UP_FILE, next_up)
+
+    return AddResult(status, target_name, rating, entry.get("leetcode_id"))
+
+
+def handle(args, console: Console):
+    render(run(args), console)
+
+
+def render(result: AddResult, console: Console):
+    if result.status == "already_mastered":
+        console.print(
+            f"[bold red]Problem with LeetCode ID {result.leetcode_id} is already mastered.[/bold red]"
+        )
+    elif result.status == "unknown_id":
+        console.print(
+            f"[bold red]No problem found with LeetCode ID {result.leetcode_id}.[/bold red]"
+        )
+        console.print(
+            f"[yellow]Hint:[/yellow] Add a new problem first with: srl add \"Problem Name\" --id {result.leetcode_id} <rating>"
+        )
+    elif result.status == "invalid_number":
+        console.print(f"[bold red]Invalid problem number: {result.number}[/bold red]")
+    elif result.status == "mastered":
+        console.print(
+            f"[bold green]{result.name}[/bold green] moved to [cyan]mastered[/cyan]!"
+        )
+    else:
+        console.print(
+            f"Added rating [yellow]{result.rating}[/yellow] for '[cyan]{result.name}[/cyan]'"
+        )
+
+
+def render_plain(result: AddResult) -> str:
+    if result.status == "already_mastered":
+        return f"Problem with LeetCode ID {result.leetcode_id} is already mastered."
+    if result.status == "unknown_id":
+        return (
+            f"No problem found with LeetCode ID {result.leetcode_id}.\n"
+            f'Hint: Add a new problem first with: srl add "Problem Name" --id {result.leetcode_id} <rating>'
+        )
+    if result.status == "invalid_number":
+        return f"Invalid problem number: {result.number}"
+    if result.status == "mastered":
+        return f"{result.name} moved to mastered!"
+    return f"Added rating {result.rating} for '{result.name}'"
@@ -1,7 +1,9 @@
-from rich.console import Console
-from rich.panel import Panel
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from dataclasses import dataclass
 from srl.utils import today
 import random
+from srl import stats
 from srl.storage import (
     load_json,
     save_json,
@@ -10,62 +12,114 @@ from srl.storage import (
     PROGRESS_FILE,
 )
 
+if TYPE_CHECKING:
+    from rich.console import Console
+
+
+@dataclass(slots=True)
+class AuditResult:
+    # "passed", "failed", "not_mastered", "no_active", "pending", "started"
+    # or "none_available"
+    status: str
+    action: str  # "pass", "fail" or "show"
+    problem: str | None = None
+
 
 def add_subparser(subparsers):
-    parser = subparsers.add_parser("audit", help="Random audit functionality")
+    parser = subparsers.add_parser("audit")
     parser.add_argument(
         "--pass", dest="audit_pass", action="store_true", help="Pass the audit"
     )
     parser.add_argument(
         "--fail", dest="audit_fail", action="store_true", help="Fail the audit"
     )
-    parser.set_defaults(handler=handle)
+    parser.set_defaults(handler=handle, run=run, render_plain=render_plain)
     return parser
 
 
+def run(args) -> AuditResult:
+    curr = get_current_audit()
+
+    if args.audit_pass:
+        if not curr:
+            return AuditResult("no_active", "pass")
+        audit_pass(curr)
+        return AuditResult("passed", "pass", curr)
+    elif args.audit_fail:
+        if not curr:
+            return AuditResult("no_active", "fail")
+        status = "failed" if audit_fail(curr) else "not_mastered"
+        return AuditResult(status, "fail", curr)
+    elif curr:
+        return AuditResult("pending", "show", curr)
+
+    problem = random_audit()
+    if problem:
+        return AuditResult("started", "show", problem)
+    return AuditResult("none_available", "show")
+
+
 def handle(args, console: Console):
-    audit_pass_arg = args.audit_pass
-    audit_fail_arg = args.audit_fail
-
-    if audit_pass_arg:
-        curr = get_current_audit()
-        if curr:
-            audit_pass(curr)
-            console.print("[green]Audit passed![/green]")
-        else:
-            console.print("[yellow]No active audit to pass.[/yellow]")
-    elif audit_fail_arg:
-        curr = get_current_audit()
-        if curr:
-            audit_fail(curr, console)
-            console.print("[red]Audit failed.[/red] Problem moved back to in-progress.")
-        else:
-            console.print("[yellow]No active audit to fail.[/yellow]")
+    render(run(args), console)
+
+
+def render(result: AuditResult, console: Console):
+    from rich.panel import Panel
+
+    if result.status == "no_active":
+        console.print(f"[yellow]No active audit to {result.action}.[/yellow]")
+    elif result.status == "passed":
+        console.print("[green]Audit passed![/green]")
+    elif result.status in ("failed", "not_mastered"):
+        if result.status == "not_mastered":
+            console.print(f"[red]{result.problem}[/red] not found in mastered.")
+        console.print("[red]Audit failed.[/red] Problem moved back to in-progress.")
+    elif result.status == "pending":
+        console.print("")
+        console.print(Panel.fit(
+            f"📝 Active Audit: [bold cyan]{result.problem}[/bold cyan]\n\n"
+            f"💡 Complete this audit, then run:\n"
+            f"   • [bold green]srl audit --pass[/bold green] if you solved it\n"
+            f"   • [bold red]srl audit --fail[/bold red] if you couldn't",
+            title="⚠️ [bold yellow]PENDING AUDIT[/bold yellow]",
+            border_style="bold yellow",
+            title_align="center"
+        ))
+        console.print("")
+    elif result.status == "started":
+        console.print(f"You are now being audited on: [cyan]{result.problem}[/cyan]")
+        console.print(
+            "[blue]Run with --pass or --fail to complete the audit.[/blue]"
+        )
     else:
-        curr = get_current_audit()
-        if curr:
-            console.print("")
-            console.print(Panel.fit(
-                f"📝 Active Audit: [bold cyan]{curr}[/bold cyan]\n\n"
-                f"💡 Complete this audit, then run:\n"
-                f"   • [bold green]srl audit --pass[/bold green] if you solved it\n"
-                f"   • [bold red]srl audit --fail[/bold red] if you couldn't",
-                title="⚠️ [bold yellow]PENDING AUDIT[/bold yellow]",
-                border_style="bold yellow",
-                title_align="center"
-            ))
-            console.print("")
-        else:
-            problem = random_audit()
-            if problem:
-                console.print(f"You are now being audited on: [cyan]{problem}[/cyan]")
-                console.print(
-                    "[blue]Run with --pass or --fail to complete the audit.[/blue]"
-                )
-            else:
-                console.print(
-                    "[yellow]No mastered problems available for audit.[/yellow]"
-                )
+        console.print(
+            "[yellow]No mastered problems available for audit.[/yellow]"
+        )
+
+
+def render_plain(result: AuditResult) -> str:
+    if result.status == "no_active":
+        return f"No active audit to {result.action}."
+    if result.status == "passed":
+        return "Audit passed!"
+    if result.status == "failed":
+        return "Audit failed. Problem moved back to in-progress."
+    if result.status == "not_mastered":
+        return (
+            f"{result.problem} not found in mastered.\n"
+            "Audit failed. Problem moved back to in-progress."
+        )
+    if result.status == "pending":
+        return (
+            f"Active Audit: {result.problem}\n"
+            "Complete this audit, then run `srl audit --pass` or `srl audit --fail`."
+        )
+    if result.status == "started":
+        return (
+            f"You are now being audited on: {result.problem}\n"
+            "Run with --pass or --fail to complete the audit."
+        )
+    return "No mastered problems available for audit."
 
 
 def get_current_audit():
@@ -92,17 +146,20 @@ def log_audit_attempt(problem, result):
 
 
 def audit_pass(curr):
+    stats_before = stats.source_signature()
     log_audit_attempt(curr, "pass")
+    stats.record_activity(today().isoformat(), stats_before)
 
 
-def audit_fail(curr, console: Console):
+def audit_fail(curr) -> bool:
+    """Move the audited problem back to in-progress. False if not mastered."""
     mastered = load_json(MASTERED_FILE)
     progress = load_json(PROGRESS_FILE)
 
     if curr not in mastered:
-        console.print(f"[red]{curr}[/red] not found in mastered.")
-        return
+        return False
 
+    stats_before = stats.source_signature()
     entry = mastered[curr]
     # Append new failed attempt
     entry["history"].append(
@@ -121,6 +178,8 @@ def audit_fail(curr, console: Console):
     save_json(MASTERED_FILE, mastered)
 
     log_audit_attempt(curr, "fail")
+    stats.record_activity(today().isoformat(), stats_before)
+    return True
 
 
 def random_audit():
@@ -1,19 +1,33 @@
-from rich.console import Console
+from __future__ import annotations
+from typing import TYPE_CHECKING
 from collections import Counter
+from dataclasses import dataclass
 from pathlib import Path
-from datetime import date, timedelta
-from rich.table import Table
-from srl.storage import (
-    load_json,
-    MASTERED_FILE,
-    PROGRESS_FILE,
-    AUDIT_FILE,
-)
+from datetime import date
+from functools import lru_cache
+from srl.storage import AUDIT_FILE
+from srl import stats
 from srl.commands.config import Config
 
+if TYPE_CHECKING:
+    from rich.console import Console
+    from rich.text import Text
+
+
+DAYS_OF_WEEK = ("Sun", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat")
+
+
+@dataclass(slots=True)
+class CalendarResult:
+    today: str
+    months: int
+    days: dict[str, int]  # attempts per day within the displayed months
+    colors: dict[int, str]
+    summary: dict | None = None
+
 
 def add_subparser(subparsers):
-    parser = subparsers.add_parser("calendar", help="Graph of SRL activity")
+    parser = subparsers.add_parser("calendar")
     parser.add_argument(
         "-m",
         "--months",
@@ -26,18 +40,54 @@ def add_subparser(subparsers):
         action="store_true",
         help="Show activity summary statistics",
     )
-    parser.set_defaults(handler=handle)
+    parser.set_defaults(handler=handle, run=run, render_plain=render_plain)
     return parser
 
 
+def run(args) -> CalendarResult:
+    months = getattr(args, "months", 12)
+    today = date.today()
+    activity = stats.load()
+    shown = {f"{y}-{m:02d}" for y, m in month_range(today, months)}
+    days = {
+        day_str: count
+        for day_str, count in activity["days"].items()
+        if day_str[:7] in shown
+    }
+    summary = None
+    if getattr(args, "summary", False):
+        summary = activity_summary(activity, today, months)
+    return CalendarResult(
+        today.isoformat(), months, days, Config.load().calendar_colors, summary
+    )
+
+
 def handle(args, console: Console):
-    colors = Config.load().calendar_colors
-    counts = get_all_date_counts()
-    render_activity(console, counts, colors, getattr(args, "months", 12))
+    render(run(args), console)
+
+
+def render(result: CalendarResult, console: Console):
+    render_activity(console, Counter(result.days), result.colors, result.months)
     console.print("-" * 5)
-    render_legend(console, colors)
-    if getattr(args, "summary", False):
-        render_summary(console, counts, getattr(args, "months", 12))
+    render_legend(console, result.colors)
+    if result.summary is not None:
+        render_summary(console, result.summary)
+
+
+def render_plain(result: CalendarResult) -> str:
+    lines = [f"{day_str}\t{result.days[day_str]}" for day_str in sorted(result.days)]
+    summary = result.summary
+    if summary is not None:
+        lines.append(
+            f"{summary['total']} problems solved across {summary['active_days']} active days"
+        )
+        if summary["total"]:
+            lines.append(f"Current streak: {summary['current_streak']}")
+            lines.append(f"Best streak: {summary['best_streak']}")
+            lines.append(
+                f"Most active day: {summary['most_active_day']} ({summary['most_active_count']})"
+            )
+    return "\n".join(lines)
 
 
 def render_legend(console: Console, colors: dict[int, str]):
@@ -53,15 +103,7 @@ def render_activity(
     months: int,
 ):
     today = date.today()
-    months_list = []
-    year = today.year
-    month = today.month
-    for _ in range(months):
-        months_list.append((year, month))
-        month -= 1
-        if month == 0:
-            month = 12
-            year -= 1
+    months_list = month_range(today, months)
     
     # Display the date range for the calendar
     start_year, start_month = months_list[-1]  # Earliest month
@@ -91,49 +133,88 @@ def render_activity(
         console.print(f"[bold cyan]{start_str} - {end_str}[/bold cyan]")
     console.print()  # Add spacing after the header
 
-    grids: list[list[list[int | str]]] = []
-    for y, m in reversed(months_list):
-        month_start = date(y, m, 1)
-        grid = build_month(month_start, counts, today)
-        grids.append(grid)
-
-    days_of_week = ["Sun", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat"]
-    default_color = list(colors.values())[-1]
-    table = Table(
-        show_header=False,
-        show_edge=False,
-        box=None,
-        padding=(0, 0),
+    rows = activity_rows(
+        rollup_key(counts),
+        today.toordinal(),
+        tuple(reversed(months_list)),
+        tuple(colors.items()),
     )
-
-    for row_idx in range(7):
-        combined_row: list[int | str] = [days_of_week[row_idx], " "]
-        for grid in grids:
-            combined_row.extend(grid[row_idx])
-
-        rendered_row = []
-        for item in combined_row:
-            if isinstance(item, int):
-                rendered_row.append(f" [{colors.get(item, default_color)}]■[/]")
-            elif isinstance(item, str) and item.startswith("TODAY:"):
-                # Extract the count from TODAY:count
-                count = int(item.split(":")[1])
-                rendered_row.append(f" [{colors.get(count, default_color)}]⬜[/]")
-            else:
-                rendered_row.append(item)
-        table.add_row(*rendered_row)
-
-    console.print(table)
-
-
-def key(d: date) -> str:
-    return d.isoformat()
-
-
-def render_summary(console: Console, counts: Counter[str], months: int):
-    """Render activity summary statistics"""
-    # Filter counts to only include dates within the specified month range
-    today = date.today()
+    for row in rows:
+        console.print(row, soft_wrap=True)
+
+
+def rollup_key(counts: Counter[str]) -> frozenset:
+    """Hashable snapshot of the per-day counts, used to key the row cache."""
+    return frozenset(item for item in counts.items() if item[1])
+
+
+@lru_cache(maxsize=16)
+def activity_rows(
+    rollup: frozenset,
+    today_ordinal: int,
+    months: tuple[tuple[int, int], ...],
+    color_items: tuple[tuple[int, str], ...],
+) -> tuple[Text, ...]:
+    """
+    Build the seven weekday rows of the activity graph, oldest month first.
+
+    Week columns are computed from day ordinals rather than walking a grid per
+    month, and each row is a single pre-styled Text with one span per square.
+    """
+    from rich.text import Span, Text
+
+    colors = dict(color_items)
+    default_color = color_items[-1][1]
+    by_ordinal = {}
+    for day_str, count in rollup:
+        ordinal = ordinal_of(day_str)
+        if ordinal is not None:
+            by_ordinal[ordinal] = count
+
+    # (first ordinal, row of day 1, days shown, column holding today)
+    layout = []
+    for y, m in months:
+        first = date(y, m, 1).toordinal()
+        ny, nm = (y + 1, 1) if m == 12 else (y, m + 1)
+        shown = min(date(ny, nm, 1).toordinal(), today_ordinal + 1) - first
+        # Ordinal 1 is a Monday, so ordinal % 7 is the Sunday-first row
+        offset = first % 7
+        today_col = None
+        if first <= today_ordinal < first + shown:
+            today_col = (today_ordinal - first + offset) // 7
+        layout.append((first, offset, shown, today_col))
+
+    rows = []
+    for row_idx, day_name in enumerate(DAYS_OF_WEEK):
+        parts = [day_name, " "]
+        spans = []
+        pos = len(day_name) + 1
+        for first, offset, shown, today_col in layout:
+            for col in range((shown - 1 + offset) // 7 + 1):
+                wide = col == today_col
+                idx = col * 7 + row_idx - offset
+                if 0 <= idx < shown:
+                    ordinal = first + idx
+                    count = by_ordinal.get(ordinal, 0)
+                    if ordinal == today_ordinal:
+                        cell = " ⬜"  # double width, fills the widened column
+                    else:
+                        cell = " ■ " if wide else " ■"
+                    spans.append(
+                        Span(pos + 1, pos + 2, colors.get(count, default_color))
+                    )
+                else:
+                    cell = "   " if wide else "  "
+                parts.append(cell)
+                pos += len(cell)
+            parts.append(" ")
+            pos += 1
+        rows.append(Text("".join(parts), spans=spans))
+    return tuple(rows)
+
+
+def month_range(today: date, months: int) -> list[tuple[int, int]]:
+    """Return (year, month) pairs from the current month backwards."""
     months_list = []
     year = today.year
     month = today.month
@@ -143,60 +224,45 @@ def render_summary(console: Console, counts: Counter[str], months: int):
         if month == 0:
             month = 12
             year -= 1
-    
-    # Calculate the date range for filtering
-    start_year, start_month = months_list[-1]  # Earliest month
-    start_date = date(start_year, start_month, 1)
-    end_date = today
-    
-    # Filter counts to only include dates within the month range
-    filtered_counts = Counter()
-    for date_str, count in counts.items():
-        try:
-            activity_date = date.fromisoformat(date_str)
-            if start_date <= activity_date <= end_date:
-                filtered_counts[date_str] = count
-        except:
-            continue  # Skip invalid date strings
-    
-    # Calculate summary stats from filtered data
-    total_problems = sum(filtered_counts.values())
-    total_days = len(filtered_counts)
-    
+    return months_list
+
+
+def ordinal_of(day_str: str) -> int | None:
+    """Parse an exact YYYY-MM-DD key into a day ordinal, or None."""
+    if len(day_str) != 10 or day_str[4] != "-" or day_str[7] != "-":
+        return None
+    try:
+        return date(int(day_str[:4]), int(day_str[5:7]), int(day_str[8:])).toordinal()
+    except ValueError:
+        return None
+
+
+def activity_summary(activity: dict, today: date, months: int) -> dict:
+    """Period totals for the displayed months plus the current streak."""
+    summary = stats.period_summary(activity, month_range(today, months), today)
+    summary["current_streak"] = stats.current_streak(activity, today)
+    return summary
+
+
+def render_summary(console: Console, summary: dict):
+    """Render activity summary statistics"""
+    total_problems = summary["total"]
+    total_days = summary["active_days"]
+
     if total_problems == 0:
         console.print("[dim]No activity in this period[/dim]")
         return
-    
-    # Find most active day
-    max_count = max(filtered_counts.values())
-    most_active_days = [day for day, count in filtered_counts.items() if count == max_count]
-    most_active_day = most_active_days[0]  # Just take the first if multiple
-    
-    # Calculate streak (consecutive days with activity) from filtered data
-    sorted_days = sorted(filtered_counts.keys())
-    current_streak = 0
-    max_streak = 0
-    
-    for i, day_str in enumerate(sorted_days):
-        day_date = date.fromisoformat(day_str)
-        if i == 0:
-            current_streak = 1
-        else:
-            prev_day_str = sorted_days[i-1]
-            prev_date = date.fromisoformat(prev_day_str)
-            if (day_date - prev_date).days == 1:
-                current_streak += 1
-            else:
-                max_streak = max(max_streak, current_streak)
-                current_streak = 1
-    max_streak = max(max_streak, current_streak)
-    
+
+    max_count = summary["most_active_count"]
+    max_streak = summary["best_streak"]
+    current_streak = summary["current_streak"]
+
     # Format most active day
     try:
-        active_date = date.fromisoformat(most_active_day)
+        active_date = date.fromisoformat(summary["most_active_day"])
         formatted_date = active_date.strftime("%b %d")
-    except:
-        formatted_date = most_active_day
+    except (TypeError, ValueError):
+        formatted_date = summary["most_active_day"]
     
     # Build and display summary with better formatting
     avg_per_active_day = total_problems / total_days if total_days > 0 else 0
@@ -205,6 +271,9 @@ def render_summary(console: Console, counts: Counter[str], months: int):
     console.print("[bold]Activity Summary:[/bold]")
     console.print(f"  • [bold green]{total_problems}[/bold green] problems solved across [yellow]{total_days}[/yellow] active days")
     console.print(f"  • Average: [cyan]{avg_per_active_day:.1f}[/cyan] problems per active day")
+
+    if current_streak > 0:
+        console.print(f"  • Current streak: [magenta]{current_streak}[/magenta] day{'s' if current_streak != 1 else ''}")
     
     if max_streak > 1:
         console.print(f"  • Best streak: [magenta]{max_streak}[/magenta] consecutive days")
@@ -214,81 +283,12 @@ def render_summary(console: Console, counts: Counter[str], months: int):
 
 
 def get_all_date_counts() -> Counter[str]:
-    counts = Counter()
-    counts.update(get_dates(MASTERED_FILE))
-    counts.update(get_dates(PROGRESS_FILE))
-    counts.update(get_audit_dates())
-
-    return counts
+    return Counter(stats.load()["days"])
 
 
 def get_dates(path: Path) -> list[str]:
-    json_data = load_json(path)
-    res = []
-
-    for obj in json_data.values():
-        history = obj.get("history", [])
-        if not history:
-            continue
-        for record in history:
-            date = record.get("date", "")
-            if date:
-                res.append(date)
-
-    return res
+    return stats.history_dates(path)
 
 
 def get_audit_dates() -> list[str]:
-    audit_data = load_json(AUDIT_FILE)
-    history = audit_data.get("history", [])
-    res = []
-
-    for record in history:
-        result = record.get("result", "")
-        date = record.get("date", "")
-        if date and result == "pass":
-            res.append(date)
-
-    return res
-
-
-def build_month(
-    month_start: date,
-    counts: Counter[str],
-    today: date,
-) -> list[list[int | str]]:
-    grid: list[list[int | str]] = [[" " for _ in range(8)] for _ in range(7)]
-
-    current_month = month_start.month
-    day = month_start
-
-    col = 0
-    while day.month == current_month and day <= today:
-        row = (day.weekday() + 1) % 7
-        count = counts.get(key(day), 0)
-        # Mark today with special marker
-        if day == today:
-            grid[row][col] = f"TODAY:{count}"  # Special marker for today
-        else:
-            grid[row][col] = count
-        day += timedelta(days=1)
-        if row == 6:
-            col += 1
-
-    grid = remove_empty_columns(grid)
-    return grid
-
-
-def remove_empty_columns(grid) -> list[list[int | str]]:
-    non_empty_cols = []
-    num_cols = len(grid[0]) if grid else 0
-    for col_idx in range(num_cols):
-        if any(row[col_idx] != " " for row in grid):
-            non_empty_cols.append(col_idx)
-
-    new_grid = []
-    for row in grid:
-        new_row = [row[col_idx] for col_idx in non_empty_cols] + [" "]
-        new_grid.append(new_row)
-
-    return new_grid
+    return stats.audit_pass_dates(AUDIT_FILE)
@@ -1,10 +1,15 @@
-from rich.console import Console
+from __future__ import annotations
+from typing import TYPE_CHECKING
 from srl.storage import (
     load_json,
     save_json,
     CONFIG_FILE,
 )
 from dataclasses import dataclass, field
+import json
+
+if TYPE_CHECKING:
+    from rich.console import Console
 
 
 @dataclass
@@ -25,7 +30,7 @@ class Config:
 
     @classmethod
     def load(cls) -> "Config":
-        raw = load_json(CONFIG_FILE)
+        raw = dict(load_json(CONFIG_FILE))
 
         if "calendar_colors" in raw:
             raw["calendar_colors"] = {
@@ -46,8 +51,19 @@ class Config:
         self.calendar_colors = self.default_calendar_colors().copy()
 
 
+@dataclass(slots=True)
+class ConfigResult:
+    # "shown", "colors_reset", "colors_updated", "probability_set" or
+    # "invalid_option"
+    status: str
+    config: dict | None = None
+    updated_levels: list[int] = field(default_factory=list)
+    invalid_entries: list[str] = field(default_factory=list)
+    probability: float | None = None
+
+
 def add_subparser(subparsers):
-    parser = subparsers.add_parser("config", help="Update configuration values")
+    parser = subparsers.add_parser("config")
     parser.add_argument(
         "--audit-probability", type=float, help="Set audit probability (0-1)"
     )
@@ -64,46 +80,82 @@ def add_subparser(subparsers):
         action="store_true",
         help="Reset calendar colors to defaults",
     )
-    parser.set_defaults(handler=handle)
+    parser.set_defaults(handler=handle, run=run, render_plain=render_plain)
     return parser
 
 
-def handle(args, console: Console):
+def run(args) -> ConfigResult:
     cfg = Config.load()
 
     if getattr(args, "get", False):
-        console.print_json(data=cfg.__dict__)
+        return ConfigResult("shown", config=cfg.__dict__)
     elif getattr(args, "reset_colors", False):
         cfg.reset_colors()
         cfg.save()
-        console.print("Colors reset")
+        return ConfigResult("colors_reset")
     elif getattr(args, "set_color", []):
-        updated_levels = []
+        result = ConfigResult("colors_updated")
 
         for entry in args.set_color:
             try:
                 level_str, hex_value = entry.split("=")
                 level = int(level_str)
                 cfg.calendar_colors[level] = hex_value
-                updated_levels.append(level)
+                result.updated_levels.append(level)
             except ValueError:
-                console.print(f"[red]Invalid format: {entry}[/red]")
+                result.invalid_entries.append(entry)
                 continue
 
         cfg.save()
-
-        if updated_levels:
-            lvls = ", ".join(str(level) for level in updated_levels)
-            console.print(f"[green]Updated colors for level(s): {lvls}.[/green]")
-        else:
-            console.print("[yellow]No valid color updates provided.[/yellow]")
+        return result
     else:
         probability: float | None = args.audit_probability
 
         if probability is None or probability < 0:
-            console.print("[yellow]Invalid configuration option provided.[/yellow]")
-            return
+            return ConfigResult("invalid_option")
 
         cfg.set("audit_probability", probability)
         cfg.save()
-        console.print(f"Audit probability set to [cyan]{probability}[/cyan]")
+        return ConfigResult("probability_set", probability=probability)
+
+
+def handle(args, console: Console):
+    render(run(args), console)
+
+
+def render(result: ConfigResult, console: Console):
+    if result.status == "shown":
+        console.print_json(data=result.config)
+    elif result.status == "colors_reset":
+        console.print("Colors reset")
+    elif result.status == "colors_updated":
+        for entry in result.invalid_entries:
+            console.print(f"[red]Invalid format: {entry}[/red]")
+
+        if result.updated_levels:
+            lvls = ", ".join(str(level) for level in result.updated_levels)
+            console.print(f"[green]Updated colors for level(s): {lvls}.[/green]")
+        else:
+            console.print("[yellow]No valid color updates provided.[/yellow]")
+    elif result.status == "invalid_option":
+        console.print("[yellow]Invalid configuration option provided.[/yellow]")
+    else:
+        console.print(f"Audit probability set to [cyan]{result.probability}[/cyan]")
+
+
+def render_plain(result: ConfigResult) -> str:
+    if result.status == "shown":
+        return json.dumps(result.config, indent=2)
+    if result.status == "colors_reset":
+        return "Colors reset"
+    if result.status == "colors_updated":
+        lines = [f"Invalid format: {entry}" for entry in result.invalid_entries]
+        if result.updated_levels:
+            lvls = ", ".join(str(level) for level in result.updated_levels)
+            lines.append(f"Updated colors for level(s): {lvls}.")
+        else:
+            lines.append("No valid color updates provided.")
+        return "\n".join(lines)
+    if result.status == "invalid_option":
+        return "Invalid configuration option provided."
+    return f"Audit probability set to {result.probability}"
@@ -0,0 +1,52 @@
+from rich.console import Console
+import subprocess
+import sys
+import time
+
+
+def add_subparser(subparsers):
+    parser = subparsers.add_parser("daemon")
+    parser.add_argument(
+        "action",
+        choices=["start", "stop", "status", "run"],
+        help="Start in the background, stop, show status, or run in the foreground",
+    )
+    parser.set_defaults(handler=handle)
+    return parser
+
+
+def handle(args, console: Console):
+    from srl import daemon, client
+
+    if args.action == "run":
+        console.print(f"srl daemon listening on [cyan]{client.socket_path()}[/cyan]")
+        daemon.serve()
+    elif args.action == "start":
+        if daemon.is_running():
+            console.print("[yellow]srl daemon is already running.[/yellow]")
+            return
+        subprocess.Popen(
+            [sys.executable, "-m", "srl", "daemon", "run"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        for _ in range(50):
+            if daemon.is_running():
+                console.print("[green]srl daemon started.[/green]")
+                return
+            time.sleep(0.1)
+        console.print("[bold red]srl daemon did not start.[/bold red]")
+    elif args.action == "stop":
+        if not daemon.is_running():
+            console.print("[yellow]srl daemon is not running.[/yellow]")
+            return
+        for _ in client.request({"op": "stop"}, timeout=5):
+            pass
+        console.print("[green]srl daemon stopped.[/green]")
+    else:
+        if daemon.is_running():
+            console.print(f"[green]srl daemon is running[/green] on [cyan]{client.socket_path()}[/cyan]")
+        else:
+            console.print("[yellow]srl daemon is not running.[/yellow]")
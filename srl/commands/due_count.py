@@ -0,0 +1,12 @@
+from srl.due import read_count
+
+
+def add_subparser(subparsers):
+    parser = subparsers.add_parser("due-count")
+    parser.set_defaults(handler=handle)
+    return parser
+
+
+def handle(args, console):
+    # console.out writes plain text without importing Rich when run from the CLI
+    console.out(str(read_count()))
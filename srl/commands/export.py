@@ -1,26 +1,70 @@
-from rich.console import Console
-from rich.panel import Panel
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from dataclasses import dataclass, field
+from srl import container, formats, journal, sqlite_export, tables
+from srl.jsonstream import JSONWriter
 from srl.storage import (
+    _tmp_path,
+    is_read_only,
+    iter_json_members,
     load_json,
+    resolve,
     PROGRESS_FILE,
     MASTERED_FILE,
     NEXT_UP_FILE,
     CONFIG_FILE,
     AUDIT_FILE,
+    JOURNAL_FILE,
 )
-from srl.utils import today
-import json
+from typing import Iterator
+import os
+import sys
 from pathlib import Path
 from datetime import datetime
 
+if TYPE_CHECKING:
+    from rich.console import Console
+
+# --output value that writes the export to stdout
+STDOUT = "-"
+
+# Encoded pieces (keys, problems, punctuation) gathered per yielded chunk
+CHUNK_PIECES = 512
+
+
+@dataclass(slots=True)
+class ExportResult:
+    output: str
+    export_type: str | None = None
+    format: str = "json"
+    size: int = 0
+    overwritten: bool = False
+    # Problem counts per exported section, in display order
+    counts: dict[str, int] = field(default_factory=dict)
+    include_config: bool = False
+    include_audit: bool = False
+    # Pass to --since to export only what changed after this export
+    checkpoint: str | None = None
+    # Problems removed since the base checkpoint, per section (delta exports)
+    deleted: dict[str, int] = field(default_factory=dict)
+    # (delta end, checkpoint handed out) when the journal is to be compacted
+    # once the export has been written (see journal.compact())
+    compaction: tuple[str, str] | None = None
+    error: str | None = None
+
 
 def add_subparser(subparsers):
-    parser = subparsers.add_parser("export", help="Export your learning progress data")
-    parser.add_argument(
+    parser = subparsers.add_parser("export")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument(
         "--output",
         "-o",
-        required=True,
-        help="Output file path (e.g., backup.json)",
+        help="Output file path (e.g., backup.json), or - for stdout",
+    )
+    target.add_argument(
+        "--sqlite",
+        metavar="PATH",
+        help="Write problems, attempts, audits and next-up to a SQLite database",
     )
     parser.add_argument(
         "--include-config",
@@ -42,102 +86,357 @@ def add_subparser(subparsers):
         action="store_true",
         help="Export only problems in progress",
     )
-    parser.set_defaults(handler=handle)
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write compact JSON without indentation",
+    )
+    parser.add_argument(
+        "--file-format",
+        choices=(*formats.FORMATS, *tables.TABLE_FORMATS),
+        help="File format (default: from the output file's extension, else json, "
+        "or csv for --table)",
+    )
+    parser.add_argument(
+        "--table",
+        choices=tables.TABLES,
+        help="Export a flat table for analytics instead: attempts has one row "
+        "per recorded attempt (csv, parquet or npy)",
+    )
+    parser.add_argument(
+        "--since",
+        metavar="CHECKPOINT",
+        help="Export only changes after the checkpoint printed by an earlier export",
+    )
+    parser.set_defaults(handler=handle, run=run, render_plain=render_plain)
     return parser
 
 
-def handle(args, console: Console):
+def run(args) -> ExportResult:
+    sqlite_path = getattr(args, "sqlite", None)
+    if sqlite_path:
+        return run_sqlite(Path(sqlite_path))
+
+    result = ExportResult(args.output)
     try:
+        table = getattr(args, "table", None)
+        if table:
+            result.format = table_format(args)
+            result.export_type = f"{table} table"
+            chunks = tables.table_chunks(table, result.format, result.counts)
+        else:
+            result.format = export_format(args)
+            if result.format in tables.TABLE_FORMATS:
+                raise ValueError(f"{result.format} is only for --table exports")
+            chunks = formats.compress(export_chunks(args, result), result.format)
+        if args.output == STDOUT:
+            write_stdout(chunks, text=result.format in ("json", "csv"))
+            finish_compaction(result)
+            return result
+
         output_path = Path(args.output)
         
         # Validate output path
-        if output_path.exists():
-            console.print(f"[yellow]Warning: File {args.output} already exists and will be overwritten.[/yellow]")
+        result.overwritten = output_path.exists()
         
         # Ensure output directory exists
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Load data
-        progress_data = load_json(PROGRESS_FILE)
-        mastered_data = load_json(MASTERED_FILE)
-        nextup_data = load_json(NEXT_UP_FILE)
-        
-        # Build export data based on flags
-        export_data = {
-            "exported_at": datetime.now().isoformat(),
-            "srl_version": "1.0.0",
-            "export_type": "full",
-            "data": {}
-        }
-        
-        if args.mastered_only:
-            export_data["export_type"] = "mastered_only"
-            export_data["data"]["problems_mastered"] = mastered_data
-        elif args.progress_only:
-            export_data["export_type"] = "progress_only"
-            export_data["data"]["problems_in_progress"] = progress_data
+        # Write to a temp file first so a failed export never clobbers an
+        # existing backup
+        tmp = _tmp_path(output_path)
+        try:
+            with open(tmp, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                # Compressed size, for the summary
+                result.size = f.tell()
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        os.replace(tmp, output_path)
+        finish_compaction(result)
+    except Exception as e:
+        result.error = str(e)
+    return result
+
+
+def finish_compaction(result: ExportResult):
+    if result.compaction is not None:
+        journal.compact(resolve(JOURNAL_FILE), *result.compaction)
+
+
+def run_sqlite(path: Path) -> ExportResult:
+    result = ExportResult(str(path), "sqlite database", "sqlite")
+    try:
+        result.overwritten = path.exists()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        sqlite_export.write_database(path, result.counts)
+        result.size = path.stat().st_size
+    except Exception as e:
+        result.error = str(e)
+    return result
+
+
+def write_stdout(chunks: Iterator[bytes], text: bool = True):
+    # Text-only streams (like the daemon's) have no binary buffer
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None and not text:
+        raise ValueError("Binary formats can't be written to this stdout")
+    last = b""
+    for chunk in chunks:
+        if buffer is not None:
+            buffer.write(chunk)
         else:
-            # Full export
-            export_data["data"]["problems_in_progress"] = progress_data
-            export_data["data"]["problems_mastered"] = mastered_data
-            export_data["data"]["next_up"] = nextup_data
-        
-        # Optional data
-        if args.include_config:
-            config_data = load_json(CONFIG_FILE)
-            export_data["data"]["config"] = config_data
-            
-        if args.include_audit:
-            audit_data = load_json(AUDIT_FILE)
-            export_data["data"]["audit"] = audit_data
-        
-        # Write export file
-        with open(output_path, 'w') as f:
-            json.dump(export_data, f, indent=2, ensure_ascii=False)
-        
-        # Generate summary
-        summary_lines = []
-        if "problems_in_progress" in export_data["data"]:
-            progress_count = len(progress_data)
-            summary_lines.append(f"• {progress_count} problems in progress")
-        
-        if "problems_mastered" in export_data["data"]:
-            mastered_count = len(mastered_data)
-            summary_lines.append(f"• {mastered_count} mastered problems")
-            
-        if "next_up" in export_data["data"]:
-            nextup_count = len(nextup_data)
-            summary_lines.append(f"• {nextup_count} problems in next-up queue")
-            
-        if args.include_config:
-            summary_lines.append("• Configuration settings")
-            
-        if args.include_audit:
-            summary_lines.append("• Audit history")
-        
-        # Display success message
-        file_size = output_path.stat().st_size
-        file_size_str = f"{file_size:,} bytes"
-        
-        summary_text = "\n".join(summary_lines) if summary_lines else "No data exported"
-        
-        console.print(
-            Panel.fit(
-                f"[green]✓[/green] Export completed successfully!\n\n"
-                f"[bold]File:[/bold] {args.output}\n"
-                f"[bold]Size:[/bold] {file_size_str}\n"
-                f"[bold]Type:[/bold] {export_data['export_type']}\n\n"
-                f"[bold]Exported:[/bold]\n{summary_text}",
-                title="[bold green]Export Complete[/bold green]",
-                border_style="green",
-                title_align="left",
+            sys.stdout.write(chunk.decode())
+        last = chunk or last
+    if buffer is not None:
+        buffer.flush()
+    if text and not last.endswith(b"\n"):
+        sys.stdout.write("\n")
+    sys.stdout.flush()
+
+
+def export_format(args) -> str:
+    output = None if args.output == STDOUT else args.output
+    return formats.format_for(output, getattr(args, "file_format", None))
+
+
+def table_format(args) -> str:
+    requested = getattr(args, "file_format", None)
+    if requested:
+        if requested not in tables.TABLE_FORMATS:
+            raise ValueError(
+                f"--table exports are csv, parquet or npy, not {requested}"
             )
+        return requested
+    suffix = Path(args.output).suffix.lower().lstrip(".")
+    return suffix if suffix in tables.TABLE_FORMATS else "csv"
+
+
+def new_writer(args, write):
+    fmt = export_format(args)
+    if fmt == "msgpack":
+        return formats.MsgpackWriter(write)
+    if fmt == "srlb":
+        return container.ContainerWriter(write)
+    # Nobody reads compressed exports by eye; indentation only costs time
+    compact = bool(getattr(args, "compact", False)) or fmt != "json"
+    return JSONWriter(write, compact=compact)
+
+
+def export_sections(args) -> tuple[str, list[tuple[str, Path]]]:
+    if args.mastered_only:
+        return "mastered_only", [("problems_mastered", MASTERED_FILE)]
+    if args.progress_only:
+        return "progress_only", [("problems_in_progress", PROGRESS_FILE)]
+    return "full", [
+        ("problems_in_progress", PROGRESS_FILE),
+        ("problems_mastered", MASTERED_FILE),
+        ("next_up", NEXT_UP_FILE),
+    ]
+
+
+def export_chunks(args, result: ExportResult) -> Iterator[bytes]:
+    """
+    Encode the export document piece by piece. Problems are streamed from
+    the data files straight into the output, a few hundred at a time, and
+    `result` gets the counts, type and byte size as they are produced.
+    """
+    since = getattr(args, "since", None)
+    if since:
+        yield from delta_chunks(args, result, since)
+        return
+
+    chunks = []
+    writer = new_writer(args, chunks.append)
+
+    export_type, sections = export_sections(args)
+    result.export_type = export_type
+    result.include_config = bool(args.include_config)
+    result.include_audit = bool(args.include_audit)
+    # Taken before reading any data, so a change racing the export lands in
+    # this file, the next delta or both, but is never missed. Read-only
+    # callers only report the journal's position; they never create it.
+    journal_path = resolve(JOURNAL_FILE)
+    if is_read_only():
+        result.checkpoint = journal.checkpoint(journal_path)
+    else:
+        result.checkpoint = journal.start(journal_path)
+
+    writer.begin_object()
+    writer.member("exported_at", datetime.now().isoformat())
+    writer.member("srl_version", "1.0.0")
+    writer.member("export_type", export_type)
+    writer.member("checkpoint", result.checkpoint)
+    writer.begin_object("data")
+
+    for section, file_path in sections:
+        writer.begin_object(section)
+        count = 0
+        for name, problem in iter_json_members(file_path):
+            writer.member(name, problem)
+            count += 1
+            if len(chunks) >= CHUNK_PIECES:
+                yield b"".join(chunks)
+                chunks.clear()
+        writer.end_object()
+        result.counts[section] = count
+
+    # Optional data
+    if args.include_config:
+        writer.member("config", load_json(CONFIG_FILE))
+    if args.include_audit:
+        writer.member("audit", load_json(AUDIT_FILE))
+
+    writer.end_object()
+    writer.end_object()
+    result.size = writer.size
+    yield b"".join(chunks)
+
+
+def delta_chunks(args, result: ExportResult, since: str) -> Iterator[bytes]:
+    """
+    Encode only the problems that changed after the checkpoint `since`, read
+    from the change journal, plus the names of those removed. Config and
+    audit aren't journaled and go in whole when asked for.
+    """
+    journal_path = resolve(JOURNAL_FILE)
+    changes, checkpoint = journal.changes_since(journal_path, since)
+    # Compacted only once the delta is written: until then `since` still works
+    compacted = None
+    if not is_read_only():
+        compacted = journal.plan_compaction(journal_path, checkpoint)
+    if compacted is not None:
+        result.compaction = (checkpoint, compacted)
+        checkpoint = compacted
+    chunks = []
+    writer = new_writer(args, chunks.append)
+
+    _, sections = export_sections(args)
+    result.export_type = "delta"
+    result.include_config = bool(args.include_config)
+    result.include_audit = bool(args.include_audit)
+    result.checkpoint = checkpoint
+
+    writer.begin_object()
+    writer.member("exported_at", datetime.now().isoformat())
+    writer.member("srl_version", "1.0.0")
+    writer.member("export_type", "delta")
+    writer.member("base", since)
+    writer.member("checkpoint", checkpoint)
+    writer.begin_object("data")
+
+    deleted = {}
+    for section, file_path in sections:
+        changed = changes.get(file_path.name, {})
+        writer.begin_object(section)
+        count = 0
+        for name, problem in changed.items():
+            if problem is not None:
+                writer.member(name, problem)
+                count += 1
+        writer.end_object()
+        result.counts[section] = count
+        deleted[section] = [name for name, value in changed.items() if value is None]
+        result.deleted[section] = len(deleted[section])
+
+    if args.include_config:
+        writer.member("config", load_json(CONFIG_FILE))
+    if args.include_audit:
+        writer.member("audit", load_json(AUDIT_FILE))
+
+    writer.end_object()
+    writer.member("deleted", deleted)
+    writer.end_object()
+    result.size = writer.size
+    yield b"".join(chunks)
+
+
+def handle(args, console: Console):
+    render(run(args), console)
+
+
+def summary_lines(result: ExportResult) -> list[str]:
+    labels = {
+        "problems_in_progress": "problems in progress",
+        "problems_mastered": "mastered problems",
+        "next_up": "problems in next-up queue",
+        "attempts": "attempts",
+        "problems": "problems",
+        "audits": "audit entries",
+    }
+    lines = [f"• {count} {labels[section]}" for section, count in result.counts.items()]
+    for section, count in result.deleted.items():
+        if count:
+            lines.append(f"• {count} {labels[section]} removed")
+    if result.include_config:
+        lines.append("• Configuration settings")
+    if result.include_audit:
+        lines.append("• Audit history")
+    return lines
+
+
+def render(result: ExportResult, console: Console):
+    from rich.panel import Panel
+
+    if result.overwritten:
+        console.print(f"[yellow]Warning: File {result.output} already exists and will be overwritten.[/yellow]")
+    if result.error is not None:
+        console.print(f"[bold red]Export failed:[/bold red] {result.error}")
+        return
+    if result.output == STDOUT:
+        return  # the export itself went to stdout
+
+    file_size_str = f"{result.size:,} bytes"
+    lines = summary_lines(result)
+    summary_text = "\n".join(lines) if lines else "No data exported"
+    checkpoint_line = ""
+    if result.checkpoint is not None:
+        checkpoint_line = f"[bold]Checkpoint:[/bold] {result.checkpoint}\n"
+    
+    console.print(
+        Panel.fit(
+            f"[green]✓[/green] Export completed successfully!\n\n"
+            f"[bold]File:[/bold] {result.output}\n"
+            f"[bold]Size:[/bold] {file_size_str}\n"
+            f"[bold]Type:[/bold] {result.export_type}\n"
+            f"[bold]Format:[/bold] {result.format}\n"
+            f"{checkpoint_line}\n"
+            f"[bold]Exported:[/bold]\n{summary_text}",
+            title="[bold green]Export Complete[/bold green]",
+            border_style="green",
+            title_align="left",
         )
-        
-        # Usage tip
+    )
+    
+    # Usage tip
+    if result.checkpoint is None:
+        return  # tables are for analytics, not for importing
+    if result.export_type == "delta":
         console.print(
-            f"\n[dim]💡 To import this data elsewhere, use:[/dim] [cyan]srl import -f {args.output}[/cyan]"
+            f"\n[dim]💡 To apply these changes elsewhere, use:[/dim] [cyan]srl import --apply-delta -f {result.output}[/cyan]"
         )
-        
-    except Exception as e:
-        console.print(f"[bold red]Export failed:[/bold red] {str(e)}")
\ No newline at end of file
+    else:
+        console.print(
+            f"\n[dim]💡 To import this data elsewhere, use:[/dim] [cyan]srl import -f {result.output}[/cyan]"
+        )
+    console.print(
+        f"[dim]💡 To export only later changes, use:[/dim] [cyan]srl export --since {result.checkpoint} -o <file>[/cyan]"
+    )
+
+
+def render_plain(result: ExportResult) -> str:
+    if result.error is not None:
+        return f"Export failed: {result.error}"
+    if result.output == STDOUT:
+        return ""
+    lines = [
+        f"File: {result.output}",
+        f"Size: {result.size:,} bytes",
+        f"Type: {result.export_type}",
+        f"Format: {result.format}",
+    ]
+    if result.checkpoint is not None:
+        lines.append(f"Checkpoint: {result.checkpoint}")
+    return "\n".join(lines + summary_lines(result))
@@ -1,11 +1,10 @@
 from rich.console import Console
+from rich.cells import cell_len
 from types import SimpleNamespace
 
 
 def add_subparser(subparsers):
-    gen_preview = subparsers.add_parser(
-        "generate-preview", help="Generate SVG preview for the README"
-    )
+    gen_preview = subparsers.add_parser("generate-preview")
     gen_preview.set_defaults(handler=handle)
     return gen_preview
 
@@ -15,4 +14,7 @@ def handle(_, console: Console):
 
     console.record = True
     calendar.handle(SimpleNamespace(months=8), console)
+    # Calendar rows are printed unwrapped; widen the SVG to fit the longest one
+    lines = console.export_text(clear=False).splitlines()
+    console.width = max([console.width] + [cell_len(line) for line in lines])
     console.save_svg(path="./preview.svg", title="srl")
@@ -1,9 +1,16 @@
 from rich.console import Console
 from rich.panel import Panel
 from rich.prompt import Confirm
+from srl import container, formats, merge as history_merge
+from srl.jsonstream import JSONStream
+from srl.staging import StagedImport, StagingError, finish_swap
 from srl.storage import (
     load_json,
+    on_disk,
     save_json,
+    save_json_members,
+    session,
+    user_root,
     PROGRESS_FILE,
     MASTERED_FILE,
     NEXT_UP_FILE,
@@ -17,12 +24,13 @@ from datetime import datetime
 
 
 def add_subparser(subparsers):
-    parser = subparsers.add_parser("import", help="Import learning progress data")
+    parser = subparsers.add_parser("import")
     parser.add_argument(
         "--file",
         "-f",
-        required=True,
-        help="Import file path (e.g., backup.json)",
+        action="append",
+        help="Import file path (e.g., backup.json); repeat to merge several "
+        "backups or apply deltas",
     )
     parser.add_argument(
         "--merge",
@@ -39,29 +47,97 @@ def add_subparser(subparsers):
         action="store_true",
         help="Skip confirmation prompts",
     )
+    parser.add_argument(
+        "--apply-delta",
+        action="store_true",
+        help="Apply delta exports (srl export --since) in order, "
+        "optionally after the full export they start from",
+    )
+    parser.add_argument(
+        "--only",
+        action="append",
+        choices=ONLY_SECTIONS,
+        help="Import just this section (repeatable); an srlb container's "
+        "other sections aren't even read",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted import from its last checkpoint",
+    )
     parser.set_defaults(handler=handle)
     return parser
 
 
+# Problems staged between checkpoints (and progress updates) while importing
+# a section
+IMPORT_BATCH_SIZE = 1000
+
+# Sections holding one entry per problem; these are streamed member by member
+PROBLEM_SECTIONS = ("problems_in_progress", "problems_mastered", "next_up")
+
+# --only choices and the export sections they name
+ONLY_SECTIONS = {
+    "progress": "problems_in_progress",
+    "mastered": "problems_mastered",
+    "next-up": "next_up",
+    "config": "config",
+    "audit": "audit",
+}
+
+
 def handle(args, console: Console):
     try:
-        import_path = Path(args.file)
+        pending = finish_pending_swap(console)
+    except StagingError as e:
+        console.print(f"[bold red]Import failed:[/bold red] {str(e)}")
+        return
+    if getattr(args, "resume", False):
+        resume_import(pending, console)
+        return
+    if not args.file:
+        console.print(
+            "[bold red]Error:[/bold red] --file is required "
+            "(or --resume to continue an interrupted import)"
+        )
+        return
+    files = args.file if isinstance(args.file, list) else [args.file]
+    if getattr(args, "apply_delta", False):
+        handle_deltas(args, [Path(file) for file in files], console)
+        return
+    if len(files) > 1 and not args.merge:
+        console.print(
+            "[bold red]Error:[/bold red] Several files can only be imported "
+            "with --merge or --apply-delta"
+        )
+        return
+    try:
+        paths = [Path(file) for file in files]
+        only = getattr(args, "only", None)
+        sections = {ONLY_SECTIONS[name] for name in only} if only else None
         
         # Validate import file
-        if not import_path.exists():
-            console.print(f"[bold red]Error:[/bold red] File {args.file} not found")
-            return
+        for import_path in paths:
+            if not import_path.exists():
+                console.print(f"[bold red]Error:[/bold red] File {import_path} not found")
+                return
             
-        # Load import data
-        with open(import_path, 'r') as f:
-            import_data = json.load(f)
+        # Read the file's metadata and section sizes in one streaming pass
+        summaries = [scan_import_file(import_path, sections) for import_path in paths]
         
         # Validate import format
-        if not validate_import_data(import_data, console):
-            return
+        for summary in summaries:
+            if not validate_import_data(summary, console):
+                return
             
         # Show import preview
-        show_import_preview(import_data, console)
+        for summary in summaries:
+            show_import_preview(summary, console)
+        if pending is not None and len(paths) == 1:
+            console.print(
+                f"[yellow]This discards the unfinished import of {pending.path}"
+                " (use --resume to continue it instead).[/yellow]"
+            )
         
         if args.dry_run:
             console.print("[yellow]Dry run complete - no changes made.[/yellow]")
@@ -75,15 +151,133 @@ def handle(args, console: Console):
                 return
         
         # Perform import
-        imported_counts = perform_import(import_data, args.merge, console)
+        conflicts = {}
+        if len(paths) > 1:
+            imported_counts = merge_files(
+                paths, console, summaries, conflicts, sections
+            )
+        else:
+            imported_counts = perform_import(
+                paths[0], args.merge, console, summaries[0], conflicts, sections
+            )
         
         # Show success message
         show_import_success(imported_counts, args.merge, console)
+        show_conflicts(conflicts, console)
         
     except json.JSONDecodeError as e:
         console.print(f"[bold red]Invalid JSON file:[/bold red] {str(e)}")
+        show_resume_hint(console)
+    except Exception as e:
+        console.print(f"[bold red]Import failed:[/bold red] {str(e)}")
+        show_resume_hint(console)
+
+
+def finish_pending_swap(console: Console) -> StagedImport | None:
+    """
+    Complete an import interrupted while its staged files were being swapped
+    in (as storage.ensure_data_dir() does for every command). Returns the
+    import still being staged, if there is one.
+    """
+    finished = finish_swap()
+    if finished is not None:
+        console.print(
+            f"[yellow]Finished applying the interrupted import of "
+            f"{finished.path}.[/yellow]"
+        )
+    return StagedImport.load()
+
+
+def resume_import(staged: StagedImport | None, console: Console):
+    """Continue the staged import from its last checkpoint."""
+    if staged is None:
+        console.print("[yellow]No interrupted import to resume.[/yellow]")
+        return
+    try:
+        staged.check_source()
+        done = sum(count or 0 for count in staged.done().values())
+        done += staged.position((staged.state["current"] or {}).get("section"))
+        console.print(
+            f"Resuming the import of {staged.path} ({done} problems already staged)"
+        )
+        conflicts = {}
+        counts = perform_import(
+            staged.path,
+            staged.merge,
+            console,
+            conflicts=conflicts,
+            sections=staged.sections,
+            staged=staged,
+        )
+        show_import_success(counts, staged.merge, console)
+        show_conflicts(conflicts, console)
+    except StagingError as e:
+        console.print(f"[bold red]Can't resume:[/bold red] {str(e)}")
     except Exception as e:
         console.print(f"[bold red]Import failed:[/bold red] {str(e)}")
+        show_resume_hint(console)
+
+
+def show_resume_hint(console: Console):
+    staged = StagedImport.load()
+    if staged is not None and not staged.swapping:
+        console.print(
+            "[yellow]Your data is unchanged and the progress so far is saved: "
+            "run `srl import --resume` to continue.[/yellow]"
+        )
+
+
+def scan_import_file(import_path: Path, sections: set | None = None) -> dict:
+    """
+    Summarize an export file without loading it: its top-level fields, with
+    "data" mapping each section (of `sections`, if given) to its size
+    (problems, or audit entries). "data" is None if it isn't an object.
+
+    A container's summary comes from its index, after checking the sections'
+    checksums, so nothing is parsed.
+    """
+    summary = {}
+    with formats.open_stream(import_path) as stream:
+        if isinstance(stream, container.ContainerStream):
+            stream.verify(sections)
+            summary = stream.summary()
+            summary["data"] = {
+                section: count
+                for section, count in summary["data"].items()
+                if sections is None or section in sections
+            }
+            return summary
+        for key in stream.members():
+            if key != "data":
+                summary[key] = stream.value()
+            elif stream.peek() != "{":
+                stream.skip()
+                summary["data"] = None
+            else:
+                summary["data"] = {}
+                for section in stream.members():
+                    if sections is None or section in sections:
+                        summary["data"][section] = count_section(stream, section)
+                    else:
+                        stream.skip()
+    return summary
+
+
+def count_section(stream: JSONStream, section: str) -> int:
+    if stream.peek() != "{":
+        value = stream.value()
+        return len(value) if hasattr(value, "__len__") else 0
+    count = 0
+    for key in stream.members():
+        if section == "audit" and key == "history" and stream.peek() == "[":
+            for _ in stream.items():
+                stream.skip()
+                count += 1
+            continue
+        stream.skip()
+        if section != "audit":
+            count += 1
+    return count
 
 
 def validate_import_data(import_data: dict, console: Console) -> bool:
@@ -102,11 +296,11 @@ def validate_import_data(import_data: dict, console: Console) -> bool:
     return True
 
 
-def show_import_preview(import_data: dict, console: Console):
-    """Show what will be imported."""
-    data = import_data["data"]
-    export_type = import_data.get("export_type", "unknown")
-    exported_at = import_data.get("exported_at", "unknown")
+def show_import_preview(summary: dict, console: Console):
+    """Show what will be imported, from scan_import_file()'s summary."""
+    data = summary["data"]
+    export_type = summary.get("export_type", "unknown")
+    exported_at = summary.get("exported_at", "unknown")
     
     preview_lines = []
     preview_lines.append(f"[bold]Export Date:[/bold] {exported_at}")
@@ -114,23 +308,22 @@ def show_import_preview(import_data: dict, console: Console):
     preview_lines.append("")
     
     if "problems_in_progress" in data:
-        count = len(data["problems_in_progress"])
+        count = data["problems_in_progress"]
         preview_lines.append(f"• {count} problems in progress")
         
     if "problems_mastered" in data:
-        count = len(data["problems_mastered"])
+        count = data["problems_mastered"]
         preview_lines.append(f"• {count} mastered problems")
         
     if "next_up" in data:
-        count = len(data["next_up"])
+        count = data["next_up"]
         preview_lines.append(f"• {count} problems in next-up queue")
         
     if "config" in data:
         preview_lines.append("• Configuration settings")
         
     if "audit" in data:
-        audit_history = data["audit"].get("history", [])
-        preview_lines.append(f"• Audit history ({len(audit_history)} entries)")
+        preview_lines.append(f"• Audit history ({data['audit']} entries)")
     
     console.print(
         Panel.fit(
@@ -142,68 +335,238 @@ def show_import_preview(import_data: dict, console: Console):
     )
 
 
-def perform_import(import_data: dict, merge: bool, console: Console) -> dict:
-    """Perform the actual import operation."""
-    data = import_data["data"]
-    counts = {}
-    
-    # Import progress data
-    if "problems_in_progress" in data:
-        counts["progress"] = import_progress_data(data["problems_in_progress"], merge)
-        
-    # Import mastered data  
-    if "problems_mastered" in data:
-        counts["mastered"] = import_mastered_data(data["problems_mastered"], merge)
-        
-    # Import next-up data
-    if "next_up" in data:
-        counts["nextup"] = import_nextup_data(data["next_up"], merge)
-        
-    # Import config data
-    if "config" in data:
-        counts["config"] = import_config_data(data["config"], merge)
-        
-    # Import audit data
-    if "audit" in data:
-        counts["audit"] = import_audit_data(data["audit"], merge)
-    
+def section_files() -> dict[str, Path]:
+    return {
+        "problems_in_progress": PROGRESS_FILE,
+        "problems_mastered": MASTERED_FILE,
+        "next_up": NEXT_UP_FILE,
+    }
+
+
+def perform_import(
+    import_path: Path,
+    merge: bool,
+    console: Console,
+    summary: dict | None = None,
+    conflicts: dict | None = None,
+    sections: set | None = None,
+    staged: StagedImport | None = None,
+) -> dict:
+    """
+    Perform the actual import operation in a second streaming pass, staged
+    (see srl.staging) so the data files only change once the whole file has
+    been read. Problem sections are staged IMPORT_BATCH_SIZE entries at a
+    time, each batch a checkpoint to resume from, with a progress bar sized
+    from `summary`; config and audit are small and read whole.
+
+    Merging combines each problem's history with the local one (see
+    srl.merge); fields the two copies disagree on are added to `conflicts`.
+    Only the `sections` given are imported, if any are. `staged` is an
+    interrupted import to continue.
+    """
+    from rich.progress import Progress
+
+    if staged is None:
+        totals = (summary or {}).get("data") or {}
+        staged = StagedImport.start(import_path, merge, sections, totals)
+    totals = staged.state["totals"]
+    done = staged.done()
+
+    with (
+        formats.open_stream(import_path) as stream,
+        Progress(console=console, transient=True) as bar,
+    ):
+        for key in stream.members():
+            if key != "data":
+                stream.skip()
+                continue
+            for section in stream.members():
+                if section in done or (
+                    sections is not None and section not in sections
+                ):
+                    stream.skip()
+                elif section in PROBLEM_SECTIONS:
+                    skip = staged.position(section)
+                    task = bar.add_task(
+                        f"Importing {section}",
+                        total=totals.get(section),
+                        completed=skip,
+                    )
+                    progress = lambda n, task=task: bar.update(task, completed=n)
+                    count = staged.stage_members(
+                        section,
+                        unstaged_members(stream, skip),
+                        IMPORT_BATCH_SIZE,
+                        progress,
+                    )
+                    progress(count)
+                elif section in ("config", "audit"):
+                    staged.stage_value(section, stream.value())
+                else:
+                    stream.skip()
+
+    counts = build_staged_files(staged, conflicts)
+    staged.swap()
     return counts
 
 
-def import_progress_data(import_progress: dict, merge: bool) -> int:
-    """Import problems in progress."""
-    if merge:
-        existing = load_json(PROGRESS_FILE)
-        existing.update(import_progress)
-        save_json(PROGRESS_FILE, existing)
-    else:
-        save_json(PROGRESS_FILE, import_progress)
-    
-    return len(import_progress)
+def unstaged_members(stream: JSONStream, skip: int):
+    """A problem section's (name, value) pairs after the first `skip`."""
+    for i, name in enumerate(stream.members()):
+        if i < skip:
+            stream.skip()
+        else:
+            yield name, stream.value()
 
 
-def import_mastered_data(import_mastered: dict, merge: bool) -> int:
-    """Import mastered problems."""
-    if merge:
-        existing = load_json(MASTERED_FILE)
-        existing.update(import_mastered)
-        save_json(MASTERED_FILE, existing)
-    else:
-        save_json(MASTERED_FILE, import_mastered)
-    
-    return len(import_mastered)
+def build_staged_files(staged: StagedImport, conflicts: dict | None = None) -> dict:
+    """
+    Write the new data files into the staging directory: the staged sections
+    themselves when replacing, or copies of the live data merged with them.
+    """
+    done = staged.done()
+    keys = {
+        "problems_in_progress": "progress",
+        "problems_mastered": "mastered",
+        "next_up": "nextup",
+    }
+    counts = {keys[section]: done[section] for section in keys if section in done}
+    # Problems may move between in-progress and mastered while merging
+    problems = [
+        section
+        for section in ("problems_in_progress", "problems_mastered")
+        if section in done
+    ]
 
+    live = {}
+    if staged.merge:
+        touched = {
+            PROGRESS_FILE: bool(problems),
+            MASTERED_FILE: bool(problems),
+            NEXT_UP_FILE: "next_up" in done,
+            CONFIG_FILE: "config" in done,
+            AUDIT_FILE: "audit" in done,
+        }
+        # Loaded rather than copied: a store may hold changes not yet written
+        live = {
+            file_path: load_json(file_path)
+            for file_path, needed in touched.items()
+            if needed
+        }
 
-def import_nextup_data(import_nextup: dict, merge: bool) -> int:
-    """Import next-up problems."""
-    if merge:
-        existing = load_json(NEXT_UP_FILE)
-        existing.update(import_nextup)
-        save_json(NEXT_UP_FILE, existing)
-    else:
-        save_json(NEXT_UP_FILE, import_nextup)
-    
-    return len(import_nextup)
+    # The new files go to disk in the staging directory, never to the store
+    with on_disk(), user_root(staged.directory):
+        # import_config_data and import_audit_data merge into what's there
+        for file_path in (CONFIG_FILE, AUDIT_FILE):
+            if file_path in live:
+                save_json(file_path, live[file_path])
+        if staged.merge:
+            if problems:
+                progress_data = live[PROGRESS_FILE]
+                mastered_data = live[MASTERED_FILE]
+                for section in problems:
+                    for name, entry in staged.members(section):
+                        found = history_merge.merge_into(
+                            progress_data, mastered_data, name, entry
+                        )
+                        if found and conflicts is not None:
+                            conflicts[name] = found
+                save_json(PROGRESS_FILE, progress_data)
+                save_json(MASTERED_FILE, mastered_data)
+            if "next_up" in done:
+                existing = live[NEXT_UP_FILE]
+                existing.update(staged.members("next_up"))
+                save_json(NEXT_UP_FILE, existing)
+        else:
+            for section, file_path in section_files().items():
+                if section in done:
+                    save_json_members(file_path, staged.members(section))
+        if "config" in done:
+            counts["config"] = import_config_data(staged.value("config"), staged.merge)
+        if "audit" in done:
+            counts["audit"] = import_audit_data(staged.value("audit"), staged.merge)
+    return counts
+
+
+def merge_files(
+    paths: list[Path],
+    console: Console,
+    summaries: list[dict],
+    conflicts: dict | None = None,
+    sections: set | None = None,
+) -> dict:
+    """
+    Merge several backups into the local data at once. Every copy of a
+    problem is gathered first so its histories are merged in a single k-way
+    pass, and all the files are written in one storage commit at the end.
+
+    Each file is parsed incrementally, but every imported problem is held
+    in memory until the merge, alongside the local progress and mastered
+    data: memory grows with the total size of the inputs, unlike the
+    staged single-file import.
+    """
+    from rich.progress import Progress
+
+    keys = {
+        "problems_in_progress": "progress",
+        "problems_mastered": "mastered",
+        "next_up": "nextup",
+    }
+    counts = {}
+    # name -> imported copies, in file order; holds every file's problems
+    copies: dict[str, list[dict]] = {}
+
+    def add(key, count):
+        counts[key] = counts.get(key, 0) + count
+
+    with session(), Progress(console=console, transient=True) as bar:
+        for import_path, summary in zip(paths, summaries):
+            data = summary.get("data") or {}
+            task = bar.add_task(
+                f"Reading {import_path.name}",
+                total=sum(data.get(section, 0) for section in PROBLEM_SECTIONS),
+            )
+            with formats.open_stream(import_path) as stream:
+                for key in stream.members():
+                    if key != "data":
+                        stream.skip()
+                        continue
+                    for section in stream.members():
+                        if sections is not None and section not in sections:
+                            stream.skip()
+                        elif section in ("problems_in_progress", "problems_mastered"):
+                            count = 0
+                            for count, name in enumerate(stream.members(), 1):
+                                copies.setdefault(name, []).append(stream.value())
+                            add(keys[section], count)
+                            bar.advance(task, count)
+                        elif section == "next_up":
+                            existing = load_json(NEXT_UP_FILE)
+                            count = 0
+                            for count, name in enumerate(stream.members(), 1):
+                                existing[name] = stream.value()
+                            save_json(NEXT_UP_FILE, existing)
+                            add(keys[section], count)
+                            bar.advance(task, count)
+                        elif section == "config":
+                            add("config", import_config_data(stream.value(), True))
+                        elif section == "audit":
+                            add("audit", import_audit_data(stream.value(), True))
+                        else:
+                            stream.skip()
+
+        progress_data = load_json(PROGRESS_FILE)
+        mastered_data = load_json(MASTERED_FILE)
+        for name, entries in copies.items():
+            found = history_merge.merge_into(
+                progress_data, mastered_data, name, *entries
+            )
+            if found and conflicts is not None:
+                conflicts[name] = found
+        save_json(PROGRESS_FILE, progress_data)
+        save_json(MASTERED_FILE, mastered_data)
+
+    return counts
 
 
 def import_config_data(import_config: dict, merge: bool) -> int:
@@ -251,9 +614,125 @@ def import_audit_data(import_audit: dict, merge: bool) -> int:
     return len(import_audit.get("history", []))
 
 
-def show_import_success(counts: dict, merge: bool, console: Console):
+def handle_deltas(args, paths: list[Path], console: Console):
+    """
+    Bring this machine up to date from a chain of exports: an optional full
+    export to start from, then delta exports each continuing from the
+    checkpoint of the file before it.
+    """
+    try:
+        for path in paths:
+            if not path.exists():
+                console.print(f"[bold red]Error:[/bold red] File {path} not found")
+                return
+        summaries = [scan_import_file(path) for path in paths]
+        for summary in summaries:
+            if not validate_import_data(summary, console):
+                return
+        error = check_delta_chain(summaries)
+        if error:
+            console.print(f"[bold red]Invalid delta chain:[/bold red] {error}")
+            return
+
+        for summary in summaries:
+            show_import_preview(summary, console)
+        if args.dry_run:
+            console.print("[yellow]Dry run complete - no changes made.[/yellow]")
+            return
+        if not args.force:
+            if not Confirm.ask(f"Do you want to apply {len(paths)} export file(s)?"):
+                console.print("[yellow]Import cancelled.[/yellow]")
+                return
+
+        counts = {}
+        for path, summary in zip(paths, summaries):
+            if summary.get("export_type") == "delta":
+                file_counts = apply_delta(path)
+            else:
+                file_counts = perform_import(path, args.merge, console, summary)
+            for key, count in file_counts.items():
+                counts[key] = counts.get(key, 0) + count
+        show_import_success(counts, args.merge, console, operation="applied")
+
+    except json.JSONDecodeError as e:
+        console.print(f"[bold red]Invalid JSON file:[/bold red] {str(e)}")
+    except Exception as e:
+        console.print(f"[bold red]Import failed:[/bold red] {str(e)}")
+
+
+def check_delta_chain(summaries: list[dict]) -> str | None:
+    """Why the files can't be applied in this order, or None if they can."""
+    for i, summary in enumerate(summaries):
+        if summary.get("export_type") != "delta":
+            if i:
+                return "only the first file may be a full export"
+            continue
+        base = summary.get("base")
+        if i and base != summaries[i - 1].get("checkpoint"):
+            return (
+                f"file {i + 1} continues from {base}, "
+                f"but file {i} ends at {summaries[i - 1].get('checkpoint')}"
+            )
+    return None
+
+
+def apply_delta(delta_path: Path) -> dict:
+    """
+    Apply one delta export's changed and removed problems to the data files,
+    in one storage session: the files are written together once the whole
+    delta has been applied, never left partly updated.
+    """
+    with formats.open_stream(delta_path) as stream:
+        delta = stream.value()
+    data = delta["data"]
+    deleted = delta.get("deleted", {})
+    keys = {
+        "problems_in_progress": "progress",
+        "problems_mastered": "mastered",
+        "next_up": "nextup",
+    }
+    counts = {}
+    with session():
+        for section, file_path in section_files().items():
+            if section not in data and section not in deleted:
+                continue
+            existing = load_json(file_path)
+            existing.update(data.get(section, {}))
+            for name in deleted.get(section, []):
+                existing.pop(name, None)
+            save_json(file_path, existing)
+            counts[keys[section]] = len(data.get(section, {}))
+        if "config" in data:
+            counts["config"] = import_config_data(data["config"], merge=False)
+        if "audit" in data:
+            counts["audit"] = import_audit_data(data["audit"], merge=False)
+    return counts
+
+
+def show_conflicts(conflicts: dict, console: Console):
+    """List problems whose copies disagreed; the last file's value was kept."""
+    if not conflicts:
+        return
+    lines = []
+    for name, fields in conflicts.items():
+        for field, values in fields.items():
+            shown = ", ".join(json.dumps(value) for value in values)
+            lines.append(f"• {name}: {field} {shown} (kept {json.dumps(values[-1])})")
+    console.print(
+        Panel.fit(
+            "\n".join(lines),
+            title=f"[bold yellow]{len(conflicts)} Conflicts[/bold yellow]",
+            border_style="yellow",
+            title_align="left",
+        )
+    )
+
+
+def show_import_success(
+    counts: dict, merge: bool, console: Console, operation: str | None = None
+):
     """Show successful import summary."""
-    operation = "merged" if merge else "imported"
+    operation = operation or ("merged" if merge else "imported")
     success_lines = []
     
     if "progress" in counts:
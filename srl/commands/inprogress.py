@@ -1,36 +1,72 @@
-from rich.console import Console
-from rich.panel import Panel
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from dataclasses import dataclass
 from srl.storage import (
     load_json,
     PROGRESS_FILE,
 )
-from srl.commands.list_ import maybe_trigger_audit
+from srl.commands.list_ import (
+    AuditTriggered,
+    render_audit,
+    render_audit_plain,
+    trigger_audit,
+)
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+
+@dataclass(slots=True)
+class Problem:
+    name: str
+    leetcode_id: int | None
+
+
+@dataclass(slots=True)
+class InProgressResult:
+    problems: list[Problem]
 
 
 def add_subparser(subparsers):
-    parser = subparsers.add_parser("inprogress", help="List problems in progress")
-    parser.set_defaults(handler=handle)
+    parser = subparsers.add_parser("inprogress")
+    parser.set_defaults(handler=handle, run=run, render_plain=render_plain)
     return parser
 
 
+def run(args) -> AuditTriggered | InProgressResult:
+    audit = trigger_audit()
+    if audit:
+        return audit
+
+    data = load_json(PROGRESS_FILE)
+    return InProgressResult(
+        [Problem(name, data[name].get("leetcode_id")) for name in get_in_progress()]
+    )
+
+
 def handle(args, console: Console):
-    if maybe_trigger_audit(console):
+    render(run(args), console)
+
+
+def render(result: AuditTriggered | InProgressResult, console: Console):
+    from rich.panel import Panel
+
+    if isinstance(result, AuditTriggered):
+        render_audit(result, console)
         return
 
-    data = load_json(PROGRESS_FILE)
-    in_progress = get_in_progress()
-    if in_progress:
+    if result.problems:
         lines = []
-        for i, p in enumerate(in_progress):
+        for i, p in enumerate(result.problems):
             leetcode_id = ""
-            if p in data and "leetcode_id" in data[p]:
-                leetcode_id = f"[dim]#{data[p]['leetcode_id']}[/dim] "
-            lines.append(f"{i+1}. {leetcode_id}{p}")
+            if p.leetcode_id is not None:
+                leetcode_id = f"[dim]#{p.leetcode_id}[/dim] "
+            lines.append(f"{i+1}. {leetcode_id}{p.name}")
         
         console.print(
             Panel.fit(
                 "\n".join(lines),
-                title=f"[bold magenta]Problems in Progress ({len(in_progress)})[/bold magenta]",
+                title=f"[bold magenta]Problems in Progress ({len(result.problems)})[/bold magenta]",
                 border_style="magenta",
                 title_align="left",
             )
@@ -39,6 +75,19 @@ def handle(args, console: Console):
         console.print("[yellow]No problems currently in progress.[/yellow]")
 
 
+def render_plain(result: AuditTriggered | InProgressResult) -> str:
+    if isinstance(result, AuditTriggered):
+        return render_audit_plain(result)
+    if not result.problems:
+        return "No problems currently in progress."
+
+    lines = [f"Problems in Progress ({len(result.problems)})"]
+    for i, p in enumerate(result.problems):
+        leetcode_id = f"#{p.leetcode_id} " if p.leetcode_id is not None else ""
+        lines.append(f"{i+1}. {leetcode_id}{p.name}")
+    return "\n".join(lines)
+
+
 def get_in_progress() -> list[str]:
     data = load_json(PROGRESS_FILE)
     res = []
@@ -1,10 +1,12 @@
-from rich.console import Console
-from rich.panel import Panel
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from dataclasses import asdict, dataclass
 from srl.utils import today
 from srl.commands.audit import get_current_audit, random_audit
 from srl.commands.config import Config
 from datetime import datetime, timedelta
 import random
+from srl import stats
 from srl.storage import (
     load_json,
     NEXT_UP_FILE,
@@ -12,6 +14,64 @@ from srl.storage import (
 )
 from srl.commands.config import Config
 
+if TYPE_CHECKING:
+    from rich.console import Console
+
+
+@dataclass(slots=True)
+class AuditTriggered:
+    """Returned instead of a listing when a random audit fires."""
+
+    problem: str
+
+
+@dataclass(slots=True)
+class DueProblem:
+    name: str
+    leetcode_id: int | None
+    days_overdue: int | None
+    mastery_candidate: bool
+
+
+@dataclass(slots=True)
+class ListResult:
+    date: str
+    problems: list[DueProblem]
+    streak: int
+
+
+def trigger_audit() -> AuditTriggered | None:
+    """Start a random audit if one is due and none is pending."""
+    if should_audit() and not get_current_audit():
+        problem = random_audit()
+        if problem:
+            return AuditTriggered(problem)
+    return None
+
+
+def render_audit(result: AuditTriggered, console: Console):
+    from rich.panel import Panel
+
+    console.print("")
+    console.print(Panel.fit(
+        f"🚨 [bold red]RANDOM AUDIT TRIGGERED[/bold red] 🚨\n\n"
+        f"📝 Problem: [bold cyan]{result.problem}[/bold cyan]\n\n"
+        f"💡 Solve this problem, then run:\n"
+        f"   • [bold green]srl audit --pass[/bold green] if you solved it\n"
+        f"   • [bold red]srl audit --fail[/bold red] if you couldn't",
+        title="🎯 [bold yellow]SPACED REPETITION AUDIT[/bold yellow]",
+        border_style="bold red",
+        title_align="center"
+    ))
+    console.print("")
+
+
+def render_audit_plain(result: AuditTriggered) -> str:
+    return (
+        f"RANDOM AUDIT TRIGGERED: {result.problem}\n"
+        "Solve this problem, then run `srl audit --pass` or `srl audit --fail`."
+    )
+
 
 def maybe_trigger_audit(console: Console) -> bool:
     """
@@ -19,64 +79,89 @@ def maybe_trigger_audit(console: Console) -> bool:
     Returns True if audit was triggered (should stop further execution),
     False if normal execution should continue.
     """
-    if should_audit() and not get_current_audit():
-        problem = random_audit()
-        if problem:
-            console.print("")
-            console.print(Panel.fit(
-                f"🚨 [bold red]RANDOM AUDIT TRIGGERED[/bold red] 🚨\n\n"
-                f"📝 Problem: [bold cyan]{problem}[/bold cyan]\n\n"
-                f"💡 Solve this problem, then run:\n"
-                f"   • [bold green]srl audit --pass[/bold green] if you solved it\n"
-                f"   • [bold red]srl audit --fail[/bold red] if you couldn't",
-                title="🎯 [bold yellow]SPACED REPETITION AUDIT[/bold yellow]",
-                border_style="bold red",
-                title_align="center"
-            ))
-            console.print("")
-            return True
+    audit = trigger_audit()
+    if audit:
+        render_audit(audit, console)
+        return True
     return False
 
 
 def add_subparser(subparsers):
-    parser = subparsers.add_parser("list", help="List due problems")
+    parser = subparsers.add_parser("list")
     parser.add_argument("-n", type=int, default=None, help="Max number of problems")
-    parser.set_defaults(handler=handle)
+    parser.set_defaults(
+        handler=handle, run=run, render_plain=render_plain, records=records
+    )
     return parser
 
 
-def handle(args, console: Console):
-    if maybe_trigger_audit(console):
-        return
+def run(args) -> AuditTriggered | ListResult:
+    audit = trigger_audit()
+    if audit:
+        return audit
+
+    problems = due_problems(getattr(args, "n", None))
+    streak = stats.current_streak(stats.load(), today()) if problems else 0
+    return ListResult(today().isoformat(), problems, streak)
+
 
-    problems = get_due_problems(getattr(args, "n", None))
-    masters = mastery_candidates()
+def records(args):
+    """Due problems as plain records for --format plain/json/ndjson."""
+    for i, problem in enumerate(due_problems(getattr(args, "n", None))):
+        yield {"index": i + 1, **asdict(problem)}
+
+
+def due_problems(limit=None) -> list[DueProblem]:
+    data = load_json(PROGRESS_FILE)
     overdue_info = get_overdue_info()
+    problems = []
+    for name in get_due_problems(limit):
+        info = data.get(name, {})
+        history = info.get("history", [])
+        problems.append(
+            DueProblem(
+                name=name,
+                leetcode_id=info.get("leetcode_id"),
+                days_overdue=overdue_info.get(name),
+                mastery_candidate=bool(history) and history[-1].get("rating") == 5,
+            )
+        )
+    return problems
 
-    if problems:
+
+def handle(args, console: Console):
+    render(run(args), console)
+
+
+def render(result: AuditTriggered | ListResult, console: Console):
+    from rich.panel import Panel
+
+    if isinstance(result, AuditTriggered):
+        render_audit(result, console)
+        return
+
+    if result.problems:
         lines = []
-        data = load_json(PROGRESS_FILE)
         has_indicators = False
         
-        for i, p in enumerate(problems):
-            mark = " [magenta]*[/magenta]" if p in masters else ""
+        for i, p in enumerate(result.problems):
+            mark = " [magenta]*[/magenta]" if p.mastery_candidate else ""
             
             # Add overdue indicator
             overdue_indicator = ""
-            if p in overdue_info:
-                days_overdue = overdue_info[p]
-                if days_overdue >= 7:
+            if p.days_overdue is not None:
+                if p.days_overdue >= 7:
                     overdue_indicator = " 🔴"
                     has_indicators = True
-                elif days_overdue >= 3:
+                elif p.days_overdue >= 3:
                     overdue_indicator = " 🟡"
                     has_indicators = True
             
             # Get LeetCode ID if it exists
             leetcode_id = ""
-            if p in data and "leetcode_id" in data[p]:
-                leetcode_id = f"[dim]#{data[p]['leetcode_id']}[/dim] "
-            lines.append(f"{i+1}. {leetcode_id}{p}{mark}{overdue_indicator}")
+            if p.leetcode_id is not None:
+                leetcode_id = f"[dim]#{p.leetcode_id}[/dim] "
+            lines.append(f"{i+1}. {leetcode_id}{p.name}{mark}{overdue_indicator}")
 
         # Add legend at the top if indicators are present
         legend_text = ""
@@ -86,15 +171,33 @@ def handle(args, console: Console):
         console.print(
             Panel.fit(
                 legend_text + "\n".join(lines),
-                title=f"[bold blue]Problems to Practice [{today().isoformat()}] ({len(problems)})[/bold blue]",
+                title=f"[bold blue]Problems to Practice [{result.date}] ({len(result.problems)})[/bold blue]",
+                subtitle=f"[dim]🔥 {result.streak} day streak[/dim]" if result.streak else None,
                 border_style="blue",
                 title_align="left",
+                subtitle_align="right",
             )
         )
     else:
         console.print("[bold green]No problems due today or in Next Up.[/bold green]")
 
 
+def render_plain(result: AuditTriggered | ListResult) -> str:
+    if isinstance(result, AuditTriggered):
+        return render_audit_plain(result)
+    if not result.problems:
+        return "No problems due today or in Next Up."
+
+    lines = [f"Problems to Practice [{result.date}] ({len(result.problems)})"]
+    for i, p in enumerate(result.problems):
+        leetcode_id = f"#{p.leetcode_id} " if p.leetcode_id is not None else ""
+        mark = " *" if p.mastery_candidate else ""
+        lines.append(f"{i+1}. {leetcode_id}{p.name}{mark}")
+    if result.streak:
+        lines.append(f"{result.streak} day streak")
+    return "\n".join(lines)
+
+
 def should_audit():
     cfg = Config.load()
     probability = cfg.audit_probability
@@ -1,51 +1,139 @@
-from rich.console import Console
-from rich.table import Table
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from dataclasses import dataclass
 from srl.storage import (
+    iter_json_members,
     load_json,
     MASTERED_FILE,
 )
-from srl.commands.list_ import maybe_trigger_audit
+from srl.commands.list_ import (
+    AuditTriggered,
+    render_audit,
+    render_audit_plain,
+    trigger_audit,
+)
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+
+@dataclass(slots=True)
+class MasteredProblem:
+    name: str
+    leetcode_id: int | None
+    attempts: int
+    mastered_date: str
+
+
+@dataclass(slots=True)
+class MasteredResult:
+    count: int
+    problems: list[MasteredProblem] | None
 
 
 def add_subparser(subparsers):
-    parser = subparsers.add_parser("mastered", help="List mastered problems")
+    parser = subparsers.add_parser("mastered")
     parser.add_argument(
         "-c", action="store_true", help="Show count of mastered problems"
     )
-    parser.set_defaults(handler=handle)
+    parser.set_defaults(
+        handler=handle, run=run, render_plain=render_plain, records=records
+    )
     return parser
 
 
+def run(args) -> AuditTriggered | MasteredResult:
+    """Mastered problems, or just their count with -c."""
+    audit = trigger_audit()
+    if audit:
+        return audit
+
+    if getattr(args, "c", False):
+        return MasteredResult(len(get_mastered_problems()), None)
+
+    problems = mastered_problems()
+    return MasteredResult(len(problems), problems)
+
+
+def mastered_problems() -> list[MasteredProblem]:
+    data = load_json(MASTERED_FILE)
+    return [
+        MasteredProblem(name, data[name].get("leetcode_id"), attempts, mastered_date)
+        for name, attempts, mastered_date in get_mastered_problems()
+    ]
+
+
+def records(args):
+    """
+    Mastered problems as plain records for --format plain/json/ndjson.
+
+    Problems are parsed from the file one at a time and yielded as they are
+    read, so output starts immediately and memory stays flat.
+    """
+    members = iter_json_members(MASTERED_FILE)
+    if getattr(args, "c", False):
+        yield {"count": sum(1 for _, info in members if info["history"])}
+        return
+
+    for name, info in members:
+        history = info["history"]
+        if not history:
+            continue
+        yield {
+            "leetcode_id": info.get("leetcode_id"),
+            "name": name,
+            "attempts": len(history),
+            "mastered_date": history[-1]["date"],
+        }
+
+
 def handle(args, console: Console):
-    if maybe_trigger_audit(console):
+    render(run(args), console)
+
+
+def render(result: AuditTriggered | MasteredResult, console: Console):
+    from rich.table import Table
+
+    if isinstance(result, AuditTriggered):
+        render_audit(result, console)
         return
 
-    data = load_json(MASTERED_FILE)
-    mastered_problems = get_mastered_problems()
-    mastered_count = len(mastered_problems)
-    if args.c:
-        console.print(f"[bold green]Mastered Count:[/bold green] {mastered_count}")
+    if result.problems is None:
+        console.print(f"[bold green]Mastered Count:[/bold green] {result.count}")
     else:
-        if not mastered_problems:
+        if not result.problems:
             console.print("[yellow]No mastered problems yet.[/yellow]")
         else:
             table = Table(
-                title=f"Mastered Problems ({mastered_count})", title_justify="left"
+                title=f"Mastered Problems ({result.count})", title_justify="left"
             )
             table.add_column("ID", style="dim", no_wrap=True)
             table.add_column("Problem", style="cyan", no_wrap=True)
             table.add_column("Attempts", style="magenta")
             table.add_column("Mastered Date", style="green")
 
-            for name, attempts, mastered_date in mastered_problems:
-                leetcode_id = ""
-                if name in data and "leetcode_id" in data[name]:
-                    leetcode_id = f"#{data[name]['leetcode_id']}"
-                table.add_row(leetcode_id, name, str(attempts), mastered_date)
+            for p in result.problems:
+                leetcode_id = f"#{p.leetcode_id}" if p.leetcode_id is not None else ""
+                table.add_row(leetcode_id, p.name, str(p.attempts), p.mastered_date)
 
             console.print(table)
 
 
+def render_plain(result: AuditTriggered | MasteredResult) -> str:
+    if isinstance(result, AuditTriggered):
+        return render_audit_plain(result)
+    if result.problems is None:
+        return f"Mastered Count: {result.count}"
+    if not result.problems:
+        return "No mastered problems yet."
+
+    lines = [f"Mastered Problems ({result.count})"]
+    for p in result.problems:
+        leetcode_id = f"#{p.leetcode_id} " if p.leetcode_id is not None else ""
+        lines.append(f"{leetcode_id}{p.name}\t{p.attempts}\t{p.mastered_date}")
+    return "\n".join(lines)
+
+
 def get_mastered_problems():
     data = load_json(MASTERED_FILE)
     mastered = []
@@ -1,5 +1,6 @@
-from rich.console import Console
-from rich.panel import Panel
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from dataclasses import dataclass, field
 from srl.utils import today
 from srl.storage import (
     load_json,
@@ -9,9 +10,41 @@ from srl.storage import (
     MASTERED_FILE,
 )
 
+if TYPE_CHECKING:
+    from rich.console import Console
+
+
+@dataclass(slots=True)
+class Outcome:
+    name: str
+    # "added", "mastered_allowed", "queued", "in_progress", "mastered",
+    # "removed" or "not_found"
+    status: str
+
+    @property
+    def added(self) -> bool:
+        return self.status in ("added", "mastered_allowed")
+
+
+@dataclass(slots=True)
+class QueuedProblem:
+    name: str
+    leetcode_id: int | None
+
+
+@dataclass(slots=True)
+class NextUpResult:
+    action: str
+    name: str | None = None
+    file: str | None = None
+    outcomes: list[Outcome] = field(default_factory=list)
+    problems: list[QueuedProblem] | None = None
+    # "missing_name" or "file_not_found"
+    error: str | None = None
+
 
 def add_subparser(subparsers):
-    parser = subparsers.add_parser("nextup", help="Next up problem queue")
+    parser = subparsers.add_parser("nextup")
     parser.add_argument(
         "action",
         choices=["add", "list", "remove", "clear"],
@@ -30,110 +63,175 @@ def add_subparser(subparsers):
         action="store_true",
         help="Allow adding problems that are already mastered",
     )
-    parser.set_defaults(handler=handle)
+    parser.set_defaults(handler=handle, run=run, render_plain=render_plain)
     return parser
 
 
-def handle(args, console: Console):
+def run(args) -> NextUpResult:
+    result = NextUpResult(args.action, getattr(args, "name", None))
+    allow_mastered = getattr(args, "allow_mastered", False)
+
     if args.action == "add":
-        if hasattr(args, "file") and args.file:
+        if getattr(args, "file", None):
+            result.file = args.file
             try:
                 with open(args.file, "r") as f:
                     lines = [line.strip() for line in f.readlines()]
             except FileNotFoundError:
-                console.print(f"[bold red]File not found:[/bold red] {args.file}")
-                return
+                result.error = "file_not_found"
+                return result
 
-            added_count = 0
             for line in lines:
-                if not line:
-                    continue
-                added = add_to_next_up(
-                    line,
-                    console,
-                    hasattr(args, "allow_mastered") and args.allow_mastered,
-                )
-                if added:
-                    added_count += 1
+                if line:
+                    result.outcomes.append(add_to_next_up(line, allow_mastered))
+        elif not args.name:
+            result.error = "missing_name"
+        else:
+            result.outcomes.append(add_to_next_up(args.name, allow_mastered))
+    elif args.action == "list":
+        next_up_data = load_json(NEXT_UP_FILE)
+        result.problems = [
+            QueuedProblem(name, next_up_data[name].get("leetcode_id"))
+            for name in get_next_up_problems()
+        ]
+    elif args.action == "remove":
+        if not args.name:
+            result.error = "missing_name"
+        else:
+            result.outcomes.append(remove_from_next_up(args.name))
+    elif args.action == "clear":
+        clear_next_up()
+    return result
+
 
+def handle(args, console: Console):
+    render(run(args), console)
+
+
+def render(result: NextUpResult, console: Console):
+    from rich.panel import Panel
+
+    if result.error == "file_not_found":
+        console.print(f"[bold red]File not found:[/bold red] {result.file}")
+        return
+    if result.error == "missing_name":
+        target = "add to" if result.action == "add" else "remove from"
+        console.print(
+            f"[bold red]Please provide a problem name to {target} Next Up.[/bold red]"
+        )
+        return
+
+    for outcome in result.outcomes:
+        if outcome.status == "queued":
+            console.print(f'[yellow]"{outcome.name}" is already in the Next Up queue.[/yellow]')
+        elif outcome.status == "in_progress":
+            console.print(f'[yellow]"{outcome.name}" is already in progress.[/yellow]')
+        elif outcome.status == "mastered":
+            console.print(f'[yellow]"{outcome.name}" is already mastered.[/yellow]')
+        elif outcome.status == "mastered_allowed":
+            console.print(
+                f'[blue]"{outcome.name}" is mastered but will be added due to flag.[/blue]'
+            )
+        elif outcome.status == "not_found":
+            console.print(f'[yellow]"{outcome.name}" not found in the Next Up queue.[/yellow]')
+        elif outcome.status == "removed":
+            console.print(f"[green]Removed[/green] [bold]{outcome.name}[/bold] from Next Up Queue")
+
+    if result.action == "add":
+        if result.file:
+            added_count = sum(1 for outcome in result.outcomes if outcome.added)
             console.print(
-                f"[green]Added {added_count} problems from file[/green] [bold]{args.file}[/bold] to Next Up Queue"
+                f"[green]Added {added_count} problems from file[/green] [bold]{result.file}[/bold] to Next Up Queue"
             )
         else:
-            if not args.name:
-                console.print(
-                    "[bold red]Please provide a problem name to add to Next Up.[/bold red]"
-                )
-            else:
-                add_to_next_up(
-                    args.name,
-                    console,
-                    hasattr(args, "allow_mastered") and args.allow_mastered,
-                )
-                console.print(
-                    f"[green]Added[/green] [bold]{args.name}[/bold] to Next Up Queue"
-                )
-    elif args.action == "list":
-        next_up_data = load_json(NEXT_UP_FILE)
-        next_up = get_next_up_problems()
-        if next_up:
+            console.print(
+                f"[green]Added[/green] [bold]{result.name}[/bold] to Next Up Queue"
+            )
+    elif result.action == "list":
+        if result.problems:
             lines = []
-            for name in next_up:
+            for p in result.problems:
                 leetcode_id = ""
-                if name in next_up_data and "leetcode_id" in next_up_data[name]:
-                    leetcode_id = f"[dim]#{next_up_data[name]['leetcode_id']}[/dim] "
-                lines.append(f"• {leetcode_id}{name}")
+                if p.leetcode_id is not None:
+                    leetcode_id = f"[dim]#{p.leetcode_id}[/dim] "
+                lines.append(f"• {leetcode_id}{p.name}")
             
             console.print(
                 Panel.fit(
                     "\n".join(lines),
-                    title=f"[bold cyan]Next Up Problems ({len(next_up)})[/bold cyan]",
+                    title=f"[bold cyan]Next Up Problems ({len(result.problems)})[/bold cyan]",
                     border_style="cyan",
                     title_align="left",
                 )
             )
         else:
             console.print("[yellow]Next Up queue is empty.[/yellow]")
-    elif args.action == "remove":
-        if not args.name:
-            console.print(
-                "[bold red]Please provide a problem name to remove from Next Up.[/bold red]"
-            )
+    elif result.action == "clear":
+        console.print("[green]Next Up queue cleared.[/green]")
+
+
+def render_plain(result: NextUpResult) -> str:
+    if result.error == "file_not_found":
+        return f"File not found: {result.file}"
+    if result.error == "missing_name":
+        target = "add to" if result.action == "add" else "remove from"
+        return f"Please provide a problem name to {target} Next Up."
+
+    messages = {
+        "queued": '"{}" is already in the Next Up queue.',
+        "in_progress": '"{}" is already in progress.',
+        "mastered": '"{}" is already mastered.',
+        "mastered_allowed": '"{}" is mastered but will be added due to flag.',
+        "not_found": '"{}" not found in the Next Up queue.',
+        "removed": "Removed {} from Next Up Queue",
+    }
+    lines = [
+        messages[outcome.status].format(outcome.name)
+        for outcome in result.outcomes
+        if outcome.status in messages
+    ]
+    if result.action == "add":
+        if result.file:
+            added_count = sum(1 for outcome in result.outcomes if outcome.added)
+            lines.append(f"Added {added_count} problems from file {result.file} to Next Up Queue")
         else:
-            remove_from_next_up(args.name, console)
-    elif args.action == "clear":
-        clear_next_up(console)
+            lines.append(f"Added {result.name} to Next Up Queue")
+    elif result.action == "list":
+        if result.problems:
+            for p in result.problems:
+                leetcode_id = f"#{p.leetcode_id} " if p.leetcode_id is not None else ""
+                lines.append(f"{leetcode_id}{p.name}")
+        else:
+            lines.append("Next Up queue is empty.")
+    elif result.action == "clear":
+        lines.append("Next Up queue cleared.")
+    return "\n".join(lines)
 
 
-def add_to_next_up(name, console, allow_mastered=False) -> bool:
+def add_to_next_up(name, allow_mastered=False) -> Outcome:
     """
     Add a problem to Next Up queue if not already present, in progress, or mastered.
-    Returns True if added, False otherwise.
+    Returns the outcome; check `.added` to see whether it was queued.
     """
     next_up = load_json(NEXT_UP_FILE)
     in_progress = load_json(PROGRESS_FILE)
     mastered = load_json(MASTERED_FILE)
 
     if name in next_up:
-        console.print(f'[yellow]"{name}" is already in the Next Up queue.[/yellow]')
-        return False
+        return Outcome(name, "queued")
 
     if name in in_progress:
-        console.print(f'[yellow]"{name}" is already in progress.[/yellow]')
-        return False
+        return Outcome(name, "in_progress")
 
+    status = "added"
     if name in mastered:
-        if allow_mastered:
-            console.print(
-                f'[blue]"{name}" is mastered but will be added due to flag.[/blue]'
-            )
-        else:
-            console.print(f'[yellow]"{name}" is already mastered.[/yellow]')
-            return False
+        if not allow_mastered:
+            return Outcome(name, "mastered")
+        status = "mastered_allowed"
 
     next_up[name] = {"added": today().isoformat()}
     save_json(NEXT_UP_FILE, next_up)
-    return True
+    return Outcome(name, status)
 
 
 def get_next_up_problems() -> list[str]:
@@ -146,18 +244,16 @@ def get_next_up_problems() -> list[str]:
     return res
 
 
-def remove_from_next_up(name: str, console: Console):
+def remove_from_next_up(name: str) -> Outcome:
     data = load_json(NEXT_UP_FILE)
 
     if name not in data:
-        console.print(f'[yellow]"{name}" not found in the Next Up queue.[/yellow]')
-        return
+        return Outcome(name, "not_found")
 
     del data[name]
     save_json(NEXT_UP_FILE, data)
-    console.print(f"[green]Removed[/green] [bold]{name}[/bold] from Next Up Queue")
+    return Outcome(name, "removed")
 
 
-def clear_next_up(console: Console):
+def clear_next_up():
     save_json(NEXT_UP_FILE, {})
-    console.print("[green]Next Up queue cleared.[/green]")
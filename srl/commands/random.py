@@ -1,25 +1,33 @@
-from rich.console import Console
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from dataclasses import dataclass
 import random
 from srl.commands.list_ import get_due_problems
 from srl.storage import load_json, PROGRESS_FILE, MASTERED_FILE, NEXT_UP_FILE
 
+if TYPE_CHECKING:
+    from rich.console import Console
+
+
+@dataclass(slots=True)
+class RandomResult:
+    choice: str | None
+    all: bool
+
 
 def add_subparser(subparsers):
-    parser = subparsers.add_parser(
-        "random",
-        help="Pick a random due problem (use --all to pick from progress, mastered and next up)",
-    )
+    parser = subparsers.add_parser("random")
     parser.add_argument(
         "--all",
         action="store_true",
         dest="all",
         help="Pick a random problem from all problems (progress, mastered, next up)",
     )
-    parser.set_defaults(handler=handle)
+    parser.set_defaults(handler=handle, run=run, render_plain=render_plain)
     return parser
 
 
-def handle(args, console: Console):
+def run(args) -> RandomResult:
     # If --all requested, aggregate from all storage files (progress, mastered, next_up)
     if getattr(args, "all", False):
         progress = load_json(PROGRESS_FILE)
@@ -35,19 +43,27 @@ def handle(args, console: Console):
             names.update(next_up.keys())
 
         names = list(names)
-        if not names:
-            console.print("[bold green]No problems available to pick from.[/bold green]")
-            return
-
-        choice = random.choice(names)
-        console.print(f"[bold blue]Random problem (all):[/bold blue] [cyan]{choice}[/cyan]")
-        return
+        return RandomResult(random.choice(names) if names else None, True)
 
     # default behaviour: pick from due problems (falls back to Next Up)
     problems = get_due_problems()
-    if not problems:
+    return RandomResult(random.choice(problems) if problems else None, False)
+
+
+def handle(args, console: Console):
+    render(run(args), console)
+
+
+def render(result: RandomResult, console: Console):
+    if result.choice is None:
         console.print("[bold green]No problems available to pick from.[/bold green]")
-        return
+    elif result.all:
+        console.print(f"[bold blue]Random problem (all):[/bold blue] [cyan]{result.choice}[/cyan]")
+    else:
+        console.print(f"[bold blue]Random problem:[/bold blue] [cyan]{result.choice}[/cyan]")
+
 
-    choice = random.choice(problems)
-    console.print(f"[bold blue]Random problem:[/bold blue] [cyan]{choice}[/cyan]")
+def render_plain(result: RandomResult) -> str:
+    if result.choice is None:
+        return "No problems available to pick from."
+    return result.choice
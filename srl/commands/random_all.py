@@ -1,33 +1,24 @@
-from rich.console import Console
-import random
-from srl.storage import load_json, PROGRESS_FILE, MASTERED_FILE, NEXT_UP_FILE
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from types import SimpleNamespace
+from srl.commands import random
+from srl.commands.random import RandomResult, render, render_plain
+
+if TYPE_CHECKING:
+    from rich.console import Console
 
 
 def add_subparser(subparsers):
     parser = subparsers.add_parser(
         "random_all", help="Pick a random problem from all problems (progress, mastered, next up)"
     )
-    parser.set_defaults(handler=handle)
+    parser.set_defaults(handler=handle, run=run, render_plain=render_plain)
     return parser
 
 
-def handle(args, console: Console):
-    progress = load_json(PROGRESS_FILE)
-    mastered = load_json(MASTERED_FILE)
-    next_up = load_json(NEXT_UP_FILE)
-
-    names = set()
-    if isinstance(progress, dict):
-        names.update(progress.keys())
-    if isinstance(mastered, dict):
-        names.update(mastered.keys())
-    if isinstance(next_up, dict):
-        names.update(next_up.keys())
+def run(args) -> RandomResult:
+    return random.run(SimpleNamespace(all=True))
 
-    names = list(names)
-    if not names:
-        console.print("[bold green]No problems available to pick from.[/bold green]")
-        return
 
-    choice = random.choice(names)
-    console.print(f"[bold blue]Random problem (all):[/bold blue] [cyan]{choice}[/cyan]")
+def handle(args, console: Console):
+    render(run(args), console)
@@ -1,13 +1,26 @@
-from rich.console import Console
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from dataclasses import dataclass
 from srl.storage import (
     load_json,
     save_json,
     PROGRESS_FILE,
 )
 
+if TYPE_CHECKING:
+    from rich.console import Console
+
+
+@dataclass(slots=True)
+class RemoveResult:
+    # "removed", "not_found", "invalid_number" or "invalid_args"
+    status: str
+    name: str | None = None
+    number: int | None = None
+
 
 def add_subparser(subparsers):
-    parser = subparsers.add_parser("remove", help="Remove a problem from in-progress")
+    parser = subparsers.add_parser("remove")
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument(
         "name", nargs="?", type=str, help="Name of the problem to remove"
@@ -15,11 +28,11 @@ def add_subparser(subparsers):
     group.add_argument(
         "-n", "--number", type=int, help="Problem number from `srl inprogress`"
     )
-    parser.set_defaults(handler=handle)
+    parser.set_defaults(handler=handle, run=run, render_plain=render_plain)
     return parser
 
 
-def handle(args, console: Console):
+def run(args) -> RemoveResult:
     data = load_json(PROGRESS_FILE)
     name = getattr(args, "name", None)
 
@@ -27,22 +40,44 @@ def handle(args, console: Console):
         names = list(data.keys())
 
         if args.number < 1 or args.number > len(names):
-            console.print(f"[red]Invalid problem number:[/red] {args.number}")
-            return
+            return RemoveResult("invalid_number", number=args.number)
 
         name = names[args.number - 1]
 
     if not name:
-        console.print("[red]Invalid args[/red]")
-        return
+        return RemoveResult("invalid_args")
 
     if name in data:
         del data[name]
         save_json(PROGRESS_FILE, data)
+        return RemoveResult("removed", name)
+    return RemoveResult("not_found", name)
+
+
+def handle(args, console: Console):
+    render(run(args), console)
+
+
+def render(result: RemoveResult, console: Console):
+    if result.status == "invalid_number":
+        console.print(f"[red]Invalid problem number:[/red] {result.number}")
+    elif result.status == "invalid_args":
+        console.print("[red]Invalid args[/red]")
+    elif result.status == "removed":
         console.print(
-            f"[green]Removed[/green] '[cyan]{name}[/cyan]' [green]from in-progress.[/green]"
+            f"[green]Removed[/green] '[cyan]{result.name}[/cyan]' [green]from in-progress.[/green]"
         )
     else:
         console.print(
-            f"[red]Problem[/red] '[cyan]{name}[/cyan]' [red]not found in in-progress.[/red]"
+            f"[red]Problem[/red] '[cyan]{result.name}[/cyan]' [red]not found in in-progress.[/red]"
         )
+
+
+def render_plain(result: RemoveResult) -> str:
+    if result.status == "invalid_number":
+        return f"Invalid problem number: {result.number}"
+    if result.status == "invalid_args":
+        return "Invalid args"
+    if result.status == "removed":
+        return f"Removed '{result.name}' from in-progress."
+    return f"Problem '{result.name}' not found in in-progress."
@@ -1,14 +1,65 @@
+from pathlib import Path
 from rich.console import Console
 
 
 def add_subparser(subparsers):
-    parser = subparsers.add_parser("server", help="Run HTTP server to expose CLI")
+    parser = subparsers.add_parser("server")
     parser.add_argument("--host", default="127.0.0.1", help="Host to bind to")
     parser.add_argument("--port", type=int, default=8080, help="Port to listen on")
     parser.add_argument(
         "--reload", action="store_true", help="Enable auto-reload (dev)"
     )
     parser.add_argument("--public", action="store_true", help="Alias: bind to 0.0.0.0")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker threads for running commands (default: 4, or $SRL_SERVER_WORKERS)",
+    )
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=None,
+        help="Requests allowed to wait for a worker before returning 503 "
+        "(default: 32, or $SRL_SERVER_MAX_QUEUE)",
+    )
+    parser.add_argument(
+        "--in-memory",
+        action="store_true",
+        help="Serve data from memory and write changes to disk in the background",
+    )
+    parser.add_argument(
+        "--flush-interval",
+        type=float,
+        default=None,
+        help="With --in-memory: seconds changes may wait before being written "
+        "(default: 1.0, or $SRL_FLUSH_INTERVAL; 0 writes every change immediately)",
+    )
+    parser.add_argument(
+        "--no-metrics",
+        action="store_true",
+        help="Don't collect metrics or serve GET /metrics",
+    )
+    parser.add_argument(
+        "--users-dir",
+        type=Path,
+        default=None,
+        help="Serve several learners: a request naming a user (X-SRL-User header "
+        "or /u/<user>/ path prefix) uses USERS_DIR/<user> as its data directory",
+    )
+    parser.add_argument(
+        "--max-users",
+        type=int,
+        default=None,
+        help="With --users-dir and --in-memory: user stores kept open (default: 256)",
+    )
+    parser.add_argument(
+        "--max-memory",
+        type=int,
+        default=None,
+        help="With --users-dir and --in-memory: MB of user data kept open "
+        "(default: 256)",
+    )
     parser.set_defaults(handler=handle)
     return parser
 
@@ -20,4 +71,17 @@ def handle(args, console: Console):
     msg = f"Starting server on {host}:{args.port} (reload={bool(args.reload)})"
     console.print(msg)
 
-    run_server(host=host, port=args.port, reload=bool(args.reload))
+    max_memory = getattr(args, "max_memory", None)
+    run_server(
+        host=host,
+        port=args.port,
+        reload=bool(args.reload),
+        workers=getattr(args, "workers", None),
+        max_queue=getattr(args, "max_queue", None),
+        in_memory=getattr(args, "in_memory", False),
+        flush_interval=getattr(args, "flush_interval", None),
+        collect_metrics=not getattr(args, "no_metrics", False),
+        users_dir=getattr(args, "users_dir", None),
+        max_users=getattr(args, "max_users", None),
+        max_memory=max_memory and max_memory * 1024 * 1024,
+    )
@@ -1,14 +1,31 @@
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from dataclasses import dataclass, field
 from srl.storage import load_json, PROGRESS_FILE, MASTERED_FILE
 from srl.commands.list_ import get_due_problems
 from datetime import datetime, timedelta
 from srl.utils import today
 
+if TYPE_CHECKING:
+    from rich.console import Console
+
+
+@dataclass(slots=True)
+class ShowResult:
+    name: str | None
+    status: str | None = None  # "In Progress" or "Mastered"
+    leetcode_id: int | None = None
+    next_review: str | None = None
+    days_until: int | None = None
+    history: list[dict] = field(default_factory=list)
+    compact: bool = False
+    # "unknown_id", "invalid_number" or "not_found"
+    error: str | None = None
+    query: int | None = None
+
 
 def add_subparser(subparsers):
-    parser = subparsers.add_parser("show", help="Show problem history and notes")
+    parser = subparsers.add_parser("show")
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument("name", nargs="?", type=str, help="Name of the problem")
     group.add_argument(
@@ -20,26 +37,22 @@ def add_subparser(subparsers):
     parser.add_argument(
         "--compact", action="store_true", help="Show compact view with notes/mistakes/time only"
     )
-    parser.set_defaults(handler=handle)
+    parser.set_defaults(handler=handle, run=run, render_plain=render_plain)
     return parser
 
 
-def handle(args, console: Console):
+def run(args) -> ShowResult:
     # Show is a specific lookup, not browsing - don't trigger audits
     
     # Determine problem name
     if hasattr(args, "leetcode_id") and args.leetcode_id is not None:
         name = find_by_leetcode_id(args.leetcode_id)
         if not name:
-            console.print(
-                f"[bold red]No problem found with LeetCode ID {args.leetcode_id}[/bold red]"
-            )
-            return
+            return ShowResult(None, error="unknown_id", query=args.leetcode_id)
     elif hasattr(args, "number") and args.number is not None:
         problems = get_due_problems()
         if args.number > len(problems) or args.number <= 0:
-            console.print(f"[bold red]Invalid problem number: {args.number}[/bold red]")
-            return
+            return ShowResult(None, error="invalid_number", query=args.number)
         name = problems[args.number - 1]
     else:
         name = args.name
@@ -68,55 +81,80 @@ def handle(args, console: Console):
                 break
     
     if not problem_data:
-        console.print(f"[bold red]Problem '{name}' not found[/bold red]")
+        return ShowResult(name, error="not_found")
+
+    history = problem_data.get("history", [])
+    result = ShowResult(
+        name,
+        status,
+        problem_data.get("leetcode_id"),
+        history=history,
+        compact=bool(getattr(args, "compact", False)),
+    )
+
+    # Calculate next review date if in progress
+    if status == "In Progress" and history:
+        last_entry = history[-1]
+        last_date = datetime.fromisoformat(last_entry["date"]).date()
+        next_date = last_date + timedelta(days=last_entry["rating"])
+        result.next_review = next_date.isoformat()
+        result.days_until = (next_date - today()).days
+    return result
+
+
+def handle(args, console: Console):
+    render(run(args), console)
+
+
+def render(result: ShowResult, console: Console):
+    from rich.table import Table
+
+    if result.error == "unknown_id":
+        console.print(
+            f"[bold red]No problem found with LeetCode ID {result.query}[/bold red]"
+        )
+        return
+    if result.error == "invalid_number":
+        console.print(f"[bold red]Invalid problem number: {result.query}[/bold red]")
+        return
+    if result.error == "not_found":
+        console.print(f"[bold red]Problem '{result.name}' not found[/bold red]")
         return
     
     # Display problem header
-    leetcode_id = problem_data.get("leetcode_id", "")
-    header = f"Problem: {name}"
-    if leetcode_id:
-        header += f" (#{leetcode_id})"
+    header = f"Problem: {result.name}"
+    if result.leetcode_id:
+        header += f" (#{result.leetcode_id})"
+    status_style = "green" if result.status == "Mastered" else "yellow"
     
     console.print()
     console.print(f"[bold cyan]{header}[/bold cyan]")
-    console.print(f"Status: [{'green' if status == 'Mastered' else 'yellow'}]{status}[/{'green' if status == 'Mastered' else 'yellow'}]")
+    console.print(f"Status: [{status_style}]{result.status}[/{status_style}]")
     
-    # Calculate next review date if in progress
-    if status == "In Progress":
-        history = problem_data.get("history", [])
-        if history:
-            last_entry = history[-1]
-            last_date = datetime.fromisoformat(last_entry["date"]).date()
-            next_date = last_date + timedelta(days=last_entry["rating"])
-            days_until = (next_date - today()).days
-            
-            if days_until > 0:
-                console.print(f"Next Review: [cyan]{next_date.isoformat()}[/cyan] (in {days_until} day{'s' if days_until != 1 else ''})")
-            elif days_until == 0:
-                console.print(f"Next Review: [yellow]Today[/yellow]")
-            else:
-                console.print(f"Next Review: [red]Overdue by {abs(days_until)} day{'s' if abs(days_until) != 1 else ''}[/red]")
+    days_until = result.days_until
+    if days_until is not None:
+        if days_until > 0:
+            console.print(f"Next Review: [cyan]{result.next_review}[/cyan] (in {days_until} day{'s' if days_until != 1 else ''})")
+        elif days_until == 0:
+            console.print(f"Next Review: [yellow]Today[/yellow]")
+        else:
+            console.print(f"Next Review: [red]Overdue by {abs(days_until)} day{'s' if abs(days_until) != 1 else ''}[/red]")
     
     console.print()
     
     # Create table for history
-    history = problem_data.get("history", [])
+    history = result.history
     if not history:
         console.print("[yellow]No history available[/yellow]")
         return
     
     # Compact view
-    if hasattr(args, "compact") and args.compact:
+    if result.compact:
         console.print(f"[bold dim]Showing attempts with notes/mistakes only[/bold dim]")
         console.print()
         
         last_date = None
-        attempts_with_notes = []
-        
-        # First pass: collect attempts with notes/mistakes and track original indices
-        for i, entry in enumerate(history, 1):
-            if entry.get("note") or entry.get("mistake"):
-                attempts_with_notes.append((i, entry))
+        attempts_with_notes = annotated_attempts(history)
         
         if not attempts_with_notes:
             console.print("[dim]No attempts with notes or mistakes to show[/dim]")
@@ -130,13 +168,7 @@ def handle(args, console: Console):
             if current_date != last_date:
                 if last_date is not None:
                     console.print()
-                # Make date more readable
-                try:
-                    date_obj = datetime.fromisoformat(current_date)
-                    formatted_date = date_obj.strftime("%b %d, %Y")
-                except:
-                    formatted_date = current_date
-                console.print(f"[bold blue]📅 {formatted_date}[/bold blue]")
+                console.print(f"[bold blue]📅 {format_date(current_date)}[/bold blue]")
                 last_date = current_date
             
             # Build attempt header with better spacing
@@ -209,6 +241,53 @@ def handle(args, console: Console):
     console.print()
 
 
+def render_plain(result: ShowResult) -> str:
+    if result.error == "unknown_id":
+        return f"No problem found with LeetCode ID {result.query}"
+    if result.error == "invalid_number":
+        return f"Invalid problem number: {result.query}"
+    if result.error == "not_found":
+        return f"Problem '{result.name}' not found"
+
+    header = f"Problem: {result.name}"
+    if result.leetcode_id:
+        header += f" (#{result.leetcode_id})"
+    lines = [header, f"Status: {result.status}"]
+    if result.days_until is not None:
+        lines.append(f"Next Review: {result.next_review}")
+    if not result.history:
+        lines.append("No history available")
+        return "\n".join(lines)
+
+    attempts = (
+        annotated_attempts(result.history)
+        if result.compact
+        else list(enumerate(result.history, 1))
+    )
+    for i, entry in attempts:
+        time_str = f"{entry['time_spent']}m" if entry.get("time_spent") else ""
+        fields = [str(i), entry["date"], str(entry["rating"]), time_str]
+        fields += [entry.get("note", ""), entry.get("mistake", "")]
+        lines.append("\t".join(fields))
+    return "\n".join(lines)
+
+
+def annotated_attempts(history: list[dict]) -> list[tuple[int, dict]]:
+    """(1-based attempt number, entry) for attempts with a note or mistake."""
+    return [
+        (i, entry)
+        for i, entry in enumerate(history, 1)
+        if entry.get("note") or entry.get("mistake")
+    ]
+
+
+def format_date(day_str: str) -> str:
+    try:
+        return datetime.fromisoformat(day_str).strftime("%b %d, %Y")
+    except ValueError:
+        return day_str
+
+
 def find_by_leetcode_id(leetcode_id):
     """Find problem name by LeetCode ID in progress or mastered"""
     progress_data = load_json(PROGRESS_FILE)
@@ -1,8 +1,21 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from dataclasses import dataclass
 from types import SimpleNamespace
-from rich.console import Console
-from srl.commands import add, list_
+from srl.commands import list_
 import argparse
 
+if TYPE_CHECKING:
+    from rich.console import Console
+    from srl.commands.add import AddResult
+
+
+@dataclass(slots=True)
+class TakeResult:
+    problem: str | None
+    added: AddResult | None = None
+    error: str | None = None
+
 
 def add_subparser(subparsers):
     def positive_int(value):
@@ -11,7 +24,7 @@ def add_subparser(subparsers):
             raise argparse.ArgumentTypeError(f"{value} is not a positive integer")
         return ivalue
 
-    parser = subparsers.add_parser("take", help="Output a problem by index")
+    parser = subparsers.add_parser("take")
     parser.add_argument(
         "index", type=positive_int, help="Index of the problem to output"
     )
@@ -25,11 +38,11 @@ def add_subparser(subparsers):
     parser.add_argument(
         "rating", type=int, choices=range(1, 6), nargs="?", help="Rating from 1-5"
     )
-    parser.set_defaults(handler=handle)
+    parser.set_defaults(handler=handle, run=run, render_plain=render_plain)
     return parser
 
 
-def handle(args, console: Console):
+def run(args) -> TakeResult:
     index: int = abs(args.index)
     problem = None
     due_problems = list_.get_due_problems()
@@ -38,16 +51,41 @@ def handle(args, console: Console):
         problem = due_problems[index - 1]
 
     if not problem:
-        return
+        return TakeResult(None)
 
     if args.action == "add":
         if args.rating is None:
-            console.print(
-                "[red]Error: rating must be provided when action is 'add'[/red]"
+            return TakeResult(
+                problem, error="rating must be provided when action is 'add'"
             )
-            return
-        add.handle(
-            SimpleNamespace(name=problem, rating=args.rating), console
+        from srl.commands import add
+
+        return TakeResult(
+            problem, add.run(SimpleNamespace(name=problem, rating=args.rating))
         )
-    else:
-        console.print(problem)
+    return TakeResult(problem)
+
+
+def handle(args, console: Console):
+    render(run(args), console)
+
+
+def render(result: TakeResult, console: Console):
+    if result.error:
+        console.print(f"[red]Error: {result.error}[/red]")
+    elif result.added:
+        from srl.commands import add
+
+        add.render(result.added, console)
+    elif result.problem:
+        console.print(result.problem)
+
+
+def render_plain(result: TakeResult) -> str:
+    if result.error:
+        return f"Error: {result.error}"
+    if result.added:
+        from srl.commands import add
+
+        return add.render_plain(result.added)
+    return result.problem or ""
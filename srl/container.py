@@ -0,0 +1,273 @@
+"""
+Seekable backup container (`srl export --file-format srlb`, *.srlb).
+
+An export is laid out as separate sections, so one can be read without
+parsing the others:
+
+    MAGIC
+    section bytes...   one compact JSON value per section, back to back
+    index              JSON: the export's header fields, plus each section's
+                       name, offset, length, entry count and CRC-32
+    trailer            index offset (8 bytes), index length (4), MAGIC
+
+The index sits at the end so the container is written in one forward pass
+like the other formats, and can be streamed to stdout or over HTTP. Readers
+seek to the trailer, read the index, then seek straight to the sections they
+want; each section's checksum is verified before it is parsed, so a
+corrupted section is reported without reading the rest of the file.
+"""
+import io
+import json
+import struct
+import zlib
+from typing import BinaryIO, Iterator
+from srl.jsonstream import JSONStream, JSONWriter
+
+MAGIC = b"SRLB"
+VERSION = 1
+TRAILER = struct.Struct(">QI4s")
+
+# Read size while checksumming a section
+VERIFY_CHUNK = 1 << 20
+
+
+class ContainerError(Exception):
+    """The file isn't a readable container, or a section is corrupted."""
+
+
+class ContainerWriter:
+    """
+    JSONWriter's interface, laying an export document out as a container:
+    top-level members go in the index, each member of "data" becomes a
+    section.
+    """
+
+    def __init__(self, write):
+        self.write = write
+        self.size = 0
+        self._fields = {}
+        self._sections = []
+        self._depth = 0
+        self._section = None  # JSONWriter of the open problem section
+        self._emit(MAGIC)
+
+    def begin_object(self, key: str | None = None):
+        self._depth += 1
+        if self._depth == 3:
+            self._start(key)
+            self._section.begin_object()
+        elif self._depth > 3:
+            self._section.begin_object(key)
+
+    def member(self, key: str, value):
+        if self._depth == 1:
+            self._fields[key] = value
+        elif self._depth == 2:
+            # A section written whole (config, audit)
+            self._start(key)
+            self._section_write(
+                json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+            )
+            count = len(value.get("history", [])) if key == "audit" else len(value)
+            self._finish(count)
+        else:
+            if self._depth == 3:
+                self._sections[-1]["count"] += 1
+            self._section.member(key, value)
+
+    def end_object(self):
+        if self._depth == 3:
+            self._section.end_object()
+            self._finish(self._sections[-1]["count"])
+        elif self._depth > 3:
+            self._section.end_object()
+        elif self._depth == 1:
+            self._write_index()
+        self._depth -= 1
+
+    def _start(self, name: str):
+        self._sections.append(
+            {"name": name, "offset": self.size, "length": 0, "count": 0, "crc32": 0}
+        )
+        self._section = JSONWriter(self._section_write, compact=True)
+
+    def _section_write(self, data: bytes):
+        section = self._sections[-1]
+        section["length"] += len(data)
+        section["crc32"] = zlib.crc32(data, section["crc32"])
+        self._emit(data)
+
+    def _finish(self, count: int):
+        self._sections[-1]["count"] = count
+        self._section = None
+
+    def _write_index(self):
+        index = {"container": VERSION, **self._fields, "sections": self._sections}
+        data = json.dumps(index, ensure_ascii=False).encode()
+        offset = self.size
+        self._emit(data)
+        self._emit(TRAILER.pack(offset, len(data), MAGIC))
+
+    def _emit(self, data: bytes):
+        self.size += len(data)
+        self.write(data)
+
+
+def read_index(f: BinaryIO) -> dict:
+    """The index of the container open in f (binary, seekable)."""
+    try:
+        f.seek(-TRAILER.size, io.SEEK_END)
+        offset, length, magic = TRAILER.unpack(f.read(TRAILER.size))
+    except (OSError, struct.error):
+        raise ContainerError("Truncated container: no trailer") from None
+    if magic != MAGIC:
+        raise ContainerError("Truncated container: no trailer")
+    f.seek(offset)
+    try:
+        return json.loads(f.read(length))
+    except ValueError:
+        raise ContainerError("Corrupted container index") from None
+
+
+class ContainerStream:
+    """
+    JSONStream's interface over a container: the document it presents is
+    the index's header fields plus "data", whose members are the sections.
+    A section is only read when its value is asked for; skipping it costs
+    nothing.
+    """
+
+    def __init__(self, f: BinaryIO, index: dict | None = None):
+        self.f = f
+        self.index = index if index is not None else read_index(f)
+        self.sections = {s["name"]: s for s in self.index.get("sections", [])}
+        fields = self._fields()
+        data = {name: _Section(meta) for name, meta in self.sections.items()}
+        self._pending = {**fields, "data": data}
+        self._inner: JSONStream | None = None  # the section being walked
+
+    def summary(self) -> dict:
+        """scan_import_file()'s summary, from the index alone."""
+        fields = self._fields()
+        fields["data"] = {name: s["count"] for name, s in self.sections.items()}
+        return fields
+
+    def verify(self, names=None):
+        """Check the named sections (all by default) against their checksums."""
+        bad = [
+            name
+            for name in (self.sections if names is None else names)
+            if name in self.sections and not self._intact(self.sections[name])
+        ]
+        if bad:
+            raise ContainerError(f"Corrupted sections: {', '.join(bad)}")
+
+    def value(self):
+        if self._inner is not None:
+            return self._inner.value()
+        return self._resolve(self._take())
+
+    def skip(self):
+        if self._inner is not None:
+            self._inner.skip()
+        else:
+            self._take()
+
+    def members(self) -> Iterator[str]:
+        if self._inner is not None:
+            yield from self._inner.members()
+            return
+        obj = self._take()
+        if isinstance(obj, _Section):
+            self._inner = self._open(obj.meta)
+            try:
+                yield from self._inner.members()
+            finally:
+                self._inner = None
+            return
+        for key, value in obj.items():
+            self._pending = value
+            yield key
+
+    def items(self) -> Iterator[None]:
+        if self._inner is not None:
+            yield from self._inner.items()
+            return
+        for value in self._resolve(self._take()):
+            self._pending = value
+            yield None
+
+    def peek(self) -> str | None:
+        if self._inner is not None:
+            return self._inner.peek()
+        obj = self._pending
+        if obj is _EMPTY:
+            return None
+        if isinstance(obj, (dict, _Section)):
+            return "{"
+        return json.dumps(obj)[:1]
+
+    def _fields(self) -> dict:
+        return {
+            key: value
+            for key, value in self.index.items()
+            if key not in ("container", "sections")
+        }
+
+    def _take(self):
+        obj, self._pending = self._pending, _EMPTY
+        return obj
+
+    def _resolve(self, obj):
+        if isinstance(obj, _Section):
+            return self._open(obj.meta).value()
+        if isinstance(obj, dict):
+            return {key: self._resolve(value) for key, value in obj.items()}
+        return obj
+
+    def _open(self, meta: dict) -> JSONStream:
+        if not self._intact(meta):
+            raise ContainerError(f"Corrupted section: {meta['name']}")
+        self.f.seek(meta["offset"])
+        section = io.BufferedReader(_Slice(self.f, meta["length"]))
+        text = io.TextIOWrapper(section, encoding="utf-8")
+        return JSONStream(text)
+
+    def _intact(self, meta: dict) -> bool:
+        self.f.seek(meta["offset"])
+        remaining = meta["length"]
+        crc = 0
+        while remaining:
+            data = self.f.read(min(VERIFY_CHUNK, remaining))
+            if not data:
+                return False
+            crc = zlib.crc32(data, crc)
+            remaining -= len(data)
+        return crc == meta["crc32"]
+
+
+_EMPTY = object()
+
+
+class _Section:
+    __slots__ = ("meta",)
+
+    def __init__(self, meta: dict):
+        self.meta = meta
+
+
+class _Slice(io.RawIOBase):
+    """The next `length` bytes of f, as a file of their own."""
+
+    def __init__(self, f: BinaryIO, length: int):
+        self.f = f
+        self.remaining = length
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self.f.read(min(len(buffer), self.remaining))
+        buffer[: len(data)] = data
+        self.remaining -= len(data)
+        return len(data)
@@ -0,0 +1,155 @@
+import contextlib
+import json
+import os
+import socket
+import traceback
+from rich.console import Console
+from srl.cli import build_parser, dispatch, preload
+from srl.client import FORWARDED_COMMANDS, socket_path
+from srl.storage import ensure_data_dir
+
+# Seconds a client may take to send its request (or accept output) before
+# the daemon drops it; connections are served one at a time
+CLIENT_TIMEOUT = 10
+
+
+class FrameWriter:
+    """File-like object that streams text to the client as JSON frames."""
+
+    def __init__(self, conn: socket.socket, stream: str):
+        self.conn = conn
+        self.stream = stream
+
+    def write(self, text: str) -> int:
+        if text:
+            send(self.conn, {self.stream: text})
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def isatty(self) -> bool:
+        return False
+
+
+def send(conn: socket.socket, frame: dict):
+    conn.sendall(json.dumps(frame).encode() + b"\n")
+
+
+def color_system(env: dict) -> str | None:
+    if "NO_COLOR" in env:
+        return None
+    if env.get("COLORTERM", "").lower() in ("truecolor", "24bit"):
+        return "truecolor"
+    if "256" in env.get("TERM", ""):
+        return "256"
+    return "standard"
+
+
+def run_command(conn: socket.socket, req: dict, parser) -> int:
+    """Parse and run one forwarded command, streaming its output."""
+    argv = req.get("argv") or []
+    if not argv or argv[0] not in FORWARDED_COMMANDS:
+        send(conn, {"err": "srl daemon: command not served by the daemon\n"})
+        return 2
+
+    out = FrameWriter(conn, "out")
+    err = FrameWriter(conn, "err")
+    env = req.get("env", {})
+    tty = bool(req.get("tty"))
+    console = Console(
+        file=out,
+        width=req.get("width") or 80,
+        force_terminal=tty,
+        color_system=color_system(env) if tty else None,
+    )
+
+    try:
+        os.chdir(req.get("cwd") or os.getcwd())
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            ensure_data_dir()
+            args = parser.parse_args(argv)
+            dispatch(parser, args, console, out)
+    except SystemExit as e:
+        # argparse errors and handlers exiting end the request, not the daemon
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        err.write(f"{e.code}\n")
+        return 1
+    except Exception:
+        err.write(traceback.format_exc())
+        return 1
+    return 0
+
+
+def handle_connection(conn: socket.socket, parser) -> bool:
+    """Serve one request. Returns False when the daemon should stop."""
+    with conn, conn.makefile("r", encoding="utf-8") as reader:
+        line = reader.readline()
+        if not line:
+            return True
+        req = json.loads(line)
+        op = req.get("op")
+
+        if op == "ping":
+            send(conn, {"out": f"srl daemon running (pid {os.getpid()})\n"})
+            send(conn, {"exit": 0})
+        elif op == "stop":
+            send(conn, {"out": "srl daemon stopped\n"})
+            send(conn, {"exit": 0})
+            return False
+        elif op == "run":
+            send(conn, {"exit": run_command(conn, req, parser)})
+        else:
+            send(conn, {"err": f"srl daemon: unknown op {op!r}\n"})
+            send(conn, {"exit": 2})
+    return True
+
+
+def is_running() -> bool:
+    from srl import client
+
+    try:
+        for frame in client.request({"op": "ping"}, timeout=1):
+            if "exit" in frame:
+                return frame["exit"] == 0
+    except OSError:
+        pass
+    return False
+
+
+def serve():
+    """Accept forwarded commands on the daemon socket until stopped."""
+    ensure_data_dir()
+    path = socket_path()
+    if path.exists():
+        if is_running():
+            raise RuntimeError(f"srl daemon already running on {path}")
+        path.unlink()
+
+    # Warm the parser and every forwarded command module up front
+    parser = build_parser()
+    preload(parser, FORWARDED_COMMANDS)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o077)
+    try:
+        server.bind(str(path))
+    finally:
+        os.umask(old_umask)
+    server.listen(16)
+
+    try:
+        while True:
+            conn, _ = server.accept()
+            # An idle or stalled client mustn't hold up everyone queued behind it
+            conn.settimeout(CLIENT_TIMEOUT)
+            try:
+                if not handle_connection(conn, parser):
+                    break
+            except (OSError, ValueError):
+                continue  # client went away, timed out or sent garbage
+    finally:
+        server.close()
+        with contextlib.suppress(FileNotFoundError):
+            path.unlink()
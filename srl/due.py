@@ -0,0 +1,91 @@
+import os
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from srl import storage
+
+# Kept free of Rich (and of srl.commands) so `srl due-count` stays a few
+# milliseconds from a cold start.
+
+
+def due_dates(progress: dict) -> dict[str, int]:
+    """Number of in-progress problems falling due on each date."""
+    counts = {}
+    for info in progress.values():
+        history = info.get("history")
+        if not history:
+            continue
+        last = history[-1]
+        if "date" not in last:
+            continue  # never falls due
+        last_date = datetime.fromisoformat(last["date"]).date()
+        due = (last_date + timedelta(days=last["rating"])).isoformat()
+        counts[due] = counts.get(due, 0) + 1
+    return counts
+
+
+def progress_signature(progress_file: Path | None = None) -> str:
+    try:
+        st = (progress_file or storage.resolve(storage.PROGRESS_FILE)).stat()
+    except FileNotFoundError:
+        return "0 0"
+    return f"{st.st_mtime_ns} {st.st_size}"
+
+
+def write_index(
+    progress: dict,
+    today: date | None = None,
+    progress_file: Path | None = None,
+    signature: str | None = None,
+):
+    """
+    Write DUE_FILE: a first line "<date> <due count> <progress signature>"
+    followed by one "<date> <count>" line per upcoming due date, so the count
+    can roll over at midnight without re-reading the progress file.
+
+    The index goes next to progress_file (the current data root's progress
+    file by default). `signature` is the progress signature `progress` was
+    read at; callers take it before reading, so a write racing them leaves
+    the index stale rather than wrong.
+    """
+    progress_file = progress_file or storage.resolve(storage.PROGRESS_FILE)
+    due_file = progress_file.with_name(storage.DUE_FILE.name)
+    today_str = (today or date.today()).isoformat()
+    due = 0
+    upcoming = []
+    for day, count in sorted(due_dates(progress).items()):
+        if day <= today_str:
+            due += count
+        else:
+            upcoming.append(f"{day} {count}\n")
+    tmp = due_file.with_name(
+        f".{due_file.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+    if signature is None:
+        signature = progress_signature(progress_file)
+    tmp.write_text(f"{today_str} {due} {signature}\n" + "".join(upcoming))
+    tmp.replace(due_file)
+
+
+def read_count(today: date | None = None) -> int:
+    """Number of problems due today, from DUE_FILE when it is current."""
+    today_str = (today or date.today()).isoformat()
+    try:
+        lines = storage.resolve(storage.DUE_FILE).read_text().splitlines()
+        stamp, due, signature = lines[0].split(" ", 2)
+        due = int(due)
+    except (FileNotFoundError, IndexError, ValueError):
+        signature = None
+    current = progress_signature()
+    if signature != current:
+        # Missing, unreadable, or progress was edited behind our back
+        write_index(storage.load_json(storage.PROGRESS_FILE), today, signature=current)
+        return read_count(today)
+
+    if stamp != today_str:
+        for line in lines[1:]:
+            day, count = line.split()
+            if day > today_str:
+                break
+            due += int(count)
+    return due
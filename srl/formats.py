@@ -0,0 +1,209 @@
+"""
+Export file formats: plain JSON, gzip- or zstd-compressed JSON, msgpack, and
+the seekable srlb container (see srl.container).
+
+Writers encode the chunks srl.commands.export produces; readers sniff a
+file's leading magic bytes, so `srl import` needs no flag to tell them apart.
+Compressed JSON is streamed through the compressor in both directions. A
+msgpack map carries its length up front, so msgpack exports are assembled in
+memory (as packed bytes) and msgpack imports are decoded whole.
+
+zstd needs the `zstandard` package and msgpack the `msgpack` package; both
+are optional and only imported when those formats are used.
+"""
+import gzip
+import io
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+from srl import container
+from srl.jsonstream import JSONStream
+
+FORMATS = ("json", "json.gz", "json.zst", "msgpack", "srlb")
+
+# Longest suffixes first
+EXTENSIONS = {
+    ".json.gz": "json.gz",
+    ".json.zst": "json.zst",
+    ".gz": "json.gz",
+    ".zst": "json.zst",
+    ".msgpack": "msgpack",
+    ".mpk": "msgpack",
+    ".srlb": "srlb",
+}
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+# Exports are objects: fixmap, map16 or map32
+MSGPACK_MAP = frozenset(range(0x80, 0x90)) | {0xDE, 0xDF}
+
+# Favors speed; level 9 is ~3x slower for a few percent smaller files
+GZIP_LEVEL = 6
+
+
+class FormatError(Exception):
+    """The format can't be used here (unknown, or its package is missing)."""
+
+
+def format_for(path: str | None, requested: str | None = None) -> str:
+    """The format asked for, else the one the file name implies, else json."""
+    if requested:
+        if requested not in FORMATS:
+            raise FormatError(f"Unknown format {requested!r}")
+        return requested
+    name = (path or "").lower()
+    for suffix, fmt in EXTENSIONS.items():
+        if name.endswith(suffix):
+            return fmt
+    return "json"
+
+
+def sniff(head: bytes) -> str:
+    """The format of a file starting with `head`."""
+    if head.startswith(GZIP_MAGIC):
+        return "json.gz"
+    if head.startswith(ZSTD_MAGIC):
+        return "json.zst"
+    if head.startswith(container.MAGIC):
+        return "srlb"
+    if head and head[0] in MSGPACK_MAP:
+        return "msgpack"
+    return "json"
+
+
+def compress(chunks: Iterator[bytes], fmt: str) -> Iterator[bytes]:
+    """Encode the JSON (or msgpack) chunks of an export for `fmt`."""
+    if fmt == "json.gz":
+        compressor = zlib.compressobj(GZIP_LEVEL, wbits=31)  # gzip container
+    elif fmt == "json.zst":
+        compressor = _zstandard().ZstdCompressor().compressobj()
+    else:
+        yield from chunks
+        return
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+@contextmanager
+def open_stream(path: Path):
+    """
+    Open an export for reading in whatever format it is, as a JSONStream (or
+    an ObjectStream or ContainerStream with the same interface).
+    """
+    with open(path, "rb") as raw:
+        fmt = sniff(raw.read(4))
+        raw.seek(0)
+        if fmt == "srlb":
+            yield container.ContainerStream(raw)
+            return
+        if fmt == "msgpack":
+            yield ObjectStream(_msgpack().unpack(raw, raw=False, strict_map_key=False))
+            return
+        if fmt == "json.gz":
+            binary = gzip.GzipFile(fileobj=raw)
+        elif fmt == "json.zst":
+            binary = _zstandard().ZstdDecompressor().stream_reader(raw)
+        else:
+            binary = raw
+        with io.TextIOWrapper(binary, encoding="utf-8") as f:
+            yield JSONStream(f)
+
+
+class MsgpackWriter:
+    """
+    JSONWriter's interface, encoding msgpack. Each object is buffered as
+    packed bytes until it ends and its member count is known.
+    """
+
+    def __init__(self, write):
+        self.write = write
+        self.size = 0
+        self._packer = _msgpack().Packer(use_bin_type=True)
+        self._open: list[list] = []  # [key, packed members, count] per object
+
+    def begin_object(self, key: str | None = None):
+        self._open.append([key, [], 0])
+
+    def member(self, key: str, value):
+        self._add(self._packer.pack(key), self._packer.pack(value))
+
+    def end_object(self):
+        key, pieces, count = self._open.pop()
+        data = self._packer.pack_map_header(count) + b"".join(pieces)
+        if self._open:
+            self._add(self._packer.pack(key), data)
+        else:
+            self.size += len(data)
+            self.write(data)
+
+    def _add(self, key: bytes, value: bytes):
+        frame = self._open[-1]
+        frame[1] += (key, value)
+        frame[2] += 1
+
+
+class ObjectStream:
+    """
+    JSONStream's interface over a value already decoded in memory. Exactly
+    one value is pending at a time: members() and items() set it before
+    each step and value(), skip(), members() or items() consume it.
+    """
+
+    _EMPTY = object()
+
+    def __init__(self, obj):
+        self._pending = obj
+
+    def value(self):
+        obj, self._pending = self._pending, self._EMPTY
+        return obj
+
+    def skip(self):
+        self.value()
+
+    def members(self) -> Iterator[str]:
+        for key, value in self.value().items():
+            self._pending = value
+            yield key
+
+    def items(self) -> Iterator[None]:
+        for value in self.value():
+            self._pending = value
+            yield None
+
+    def peek(self) -> str | None:
+        """First character the pending value would have as JSON."""
+        obj = self._pending
+        if obj is self._EMPTY:
+            return None
+        if isinstance(obj, dict):
+            return "{"
+        if isinstance(obj, list):
+            return "["
+        if isinstance(obj, str):
+            return '"'
+        return str(obj)[:1].lower()
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise FormatError(
+            "json.zst needs the zstandard package (pip install 'srl[formats]')"
+        ) from None
+    return zstandard
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        raise FormatError(
+            "msgpack needs the msgpack package (pip install 'srl[formats]')"
+        ) from None
+    return msgpack
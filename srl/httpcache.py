@@ -0,0 +1,97 @@
+"""
+Conditional requests and a small response cache for the read endpoints.
+
+Every cached response carries a weak ETag built from storage.data_version()
+and today's date (due lists change at midnight even when no data does). A
+request whose If-None-Match matches gets a 304 without running the handler;
+otherwise the serialized body is reused from an LRU keyed by ETag, path and
+query string, so repeated polls between writes cost one stat() per data file.
+Concurrent misses for the same key share one computation (see SingleFlight).
+"""
+import functools
+import json
+from collections import OrderedDict
+from fastapi import Request, Response
+from pydantic import BaseModel
+from srl import storage
+from srl.utils import today
+
+DEFAULT_MAX_ENTRIES = 128
+
+
+class ResponseCache:
+    """LRU of serialized response bodies. Only touched from the event loop."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries: OrderedDict[tuple, bytes] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> bytes | None:
+        body = self.entries.get(key)
+        if body is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return body
+
+    def put(self, key: tuple, body: bytes):
+        self.entries[key] = body
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+def current_etag() -> str:
+    return f'W/"{storage.data_version()}-{today().isoformat()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: W/"x" matches "x"
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(",")
+    )
+
+
+def serialize(result) -> bytes:
+    if isinstance(result, BaseModel):
+        return result.model_dump_json().encode()
+    return json.dumps(result).encode()
+
+
+def conditional(endpoint):
+    """
+    Serve a GET endpoint with ETag/If-None-Match and the app's response cache.
+
+    The endpoint must take a `request: Request` argument and return a model
+    or a JSON-ready value; errors it raises are passed through uncached.
+    """
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        request: Request = kwargs["request"]
+        etag = current_etag()
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        cache: ResponseCache = request.app.state.response_cache
+        key = (etag, request.url.path, request.url.query)
+        body = cache.get(key)
+        if body is None:
+
+            async def compute():
+                return serialize(await endpoint(*args, **kwargs))
+
+            body = await request.app.state.single_flight.run(key, compute)
+            cache.put(key, body)
+        return Response(body, media_type="application/json", headers=headers)
+
+    return wrapper
@@ -0,0 +1,154 @@
+"""
+Change journal behind incremental (`srl export --since`) exports.
+
+Once JOURNAL_FILE exists (the first full export creates it), every save of
+a problem collection appends one NDJSON record per problem that changed:
+{"file": ..., "key": ..., "value": ...} or {"file": ..., "key": ...,
+"deleted": true}. A file replaced wholesale (streaming import) is recorded
+as {"file": ..., "reset": true}, which no delta can describe; merge imports
+are recorded as diffs.
+
+A checkpoint is "<journal id>:<byte offset>", so reading the changes since
+one costs time proportional to what happened after it, not to the history.
+"""
+import json
+import os
+import uuid
+from pathlib import Path
+from srl.storage import _tmp_path
+
+# Exports start a new journal once it grows past this
+ROTATE_BYTES = 16 * 1024 * 1024
+
+
+class JournalError(Exception):
+    """The checkpoint can't be served from the current journal."""
+
+
+def diff(file_name: str, old: dict, new: dict) -> list[dict]:
+    """A record for every key whose value differs between old and new."""
+    entries = []
+    for key, value in new.items():
+        if key not in old or old[key] != value:
+            entries.append({"file": file_name, "key": key, "value": value})
+    for key in old.keys() - new.keys():
+        entries.append({"file": file_name, "key": key, "deleted": True})
+    return entries
+
+
+def reset(file_name: str) -> list[dict]:
+    return [{"file": file_name, "reset": True}]
+
+
+def append(journal_path: Path, entries: list[dict]):
+    """
+    Append entries, in one write so concurrent appenders never interleave.
+    Callers append after the data itself is saved: an export that reads the
+    data before the save then finds the change after its checkpoint.
+    """
+    if not entries:
+        return
+    text = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+    with open(journal_path, "ab") as f:
+        f.write(text.encode())
+
+
+def start(journal_path: Path) -> str:
+    """
+    Make sure journal_path is recording, starting a fresh journal if there
+    is none or it has grown past ROTATE_BYTES, and return its checkpoint.
+    """
+    try:
+        size = journal_path.stat().st_size
+    except FileNotFoundError:
+        size = None
+    if size is None or size > ROTATE_BYTES:
+        return _begin(journal_path, b"")
+    return checkpoint(journal_path)
+
+
+def plan_compaction(journal_path: Path, current: str) -> str | None:
+    """
+    If the journal has grown past ROTATE_BYTES, the checkpoint a delta
+    export ending at `current` hands out instead: the same point in the
+    fresh journal compact() will write. None if no compaction is due.
+    """
+    if journal_path.stat().st_size <= ROTATE_BYTES:
+        return None
+    journal_id = uuid.uuid4().hex
+    return f"{journal_id}:{len(_header(journal_id))}"
+
+
+def compact(journal_path: Path, current: str, compacted: str):
+    """
+    Start the fresh journal `compacted` (from plan_compaction()) points
+    into, holding only what was recorded after `current`. Delta exports call
+    this once their output is written, so a failed one leaves the checkpoint
+    it started from usable, and a chain of them doesn't grow the journal
+    forever. Records appended while the journal is rewritten would be lost,
+    so callers hold off writers (the server runs exports under its write
+    lock).
+    """
+    _, _, end = current.partition(":")
+    journal_id, _, _ = compacted.partition(":")
+    with open(journal_path, "rb") as f:
+        f.seek(int(end))
+        _begin(journal_path, f.read(), journal_id)
+
+
+def _header(journal_id: str) -> bytes:
+    return (json.dumps({"journal": journal_id}) + "\n").encode()
+
+
+def _begin(journal_path: Path, records: bytes, journal_id: str | None = None) -> str:
+    """Replace journal_path with a new journal holding records; its start."""
+    journal_id = journal_id or uuid.uuid4().hex
+    header = _header(journal_id)
+    tmp = _tmp_path(journal_path)
+    tmp.write_bytes(header + records)
+    os.replace(tmp, journal_path)
+    return f"{journal_id}:{len(header)}"
+
+
+def checkpoint(journal_path: Path) -> str | None:
+    """The journal's current position, or None if nothing is being recorded."""
+    try:
+        with open(journal_path, "rb") as f:
+            journal_id = json.loads(f.readline())["journal"]
+            return f"{journal_id}:{f.seek(0, os.SEEK_END)}"
+    except (FileNotFoundError, ValueError, KeyError):
+        return None
+
+
+def changes_since(journal_path: Path, since: str) -> tuple[dict, str]:
+    """
+    Net changes recorded after the checkpoint `since`, as
+    {file name: {key: value, or None if deleted}}, and the checkpoint to
+    continue from next time.
+    """
+    journal_id, _, offset = since.partition(":")
+    current = checkpoint(journal_path)
+    if current is None:
+        raise JournalError("No change journal; run a full export first")
+    current_id, _, end = current.partition(":")
+    if journal_id != current_id or not offset.isdigit():
+        raise JournalError(
+            f"Checkpoint {since} is from another journal; run a full export"
+        )
+    if int(offset) > int(end):
+        raise JournalError(f"Checkpoint {since} is past the end of the journal")
+
+    changes: dict[str, dict] = {}
+    with open(journal_path, "rb") as f:
+        f.seek(int(offset))
+        # Only up to the returned checkpoint, even if writers append meanwhile
+        for line in f.read(int(end) - int(offset)).splitlines():
+            entry = json.loads(line)
+            if entry.get("reset"):
+                raise JournalError(
+                    f"{entry['file']} was replaced since {since}; run a full export"
+                )
+            section = changes.setdefault(entry["file"], {})
+            section[entry["key"]] = None if entry.get("deleted") else entry["value"]
+    return changes, current
+
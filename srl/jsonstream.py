@@ -0,0 +1,182 @@
+"""
+Incremental JSON reading and writing for documents too large to hold in
+memory at once.
+
+JSONStream walks a document object by object: members() yields the keys of
+an object one at a time and items() steps through an array, leaving the
+reader positioned on the value so the caller can decode it with value(),
+discard it with skip(), or descend into it. Only the value being decoded
+and one read-ahead chunk are held in memory. JSONWriter is the other
+direction: it emits an object member by member.
+"""
+import json
+from typing import Iterator, TextIO
+
+CHUNK_SIZE = 1 << 16
+WHITESPACE = " \t\n\r"
+
+
+class JSONStream:
+    def __init__(self, f: TextIO, chunk_size: int = CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self._decoder = json.JSONDecoder()
+
+    def value(self):
+        """Decode the next complete value."""
+        self._peek()
+        while True:
+            try:
+                obj, end = self._decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                if self.eof or not self._truncated(e):
+                    raise
+                self._fill()
+                continue
+            # A number or literal ending the buffer may go on in the next chunk
+            at_end = end == len(self.buf) and not self.eof
+            if at_end and self.buf[self.pos] not in '{["':
+                self._fill()
+                continue
+            self.pos = end
+            return obj
+
+    def skip(self):
+        """Consume the next value without keeping it."""
+        self.value()
+
+    def members(self) -> Iterator[str]:
+        """
+        Yield the keys of the object at the current position. Each value
+        must be consumed (value(), skip(), members() or items()) before
+        asking for the next key.
+        """
+        self._expect("{")
+        if self._peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            if self._peek() != '"':
+                self._error("Expecting property name enclosed in double quotes")
+            key = self.value()
+            self._expect(":")
+            yield key
+            if self._next_delimiter("}"):
+                return
+
+    def items(self) -> Iterator[None]:
+        """Step through the array at the current position, one item at a time."""
+        self._expect("[")
+        if self._peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield None
+            if self._next_delimiter("]"):
+                return
+
+    def peek(self) -> str | None:
+        """First character of the next value, or None at end of input."""
+        return self._peek()
+
+    def _next_delimiter(self, close: str) -> bool:
+        ch = self._peek()
+        if ch == close:
+            self.pos += 1
+            return True
+        if ch != ",":
+            self._error(f"Expecting ',' delimiter or '{close}'")
+        self.pos += 1
+        return False
+
+    def _expect(self, ch: str):
+        if self._peek() != ch:
+            self._error(f"Expecting '{ch}'")
+        self.pos += 1
+
+    def _peek(self) -> str | None:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof:
+                return None
+            self._fill()
+
+    def _fill(self):
+        # Drop what's been consumed, then read at least as much as is still
+        # pending so a value spanning many chunks is re-scanned O(log n) times
+        self.buf = self.buf[self.pos:]
+        self.pos = 0
+        chunk = self.f.read(max(self.chunk_size, len(self.buf)))
+        if chunk:
+            self.buf += chunk
+        else:
+            self.eof = True
+
+    def _truncated(self, e: json.JSONDecodeError) -> bool:
+        # Errors at (or a token's length from) the end of the buffer, or an
+        # unterminated string, may just mean the value isn't all read yet
+        near_end = e.pos >= len(self.buf) - 16
+        return near_end or e.msg.startswith("Unterminated string")
+
+    def _error(self, msg: str):
+        raise json.JSONDecodeError(msg, self.buf, self.pos)
+
+
+class JSONWriter:
+    """
+    Write one JSON object piece by piece, laid out exactly like json.dump()
+    with indent=2 (or with compact separators), so large objects never have
+    to be built in memory. Encoded bytes go to `write`; `size` counts them.
+    """
+
+    def __init__(self, write, compact: bool = False, ensure_ascii: bool = False):
+        self.write = write
+        self.compact = compact
+        self.ensure_ascii = ensure_ascii
+        self.size = 0
+        self._counts: list[int] = []  # members written to each open object
+
+    def begin_object(self, key: str | None = None):
+        if key is not None:
+            self._key(key)
+        self._emit("{")
+        self._counts.append(0)
+
+    def member(self, key: str, value):
+        self._key(key)
+        if self.compact:
+            text = json.dumps(
+                value, ensure_ascii=self.ensure_ascii, separators=(",", ":")
+            )
+        else:
+            text = json.dumps(value, ensure_ascii=self.ensure_ascii, indent=2)
+            text = text.replace("\n", "\n" + "  " * len(self._counts))
+        self._emit(text)
+
+    def end_object(self):
+        count = self._counts.pop()
+        if count and not self.compact:
+            self._emit("\n" + "  " * len(self._counts))
+        self._emit("}")
+
+    def _key(self, key: str):
+        count = self._counts[-1]
+        self._counts[-1] = count + 1
+        sep = "," if count else ""
+        if self.compact:
+            self._emit(f"{sep}{json.dumps(key, ensure_ascii=self.ensure_ascii)}:")
+        else:
+            indent = "\n" + "  " * len(self._counts)
+            key = json.dumps(key, ensure_ascii=self.ensure_ascii)
+            self._emit(f"{sep}{indent}{key}: ")
+
+    def _emit(self, text: str):
+        data = text.encode()
+        self.size += len(data)
+        self.write(data)
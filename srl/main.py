@@ -1,17 +1,32 @@
-from srl.cli import build_parser
+import os
+import sys
+from srl import metrics
+from srl.cli import build_parser, dispatch
+from srl.client import forward
 from srl.storage import ensure_data_dir
-from srl.banner import banner
-from rich.console import Console
+from srl.utils import LazyConsole
 
 
 def main():
+    # Hand the command to a running `srl daemon` if there is one
+    code = forward(sys.argv[1:])
+    if code is not None:
+        sys.exit(code)
+
+    if os.environ.get("SRL_METRICS"):
+        metrics.enable()
+
     ensure_data_dir()
     parser = build_parser()
     args = parser.parse_args()
-    console = Console()
+    console = LazyConsole()
 
     if hasattr(args, "handler"):
-        args.handler(args, console)
+        metrics.instrument(args.command, dispatch, parser, args, console)
+        if metrics.enabled():
+            sys.stderr.write(metrics.render())
     else:
+        from srl.banner import banner
+
         banner(console)
         parser.print_help()
@@ -0,0 +1,99 @@
+"""
+History-level merging of problem entries, behind `srl import --merge`.
+
+Two copies of a problem (say, from two machines) are combined attempt by
+attempt rather than one replacing the other: their histories are merged in
+date order and an attempt present in both (same date, rating and note) is
+kept once. Repeats within one copy are separate attempts and are all kept.
+Whether the problem is mastered is then re-derived from the merged history
+with the rule `srl add` applies: its last two ratings are 5.
+
+Any number of copies merge in one k-way pass rather than one merge per copy.
+"""
+import hashlib
+import heapq
+from itertools import pairwise, repeat
+
+
+def attempt_key(record: dict) -> tuple:
+    """What makes two history records the same attempt."""
+    note = record.get("note") or ""
+    digest = hashlib.blake2b(note.encode(), digest_size=8).hexdigest() if note else ""
+    return (_date(record), record.get("rating"), digest)
+
+
+def by_date(history: list) -> list:
+    # Histories are appended in date order; only hand-edited ones need sorting
+    if all(_date(a) <= _date(b) for a, b in pairwise(history)):
+        return history
+    return sorted(history, key=_date)
+
+
+def merge_histories(*histories: list) -> list:
+    """
+    Merge histories into one in date order, dropping attempts repeated
+    across copies: an attempt is kept as many times as the copy holding it
+    most often has it. Runs in one pass over the inputs: duplicates can only
+    share a date, so only the current day's attempts are counted.
+    """
+    merged = []
+    day = None
+    kept: dict[tuple, int] = {}
+    held: dict[tuple, int] = {}
+    tagged = [
+        zip(by_date(history), repeat(copy)) for copy, history in enumerate(histories)
+    ]
+    for record, copy in heapq.merge(*tagged, key=lambda pair: _date(pair[0])):
+        if _date(record) != day:
+            day = _date(record)
+            kept, held = {}, {}
+        key = attempt_key(record)
+        held[key, copy] = held.get((key, copy), 0) + 1
+        if held[key, copy] > kept.get(key, 0):
+            kept[key] = kept.get(key, 0) + 1
+            merged.append(record)
+    return merged
+
+
+def merge_entries(*entries: dict) -> dict:
+    """One entry from several copies; later copies win on fields besides history."""
+    merged = {}
+    for entry in entries:
+        merged.update(entry)
+    merged["history"] = merge_histories(*(e.get("history", []) for e in entries))
+    return merged
+
+
+def is_mastered(history: list) -> bool:
+    return len(history) >= 2 and all(r.get("rating") == 5 for r in history[-2:])
+
+
+def conflicts(*entries: dict) -> dict[str, list]:
+    """Fields besides history the copies disagree on, with each distinct value."""
+    values: dict[str, list] = {}
+    for entry in entries:
+        for field, value in entry.items():
+            if field == "history" or value is None:
+                continue
+            seen = values.setdefault(field, [])
+            if value not in seen:
+                seen.append(value)
+    return {field: seen for field, seen in values.items() if len(seen) > 1}
+
+
+def merge_into(progress: dict, mastered: dict, name: str, *incoming: dict) -> dict:
+    """
+    Merge the `incoming` copies with whatever progress or mastered already
+    holds under `name`, and file the result under whichever its merged
+    history says. Returns the fields the copies disagreed on; the last
+    copy's value is the one kept.
+    """
+    local = [d.pop(name) for d in (progress, mastered) if name in d]
+    entry = merge_entries(*local, *incoming)
+    target = mastered if is_mastered(entry["history"]) else progress
+    target[name] = entry
+    return conflicts(*local, *incoming)
+
+
+def _date(record: dict) -> str:
+    return str(record.get("date", ""))
@@ -0,0 +1,230 @@
+"""
+Counters and latency histograms, rendered in the Prometheus text format.
+
+Collection is off until enable() is called: `srl server` enables it and
+serves the result at GET /metrics; the CLI enables it when SRL_METRICS is
+set and prints the metrics to stderr on exit. While disabled every hook is a
+single global lookup, so instrumented code paths cost next to nothing.
+"""
+import threading
+import time
+from bisect import bisect_left
+
+# Upper bounds in seconds for the latency histograms
+BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# name -> (type, help)
+METRICS = {
+    "srl_commands_total": ("counter", "Commands run, by subcommand and outcome"),
+    "srl_command_duration_seconds": ("histogram", "Command latency by subcommand"),
+    "srl_storage_calls_total": ("counter", "load_json/save_json calls, by file"),
+    "srl_storage_io_total": ("counter", "Data file reads and writes hitting disk"),
+    "srl_storage_io_bytes_total": ("counter", "Bytes read from and written to disk"),
+    "srl_http_requests_total": ("counter", "HTTP requests by method, route and status"),
+    "srl_http_request_duration_seconds": ("histogram", "HTTP latency by route"),
+    "srl_response_cache_hits_total": ("counter", "GET responses served from the cache"),
+    "srl_response_cache_misses_total": ("counter", "GET responses that were computed"),
+    "srl_response_cache_entries": ("gauge", "Responses held in the cache"),
+    "srl_single_flight_computations_total": ("counter", "Coalescable reads computed"),
+    "srl_single_flight_coalesced_total": (
+        "counter",
+        "Reads served by another request's computation",
+    ),
+    "srl_worker_pending": ("gauge", "Calls running or queued on the worker pool"),
+    "srl_data_file_bytes": ("gauge", "Size of each data file on disk"),
+    "srl_user_stores": ("gauge", "User stores held in memory"),
+    "srl_user_store_bytes": ("gauge", "Approximate size of the open user stores"),
+    "srl_user_store_evictions_total": ("counter", "User stores flushed and closed"),
+}
+
+_registry = None
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters: dict[tuple[str, tuple], float] = {}
+        # (name, labels) -> [count per bucket..., +Inf count, sum]
+        self.histograms: dict[tuple[str, tuple], list] = {}
+
+    def inc(self, name: str, labels: tuple, value: float = 1):
+        key = (name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, labels: tuple, value: float):
+        key = (name, labels)
+        with self.lock:
+            series = self.histograms.get(key)
+            if series is None:
+                series = self.histograms[key] = [0] * (len(BUCKETS) + 1) + [0.0]
+            series[bisect_left(BUCKETS, value)] += 1
+            series[-1] += value
+
+
+def enable() -> Registry:
+    global _registry
+    if _registry is None:
+        _registry = Registry()
+    return _registry
+
+
+def disable():
+    global _registry
+    _registry = None
+
+
+def enabled() -> bool:
+    return _registry is not None
+
+
+def inc(name: str, labels: tuple, value: float = 1):
+    if _registry is not None:
+        _registry.inc(name, labels, value)
+
+
+def observe(name: str, labels: tuple, value: float):
+    if _registry is not None:
+        _registry.observe(name, labels, value)
+
+
+def instrument(command: str, fn, *args):
+    """Call fn(*args), counting and timing it under `command`."""
+    if _registry is None:
+        return fn(*args)
+
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        result = fn(*args)
+        outcome = "ok"
+        return result
+    finally:
+        _registry.observe(
+            "srl_command_duration_seconds",
+            (("command", command),),
+            time.perf_counter() - start,
+        )
+        _registry.inc(
+            "srl_commands_total", (("command", command), ("outcome", outcome))
+        )
+
+
+def record_storage(op: str, file_path, size: int | None = None):
+    """Count a storage call; with a size, a disk read or write of that size."""
+    if _registry is None:
+        return
+    labels = (("file", file_path.name), ("op", op))
+    if size is None:
+        _registry.inc("srl_storage_calls_total", labels)
+        return
+    _registry.inc("srl_storage_io_total", labels)
+    _registry.inc("srl_storage_io_bytes_total", labels, size)
+
+
+class HTTPMetricsMiddleware:
+    """ASGI middleware counting and timing requests by matched route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _registry is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            # The router records the matched route (with its path template)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            inc(
+                "srl_http_requests_total",
+                (
+                    ("method", scope["method"]),
+                    ("route", route),
+                    ("status", str(status)),
+                ),
+            )
+            observe(
+                "srl_http_request_duration_seconds",
+                (("route", route),),
+                time.perf_counter() - start,
+            )
+
+
+def data_file_samples() -> list[tuple[str, tuple, float]]:
+    from srl import storage
+
+    samples = []
+    for path in storage.data_files():
+        try:
+            size = storage.resolve(path).stat().st_size
+        except FileNotFoundError:
+            continue
+        samples.append(("srl_data_file_bytes", (("file", path.name),), size))
+    return samples
+
+
+def render(extra: list[tuple[str, tuple, float]] = ()) -> str:
+    """
+    Everything collected so far, plus `extra` (name, labels, value) samples
+    read at scrape time, in the Prometheus text exposition format.
+    """
+    registry = _registry or Registry()
+    samples: dict[str, list[str]] = {}
+    with registry.lock:
+        counters = list(registry.counters.items())
+        histograms = [(key, list(s)) for key, s in registry.histograms.items()]
+
+    def add(name, labels, value):
+        samples.setdefault(name, []).append(f"{name}{_labels(labels)} {_number(value)}")
+
+    for (name, labels), value in counters:
+        add(name, labels, value)
+    for name, labels, value in [*extra, *data_file_samples()]:
+        add(name, labels, value)
+
+    for (name, labels), series in histograms:
+        lines = samples.setdefault(name, [])
+        cumulative = 0
+        for bound, count in zip((*BUCKETS, "+Inf"), series[:-1]):
+            cumulative += count
+            le = bound if isinstance(bound, str) else _number(bound)
+            lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labels)} {_number(series[-1])}")
+        lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+
+    out = []
+    for name in sorted(samples):
+        kind, help_text = METRICS.get(name, ("untyped", name))
+        out.append(f"# HELP {name} {help_text}")
+        out.append(f"# TYPE {name} {kind}")
+        out.extend(sorted(samples[name]) if kind != "histogram" else samples[name])
+    return "\n".join(out) + "\n"
+
+
+def _labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels)
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
@@ -0,0 +1,77 @@
+import json
+import sys
+from typing import Callable, Iterable, TextIO
+
+# Output formats for --format. "rich" is the default console rendering; the
+# others stream plain records and never import Rich.
+FORMATS = ("rich", "plain", "json", "ndjson")
+
+# Flush after the first record so consumers see output immediately, then in
+# batches to keep syscalls down on large outputs.
+FLUSH_EVERY = 1000
+
+
+def write_records(records: Iterable[dict], fmt: str, out: TextIO | None = None):
+    """Stream records to `out` (stdout by default) in the given format."""
+    out = out or sys.stdout
+    if fmt == "ndjson":
+        _write_lines(records, out, lambda r: json.dumps(r, ensure_ascii=False))
+    elif fmt == "plain":
+        _write_lines(records, out, plain_line)
+    elif fmt == "json":
+        _write_json_array(records, out)
+    else:
+        raise ValueError(f"Unsupported output format: {fmt}")
+
+
+def write_result(
+    result,
+    render_plain: Callable[[object], str],
+    fmt: str,
+    out: TextIO | None = None,
+):
+    """Write a command's run() result as plain text, JSON or one NDJSON line."""
+    out = out or sys.stdout
+    if fmt == "plain":
+        text = render_plain(result)
+        out.write(text + "\n" if text else "")
+    elif fmt in ("json", "ndjson"):
+        indent = 2 if fmt == "json" else None
+        out.write(json.dumps(to_json(result), ensure_ascii=False, indent=indent) + "\n")
+    else:
+        raise ValueError(f"Unsupported output format: {fmt}")
+    out.flush()
+
+
+def to_json(result) -> dict:
+    """JSON-ready dict for a result dataclass, tagged with its type."""
+    # dataclasses pulls in inspect; keep it off the startup path
+    from dataclasses import asdict
+
+    return {"type": type(result).__name__, **asdict(result)}
+
+
+def plain_line(record: dict) -> str:
+    """Tab-separated values in field order; missing values are empty."""
+    return "\t".join("" if v is None else str(v) for v in record.values())
+
+
+def _write_lines(records, out, encode):
+    for i, record in enumerate(records):
+        out.write(encode(record) + "\n")
+        if i % FLUSH_EVERY == 0:
+            out.flush()
+    out.flush()
+
+
+def _write_json_array(records, out):
+    out.write("[")
+    empty = True
+    for i, record in enumerate(records):
+        out.write(",\n" if i else "\n")
+        out.write(json.dumps(record, ensure_ascii=False))
+        empty = False
+        if i % FLUSH_EVERY == 0:
+            out.flush()
+    out.write("]\n" if empty else "\n]\n")
+    out.flush()
@@ -1,77 +1,100 @@
-from fastapi import FastAPI, HTTPException, APIRouter
-from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+from pathlib import Path
+from fastapi import FastAPI, HTTPException, APIRouter, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 import shlex
 import io
 from rich.console import Console
-from srl.cli import build_parser
+from srl.cli import READ_ONLY_COMMANDS, build_parser
+from srl.output import to_json
 from srl.storage import ensure_data_dir
+from srl.utils import today
+from srl.httpcache import ResponseCache, conditional
+from srl.store import Store, StoreCache
+from srl.tenants import UserRootMiddleware, confine_paths
+from srl.workers import Saturated, SingleFlight, WorkerPool
+from srl import api, metrics, stats, storage
 import uvicorn
 from typing import Optional, List
 
 router = APIRouter()
 parser = None
 
+# Responses smaller than this aren't worth compressing
+GZIP_MIN_SIZE = 1024
+
+# Read-only commands whose output isn't a function of the data alone, so
+# concurrent identical requests must not share a result
+UNCOALESCED_COMMANDS = {"random"}
+
 
 class RunRequest(BaseModel):
     argv: Optional[List[str]] = None
     cmd: Optional[str] = None
 
 
-@router.post("/run")
-async def run(req: RunRequest):
+class BatchRequest(BaseModel):
+    commands: List[RunRequest]
+    atomic: bool = False
+
+
+def request_argv(req: RunRequest) -> list[str] | None:
     argv = req.argv
     if req.cmd and not argv:
         argv = shlex.split(req.cmd)
+    return argv if isinstance(argv, list) else None
+
+
+def help_text() -> str:
+    buf = io.StringIO()
+    parser.print_help(file=buf)
+    return buf.getvalue()
+
 
-    if not isinstance(argv, list):
+def parse_command(argv: list[str]):
+    """
+    Parse argv with the shared parser.
+
+    Returns (args, None) for a runnable command, or (None, (status, content))
+    when the reply is already known (bad arguments or no command).
+    """
+    global parser
+    if parser is None:
+        parser = build_parser()
+
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit:
+        return None, (400, {"output": help_text()})
+    if not hasattr(args, "handler"):
+        return None, (200, {"output": help_text()})
+    root = storage.current_root()
+    if root is not None:
+        error = confine_paths(args, root)
+        if error is not None:
+            return None, (400, {"error": error})
+    return args, None
+
+
+@router.post("/run")
+async def run(req: RunRequest, request: Request):
+    argv = request_argv(req)
+    if argv is None:
         raise HTTPException(
             status_code=400, detail="Provide 'argv' (list) or 'cmd' (string)"
         )
 
     try:
         ensure_data_dir()
-
-        global parser
-        if parser is None:
-            parser = build_parser()
-
-        try:
-            args = parser.parse_args(argv)
-        except SystemExit:
-            buf = io.StringIO()
-            parser.print_help(file=buf)
-            return JSONResponse(
-                status_code=400,
-                content={
-                    "output": buf.getvalue(),
-                },
-            )
-
-        console = Console(record=True)
-
-        if hasattr(args, "handler"):
-            try:
-                result = args.handler(args, console)
-                if hasattr(result, "__await__"):
-                    await result
-            except Exception:
-                return JSONResponse(
-                    status_code=500,
-                    content={
-                        "error": "Error executing handler",
-                    },
-                )
-        else:
-            buf = io.StringIO()
-            parser.print_help(file=buf)
-            return {
-                "output": buf.getvalue(),
-            }
-
-        return {
-            "output": console.export_text(),
-        }
+        args, reply = parse_command(argv)
+        if reply is None:
+            reply = await dispatch_command(request.app, args)
+        status_code, content = reply
+        return JSONResponse(status_code=status_code, content=content)
+    except Saturated:
+        raise
     except Exception:
         return JSONResponse(
             status_code=500,
@@ -81,12 +104,261 @@ async def run(req: RunRequest):
         )
 
 
-def create_app() -> FastAPI:
-    app = FastAPI(title="srl CLI HTTP API")
+async def dispatch_command(app: FastAPI, args) -> tuple[int, dict]:
+    """
+    Run a parsed command on the worker pool. Identical read-only commands
+    already in flight against the same data version share one execution.
+    """
+    pool = app.state.pool
+    command = getattr(args, "command", None)
+    if command not in READ_ONLY_COMMANDS:
+        return await pool.run(execute, args, write=True)
+    if command in UNCOALESCED_COMMANDS:
+        return await pool.run(execute, args)
+
+    key = ("run", storage.data_version(), today().isoformat(), normalized_args(args))
+    return await app.state.single_flight.run(key, lambda: pool.run(execute, args))
+
+
+def normalized_args(args) -> tuple:
+    """Parsed arguments as a hashable key, independent of how argv spelled them."""
+    return tuple(
+        sorted(
+            (name, repr(value))
+            for name, value in vars(args).items()
+            if not callable(value)
+        )
+    )
+
+
+@router.post("/batch")
+async def batch(req: BatchRequest, request: Request):
+    """
+    Run many commands in one storage session: each data file is read and
+    written at most once for the whole batch. With atomic=true any failing
+    command discards the whole batch.
+    """
+    ensure_data_dir()
+    entries = []
+    for entry in req.commands:
+        argv = request_argv(entry)
+        if argv is None:
+            error = {"error": "Provide 'argv' (list) or 'cmd' (string)"}
+            entries.append((None, (400, error)))
+        else:
+            entries.append(parse_command(argv))
+
+    results, committed = await request.app.state.pool.run(
+        execute_batch, entries, req.atomic, write=True
+    )
+    return JSONResponse(
+        status_code=409 if req.atomic and not committed else 200,
+        content={
+            "committed": committed,
+            "results": [{"status": code, **content} for code, content in results],
+        },
+    )
+
+
+def execute_batch(entries, atomic: bool):
+    """Run parsed /batch entries in one storage session on a worker thread."""
+    results = []
+    with storage.session() as session:
+        for i, (args, reply) in enumerate(entries):
+            if reply is None:
+                if not atomic:
+                    session.savepoint()
+                try:
+                    reply = execute(args)
+                except Exception:
+                    reply = (500, {"error": "Internal server error"})
+                if reply[0] >= 500 and not atomic:
+                    session.rollback()
+            results.append(reply)
+
+            if atomic and reply[0] >= 400:
+                session.discard()
+                skipped = (424, {"error": "Not run: an earlier command failed"})
+                results.extend(skipped for _ in entries[i + 1:])
+                return results, False
+    return results, True
+
+
+def execute(args) -> tuple[int, dict]:
+    """Run a parsed command on a worker thread; returns (status, content)."""
+    fmt = getattr(args, "format", "rich")
+    if fmt != "rich" and hasattr(args, "records"):
+        return 200, {
+            "records": metrics.instrument(args.command, _collect, args.records, args),
+        }
+
+    # Commands split into run() + renderers return structured results
+    # without any Rich rendering
+    if hasattr(args, "run"):
+        try:
+            result = metrics.instrument(args.command, args.run, args)
+        except Exception:
+            return handler_error()
+        return 200, {
+            "output": args.render_plain(result),
+            "result": to_json(result),
+        }
+
+    if fmt != "rich":
+        return 400, {
+            "error": f"{args.command} does not support --format {fmt}",
+        }
+
+    console = Console(record=True)
+    try:
+        metrics.instrument(args.command, args.handler, args, console)
+    except Exception:
+        return handler_error()
+    return 200, {
+        "output": console.export_text(),
+    }
+
+
+def _collect(records, args) -> list:
+    return list(records(args))
+
+
+def handler_error() -> tuple[int, dict]:
+    return 500, {
+        "error": "Error executing handler",
+    }
+
+
+@router.get("/stats")
+@conditional
+async def get_stats(request: Request):
+    ensure_data_dir()
+    activity = await request.app.state.pool.run(stats.load)
+    return stats.summary(activity, today())
+
+
+@router.get("/server/stats")
+async def get_server_stats(request: Request):
+    """Worker pool, response cache and request coalescing counters."""
+    state = request.app.state
+    return {
+        "pool": {"workers": state.pool.workers, "pending": state.pool.pending},
+        "cache": {
+            "entries": len(state.response_cache.entries),
+            "hits": state.response_cache.hits,
+            "misses": state.response_cache.misses,
+        },
+        "single_flight": {
+            "computations": state.single_flight.computations,
+            "coalesced": state.single_flight.coalesced,
+            "in_flight": len(state.single_flight.in_flight),
+        },
+    }
+
+
+@router.get("/metrics")
+async def get_metrics(request: Request):
+    """Prometheus text exposition of everything srl.metrics collects."""
+    if not metrics.enabled():
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    state = request.app.state
+    cache, flight = state.response_cache, state.single_flight
+    extra = [
+        ("srl_response_cache_hits_total", (), cache.hits),
+        ("srl_response_cache_misses_total", (), cache.misses),
+        ("srl_response_cache_entries", (), len(cache.entries)),
+        ("srl_single_flight_computations_total", (), flight.computations),
+        ("srl_single_flight_coalesced_total", (), flight.coalesced),
+        ("srl_worker_pending", (), state.pool.pending),
+    ]
+    if state.user_stores is not None:
+        extra += [
+            ("srl_user_stores", (), len(state.user_stores.stores)),
+            ("srl_user_store_bytes", (), state.user_stores.nbytes),
+            ("srl_user_store_evictions_total", (), state.user_stores.evictions),
+        ]
+    return PlainTextResponse(
+        metrics.render(extra), media_type="text/plain; version=0.0.4"
+    )
+
+
+async def saturated(request: Request, exc: Saturated) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"error": "Server busy, retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
+def create_app(
+    workers: int | None = None,
+    max_queue: int | None = None,
+    in_memory: bool = False,
+    flush_interval: float | None = None,
+    collect_metrics: bool = True,
+    users_dir: Path | None = None,
+    max_users: int | None = None,
+    max_memory: int | None = None,
+) -> FastAPI:
+    """
+    Build the API app. With in_memory=True the data files are loaded once at
+    startup and served from memory, with changes written behind (see
+    srl.store); the lifespan hook flushes them on shutdown. collect_metrics
+    turns on srl.metrics, served at GET /metrics.
+
+    users_dir enables per-user data roots (see srl.tenants). In memory, at
+    most max_users user stores totalling about max_memory bytes stay open.
+    """
+    pool = WorkerPool(workers, max_queue)
+    user_stores = None
+    if users_dir is not None and in_memory:
+        user_stores = StoreCache(max_users, max_memory, flush_interval)
+    if collect_metrics:
+        metrics.enable()
+    else:
+        metrics.disable()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        store = None
+        if in_memory:
+            ensure_data_dir()
+            store = Store(flush_interval)
+            store.preload(storage.data_files())
+            storage.install_store(store)
+        app.state.store = store
+        try:
+            yield
+        finally:
+            pool.shutdown()
+            if user_stores is not None:
+                user_stores.close()
+            if store is not None:
+                storage.install_store(None)
+                store.close()
+
+    app = FastAPI(title="srl CLI HTTP API", lifespan=lifespan)
+    app.state.pool = pool
+    app.state.response_cache = ResponseCache()
+    app.state.single_flight = SingleFlight()
+    app.state.user_stores = user_stores
+    app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_SIZE)
+    app.add_middleware(metrics.HTTPMetricsMiddleware)
+    if users_dir is not None:
+        # Outermost, so everything below runs against the user's data root
+        app.add_middleware(UserRootMiddleware, users_dir=users_dir, stores=user_stores)
+    app.add_exception_handler(Saturated, saturated)
     app.include_router(router)
+    app.include_router(api.router)
     return app
 
 
-def run_server(host: str = "127.0.0.1", port: int = 8080, reload: bool = False):
-    app = create_app()
+def run_server(
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    reload: bool = False,
+    **options,
+):
+    """Serve create_app(**options) with uvicorn."""
+    app = create_app(**options)
     uvicorn.run(app, host=host, port=port, reload=reload)
@@ -0,0 +1,231 @@
+"""
+Self-contained SQLite copy of the data files for ad-hoc SQL
+(`srl export --sqlite out.db`, GET /export/sqlite).
+
+Problems, attempts, audits and the next-up queue go into normalized tables:
+problem ids are assigned while streaming the data files, so attempts
+reference their problem without lookups. Rows are inserted with executemany
+in batches of INSERT_BATCH_ROWS inside a single transaction, and the indexes
+are built once at the end, which is far cheaper than maintaining them row by
+row. A problem found in both progress and mastered keeps its in-progress
+row, and the mastered copy's attempts are merged into it once the indexes
+exist, the way `srl import --merge` combines copies. The database is built
+in a temporary file and moved into place, so a failed export never leaves a
+half-written one behind.
+"""
+import os
+import sqlite3
+from collections import Counter
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Iterator
+from srl import storage
+
+INSERT_BATCH_ROWS = 10000
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE problems (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    leetcode_id INTEGER,
+    status TEXT NOT NULL CHECK (status IN ('in_progress', 'mastered', 'queued'))
+);
+CREATE TABLE attempts (
+    id INTEGER PRIMARY KEY,
+    problem_id INTEGER NOT NULL REFERENCES problems (id),
+    date TEXT,
+    rating INTEGER,
+    time_spent INTEGER,
+    note TEXT,
+    mistake TEXT
+);
+CREATE TABLE audits (
+    id INTEGER PRIMARY KEY,
+    problem_id INTEGER REFERENCES problems (id),
+    problem TEXT,
+    date TEXT,
+    result TEXT
+);
+CREATE TABLE next_up (
+    position INTEGER PRIMARY KEY,
+    problem_id INTEGER NOT NULL UNIQUE REFERENCES problems (id),
+    added TEXT
+);
+"""
+
+INDEXES = """
+CREATE INDEX attempts_problem ON attempts (problem_id, date);
+CREATE INDEX attempts_date ON attempts (date);
+CREATE INDEX audits_problem ON audits (problem_id, date);
+CREATE INDEX audits_date ON audits (date);
+CREATE INDEX problems_leetcode_id ON problems (leetcode_id);
+"""
+
+
+def write_database(path: Path, counts: dict | None = None) -> dict:
+    """
+    Write the current data to a new SQLite database at path, replacing any
+    file there. Returns the rows written per table (also kept in counts).
+    """
+    counts = {} if counts is None else counts
+    path = Path(path)
+    tmp = storage._tmp_path(path)
+    tmp.unlink(missing_ok=True)
+    try:
+        conn = sqlite3.connect(tmp, isolation_level=None)
+        try:
+            # Nothing reads the file until it's complete, so skip the
+            # rollback journal and fsyncs while building it
+            conn.execute("PRAGMA journal_mode = OFF")
+            conn.execute("PRAGMA synchronous = OFF")
+            conn.execute("BEGIN")
+            _execute_script(conn, SCHEMA)
+            _fill(conn, counts)
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return counts
+
+
+def _execute_script(conn: sqlite3.Connection, script: str):
+    # executescript() would commit the open transaction
+    for statement in script.split(";"):
+        if statement.strip():
+            conn.execute(statement)
+
+
+def _fill(conn: sqlite3.Connection, counts: dict):
+    conn.executemany(
+        "INSERT INTO meta VALUES (?, ?)",
+        [("exported_at", datetime.now().isoformat()), ("srl_version", "1.0.0")],
+    )
+    ids: dict[str, int] = {}
+    problems = []
+    attempts = []
+    # (problem id, mastered copy) for problems in both files
+    both = []
+    counts.update(problems=0, attempts=0, audits=0, next_up=0)
+
+    def flush():
+        # Problems first: attempts reference them
+        if problems:
+            conn.executemany("INSERT INTO problems VALUES (?, ?, ?, ?)", problems)
+            counts["problems"] += len(problems)
+            problems.clear()
+        if attempts:
+            conn.executemany(
+                "INSERT INTO attempts (problem_id, date, rating, time_spent, note, "
+                "mistake) VALUES (?, ?, ?, ?, ?, ?)",
+                attempts,
+            )
+            counts["attempts"] += len(attempts)
+            attempts.clear()
+
+    sources = (
+        ("in_progress", storage.PROGRESS_FILE),
+        ("mastered", storage.MASTERED_FILE),
+    )
+    for status, file_path in sources:
+        for name, problem in storage.iter_json_members(file_path):
+            if name in ids:
+                both.append((ids[name], problem))
+                continue
+            problem_id = ids[name] = len(ids) + 1
+            problems.append(
+                (problem_id, name, _int(problem.get("leetcode_id")), status)
+            )
+            for record in problem.get("history", []):
+                attempts.append(_attempt_row(problem_id, record))
+            if max(len(attempts), len(problems)) >= INSERT_BATCH_ROWS:
+                flush()
+
+    queue = []
+    for position, (name, entry) in enumerate(
+        storage.iter_json_members(storage.NEXT_UP_FILE), 1
+    ):
+        if name not in ids:
+            problem_id = ids[name] = len(ids) + 1
+            problems.append(
+                (problem_id, name, _int(entry.get("leetcode_id")), "queued")
+            )
+        queue.append((position, ids[name], entry.get("added")))
+    flush()
+    conn.executemany("INSERT INTO next_up VALUES (?, ?, ?)", queue)
+    counts["next_up"] = len(queue)
+
+    history = storage.load_json(storage.AUDIT_FILE).get("history", [])
+    for batch in _batches(
+        (ids.get(r.get("problem")), r.get("problem"), r.get("date"), r.get("result"))
+        for r in history
+    ):
+        conn.executemany(
+            "INSERT INTO audits (problem_id, problem, date, result) "
+            "VALUES (?, ?, ?, ?)",
+            batch,
+        )
+        counts["audits"] += len(batch)
+
+    _execute_script(conn, INDEXES)
+    for problem_id, problem in both:
+        rows = _missing_attempts(conn, problem_id, problem.get("history", []))
+        conn.executemany(
+            "INSERT INTO attempts (problem_id, date, rating, time_spent, note, "
+            "mistake) VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        counts["attempts"] += len(rows)
+
+
+def _attempt_row(problem_id: int, record: dict) -> tuple:
+    return (
+        problem_id,
+        record.get("date"),
+        _int(record.get("rating")),
+        _int(record.get("time_spent")),
+        record.get("note"),
+        record.get("mistake"),
+    )
+
+
+def _missing_attempts(
+    conn: sqlite3.Connection, problem_id: int, history: list
+) -> list[tuple]:
+    """
+    Rows for the attempts in history that problem_id doesn't have yet. As in
+    srl.merge, an attempt (date, rating, note) repeated in one copy is kept
+    as many times as the copy holding it most often has it.
+    """
+    have = Counter(
+        conn.execute(
+            "SELECT date, rating, coalesce(note, '') FROM attempts "
+            "WHERE problem_id = ?",
+            (problem_id,),
+        )
+    )
+    rows = []
+    for record in history:
+        row = _attempt_row(problem_id, record)
+        key = (row[1], row[2], row[4] or "")
+        if have[key]:
+            have[key] -= 1
+        else:
+            rows.append(row)
+    return rows
+
+
+def _batches(rows: Iterator[tuple]) -> Iterator[list[tuple]]:
+    while batch := list(islice(rows, INSERT_BATCH_ROWS)):
+        yield batch
+
+
+def _int(value) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
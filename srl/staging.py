@@ -0,0 +1,242 @@
+"""
+Crash-safe staging for `srl import`, resumable with `srl import --resume`.
+
+An import is written to a staging directory next to the data files, and the
+live files are only replaced once the whole backup has been read:
+
+    progress.json       what is being imported, and how far it has got
+    <section>.ndjson    a problem section, one [name, value] line per problem
+    <section>.json      a config or audit section, whole
+
+Problem sections are appended in batches; after each one the lines are
+synced and progress.json records the problems and bytes staged, so a resumed
+import truncates the section to the last checkpoint and skips that many
+problems in the backup. Once everything is staged the new data files are
+built in the staging directory (srl.storage.user_root() points the data
+files there) and swapped in.
+
+The swap is a commit point: progress.json is marked "swapping" and lists the
+files to move before any of them is moved, and each move is an os.replace().
+The swap as a whole is not atomic: a process reading the data files while it
+runs can see some new files next to old ones. An interrupted swap is
+finished by storage.ensure_data_dir(), which the CLI, the daemon and the
+server call before touching the data, so no command starts on a mix that a
+crash left behind.
+"""
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+from srl import storage
+
+STAGING_DIR = storage.STAGING_DIR
+STATE_FILE = "progress.json"
+
+# Serializes finishing a swap between the server's threads
+_swap_lock = threading.Lock()
+
+
+class StagingError(Exception):
+    """The staged import can't be resumed."""
+
+
+def staging_dir() -> Path:
+    # Next to the data files, so the swap is a rename on the same filesystem
+    return storage.resolve(storage.PROGRESS_FILE).with_name(STAGING_DIR)
+
+
+def finish_swap() -> "StagedImport | None":
+    """
+    Finish the swap of an import interrupted while its files were being
+    moved in, if there is one, and return that import.
+    """
+    with _swap_lock:
+        staged = StagedImport.load()
+        if staged is None or not staged.swapping:
+            return None
+        staged.swap()
+        return staged
+
+
+def file_signature(path: Path) -> list:
+    st = path.stat()
+    return [st.st_size, st.st_mtime_ns]
+
+
+class StagedImport:
+    """An import being staged, as recorded in the staging directory."""
+
+    def __init__(self, directory: Path, state: dict):
+        self.directory = directory
+        self.state = state
+
+    @classmethod
+    def start(
+        cls, import_path: Path, merge: bool, sections: set | None, totals: dict
+    ) -> "StagedImport":
+        """Stage a new import, discarding anything staged before."""
+        directory = staging_dir()
+        shutil.rmtree(directory, ignore_errors=True)
+        directory.mkdir(parents=True)
+        import_path = Path(import_path).resolve()
+        staged = cls(
+            directory,
+            {
+                "file": str(import_path),
+                "signature": file_signature(import_path),
+                "merge": merge,
+                "sections": sorted(sections) if sections is not None else None,
+                "totals": totals,
+                "state": "staging",
+                "done": {},
+                "current": None,
+            },
+        )
+        staged._save()
+        return staged
+
+    @classmethod
+    def load(cls) -> "StagedImport | None":
+        """The import staged in the data directory, if there is one."""
+        directory = staging_dir()
+        try:
+            state = json.loads((directory / STATE_FILE).read_text())
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            raise StagingError(f"Unreadable {directory / STATE_FILE}") from None
+        return cls(directory, state)
+
+    @property
+    def path(self) -> Path:
+        return Path(self.state["file"])
+
+    @property
+    def merge(self) -> bool:
+        return self.state["merge"]
+
+    @property
+    def sections(self) -> set | None:
+        sections = self.state["sections"]
+        return set(sections) if sections is not None else None
+
+    @property
+    def swapping(self) -> bool:
+        return self.state["state"] == "swapping"
+
+    def check_source(self):
+        """Make sure the backup is still the file this import started from."""
+        try:
+            signature = file_signature(self.path)
+        except FileNotFoundError:
+            raise StagingError(f"{self.path} no longer exists") from None
+        if signature != self.state["signature"]:
+            raise StagingError(f"{self.path} changed since the import started")
+
+    def done(self) -> dict:
+        """The sections fully staged, with their problem counts (None if whole)."""
+        return self.state["done"]
+
+    def position(self, section: str) -> int:
+        """Problems of `section` already staged by an interrupted run."""
+        current = self.state["current"]
+        return current["count"] if current and current["section"] == section else 0
+
+    def stage_members(
+        self,
+        section: str,
+        members: Iterable[tuple[str, Any]],
+        batch_size: int,
+        progress=None,
+    ) -> int:
+        """
+        Append a problem section's remaining (name, value) pairs, with a
+        checkpoint every batch_size problems. Returns the section's total.
+        """
+        current = self.state["current"]
+        count, offset = 0, 0
+        if current and current["section"] == section:
+            count, offset = current["count"], current["offset"]
+        with open(self.directory / f"{section}.ndjson", "ab") as f:
+            f.truncate(offset)  # drop lines written after the last checkpoint
+            for name, value in members:
+                line = json.dumps([name, value], ensure_ascii=False) + "\n"
+                f.write(line.encode())
+                count += 1
+                if count % batch_size == 0:
+                    self._checkpoint(f, section, count)
+                    if progress:
+                        progress(count)
+            _sync(f)
+        self.state["done"][section] = count
+        self.state["current"] = None
+        self._save()
+        return count
+
+    def stage_value(self, section: str, value):
+        """Stage a section read whole."""
+        _write_atomic(
+            self.directory / f"{section}.json",
+            json.dumps(value, ensure_ascii=False).encode(),
+        )
+        self.state["done"][section] = None
+        self._save()
+
+    def members(self, section: str) -> Iterator[tuple[str, Any]]:
+        with open(self.directory / f"{section}.ndjson", "r", encoding="utf-8") as f:
+            for line in f:
+                name, value = json.loads(line)
+                yield name, value
+
+    def value(self, section: str):
+        return json.loads((self.directory / f"{section}.json").read_bytes())
+
+    def swap(self):
+        """
+        Replace the live data files with the ones built in the staging
+        directory, then remove it.
+        """
+        if not self.swapping:
+            files = {}
+            for file_path in storage.data_files() + [storage.DUE_FILE]:
+                live = storage.resolve(file_path)
+                if (self.directory / live.name).exists():
+                    files[live.name] = str(live)
+            self.state.update(state="swapping", files=files)
+            self._save()
+        for name, live in self.state["files"].items():
+            try:
+                storage.replace_file(Path(live), self.directory / name, self.merge)
+            except FileNotFoundError:
+                pass  # moved before an interruption
+        self.discard()
+
+    def discard(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _checkpoint(self, f, section: str, count: int):
+        _sync(f)
+        self.state["current"] = {
+            "section": section,
+            "count": count,
+            "offset": f.tell(),
+        }
+        self._save()
+
+    def _save(self):
+        _write_atomic(self.directory / STATE_FILE, json.dumps(self.state).encode())
+
+
+def _sync(f):
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def _write_atomic(path: Path, data: bytes):
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        _sync(f)
+    os.replace(tmp, path)
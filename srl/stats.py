@@ -0,0 +1,216 @@
+"""
+Running activity statistics kept in STATS_FILE.
+
+Recorded attempts update the aggregates in O(1). Changes made behind their
+back (imports, removals, hand edits) change the source signature and trigger
+a full rebuild on the next read.
+"""
+from collections import Counter
+from datetime import date, timedelta
+from pathlib import Path
+from srl import storage
+
+
+def source_files() -> list[Path]:
+    return [storage.PROGRESS_FILE, storage.MASTERED_FILE, storage.AUDIT_FILE]
+
+
+def source_signature() -> list:
+    """Signature of every file the activity counts are derived from."""
+    return [storage.file_signature(path) for path in source_files()]
+
+
+def empty() -> dict:
+    return {
+        "signature": None,
+        "days": {},
+        "weeks": {},
+        "months": {},
+        "total": 0,
+        "active_days": 0,
+        "runs": [],
+        "best_streak": 0,
+    }
+
+
+def load() -> dict:
+    """Return up-to-date stats, rebuilding them if the data files changed."""
+    stats = storage.load_json(storage.STATS_FILE)
+    if not stats or stats.get("signature") != source_signature():
+        stats = rebuild()
+    return stats
+
+
+def rebuild() -> dict:
+    """Recompute every aggregate from the full history and persist it."""
+    # Taken before reading: a write racing the rebuild changes the files'
+    # signature, so load() rebuilds again instead of trusting stale counts
+    signature = source_signature()
+    stats = empty()
+    for day_str in sorted(collect_day_counts().elements()):
+        _apply(stats, day_str)
+    stats["signature"] = signature
+    storage.save_json(storage.STATS_FILE, stats)
+    return stats
+
+
+def record_activity(day_str: str, before: list):
+    """
+    Count one attempt on day_str after the data files have been written.
+
+    `before` is the source signature taken before the write. If the stored
+    stats were not current at that point, or the day would go backwards in
+    time, this falls back to a full rebuild.
+    """
+    stats = storage.load_json(storage.STATS_FILE)
+    ordinal = _ordinal(day_str)
+    if (
+        not stats
+        or ordinal is None
+        or stats.get("signature") != before
+        or (stats["runs"] and ordinal < stats["runs"][-1][1])
+    ):
+        rebuild()
+        return
+    _apply(stats, day_str)
+    stats["signature"] = source_signature()
+    storage.save_json(storage.STATS_FILE, stats)
+
+
+def _apply(stats: dict, day_str: str):
+    ordinal = _ordinal(day_str)
+    if ordinal is None:
+        return
+    day_str = day_str[:10]
+
+    days = stats["days"]
+    count = days.get(day_str, 0) + 1
+    days[day_str] = count
+    stats["total"] += 1
+    if count == 1:
+        stats["active_days"] += 1
+
+    year, week, _ = date.fromordinal(ordinal).isocalendar()
+    week_key = f"{year}-W{week:02d}"
+    stats["weeks"][week_key] = stats["weeks"].get(week_key, 0) + 1
+
+    month = stats["months"].setdefault(
+        day_str[:7], {"total": 0, "days": 0, "max": [0, None]}
+    )
+    month["total"] += 1
+    if count == 1:
+        month["days"] += 1
+    if count > month["max"][0]:
+        month["max"] = [count, day_str]
+
+    # Runs of consecutive active days as [first ordinal, last ordinal]
+    runs = stats["runs"]
+    if runs and runs[-1][1] == ordinal:
+        return
+    if runs and runs[-1][1] + 1 == ordinal:
+        runs[-1][1] = ordinal
+    else:
+        runs.append([ordinal, ordinal])
+    stats["best_streak"] = max(stats["best_streak"], runs[-1][1] - runs[-1][0] + 1)
+
+
+def current_streak(stats: dict, today: date) -> int:
+    """Length of the run ending today, or yesterday if today is still open."""
+    runs = stats["runs"]
+    if not runs or runs[-1][1] < today.toordinal() - 1:
+        return 0
+    return runs[-1][1] - runs[-1][0] + 1
+
+
+def rolling_average(stats: dict, today: date, window: int) -> float:
+    """Attempts per day over the last `window` days, today included."""
+    days = stats["days"]
+    total = 0
+    for offset in range(window):
+        total += days.get((today - timedelta(days=offset)).isoformat(), 0)
+    return total / window
+
+
+def period_summary(stats: dict, months: list[tuple[int, int]], today: date) -> dict:
+    """Totals, most active day and best streak for the given calendar months."""
+    total = 0
+    active_days = 0
+    best_day = [0, None]
+    for y, m in months:
+        month = stats["months"].get(f"{y}-{m:02d}")
+        if not month:
+            continue
+        total += month["total"]
+        active_days += month["days"]
+        if month["max"][0] > best_day[0] or (
+            month["max"][0] == best_day[0] and month["max"][1] < (best_day[1] or "")
+        ):
+            best_day = month["max"]
+
+    start = date(*min(months), 1).toordinal() if months else today.toordinal()
+    end = today.toordinal()
+    best_streak = 0
+    for first, last in reversed(stats["runs"]):
+        if last < start:
+            break
+        if first > end:
+            continue
+        best_streak = max(best_streak, min(last, end) - max(first, start) + 1)
+
+    return {
+        "total": total,
+        "active_days": active_days,
+        "most_active_day": best_day[1],
+        "most_active_count": best_day[0],
+        "best_streak": best_streak,
+    }
+
+
+def summary(stats: dict, today: date) -> dict:
+    """Headline numbers for list panels and the HTTP API."""
+    iso_year, iso_week, _ = today.isocalendar()
+    return {
+        "total": stats["total"],
+        "active_days": stats["active_days"],
+        "current_streak": current_streak(stats, today),
+        "best_streak": stats["best_streak"],
+        "this_week": stats["weeks"].get(f"{iso_year}-W{iso_week:02d}", 0),
+        "this_month": stats["months"].get(today.isoformat()[:7], {}).get("total", 0),
+        "rolling_7d": round(rolling_average(stats, today, 7), 2),
+        "rolling_30d": round(rolling_average(stats, today, 30), 2),
+    }
+
+
+def collect_day_counts() -> Counter[str]:
+    """Count attempts and passed audits per day across all data files."""
+    counts = Counter()
+    counts.update(history_dates(storage.MASTERED_FILE))
+    counts.update(history_dates(storage.PROGRESS_FILE))
+    counts.update(audit_pass_dates(storage.AUDIT_FILE))
+    return counts
+
+
+def history_dates(path: Path) -> list[str]:
+    res = []
+    for obj in storage.load_json(path).values():
+        for record in obj.get("history", []):
+            day_str = record.get("date", "")
+            if day_str:
+                res.append(day_str)
+    return res
+
+
+def audit_pass_dates(path: Path) -> list[str]:
+    res = []
+    for record in storage.load_json(path).get("history", []):
+        day_str = record.get("date", "")
+        if day_str and record.get("result", "") == "pass":
+            res.append(day_str)
+    return res
+
+
+def _ordinal(day_str: str) -> int | None:
+    try:
+        return date.fromisoformat(day_str[:10]).toordinal()
+    except ValueError:
+        return None
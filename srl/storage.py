@@ -1,5 +1,13 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
+from typing import Any, Iterable, Iterator
+import copy
 import json
+import os
+import threading
+from srl import metrics
+from srl.jsonstream import JSONStream, JSONWriter
 
 DATA_DIR = Path.home() / ".srl"
 PROGRESS_FILE = DATA_DIR / "problems_in_progress.json"
@@ -7,19 +15,548 @@ MASTERED_FILE = DATA_DIR / "problems_mastered.json"
 NEXT_UP_FILE = DATA_DIR / "next_up.json"
 AUDIT_FILE = DATA_DIR / "audit.json"
 CONFIG_FILE = DATA_DIR / "config.json"
+STATS_FILE = DATA_DIR / "stats.json"
+DUE_FILE = DATA_DIR / "due_count"
+JOURNAL_FILE = DATA_DIR / "journal.ndjson"
+# Where srl.staging stages an import, next to the data files
+STAGING_DIR = ".import-staging"
+
+# Saves committed by this process; part of data_version()
+_commits = 0
 
 
 def ensure_data_dir():
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    """
+    Create the data directory, and finish the swap of an `srl import`
+    interrupted while moving its files in (see srl.staging), so no command
+    starts on a mix of old and new data files.
+    """
+    data_dir().mkdir(parents=True, exist_ok=True)
+    if resolve(PROGRESS_FILE).with_name(STAGING_DIR).exists():
+        from srl import staging
+
+        try:
+            staging.finish_swap()
+        except staging.StagingError:
+            pass  # reported by `srl import`
+
+
+def data_dir() -> Path:
+    """The data directory for the current context (see user_root())."""
+    return _data_root.get() or DATA_DIR
+
+
+def resolve(file_path: Path) -> Path:
+    """Where the data file file_path lives under the current data root."""
+    root = _data_root.get()
+    return file_path if root is None else root / file_path.name
+
+
+def data_files() -> list[Path]:
+    """Every JSON collection kept in DATA_DIR."""
+    return [
+        PROGRESS_FILE,
+        MASTERED_FILE,
+        NEXT_UP_FILE,
+        AUDIT_FILE,
+        CONFIG_FILE,
+        STATS_FILE,
+    ]
+
+
+def journaled_files() -> list[Path]:
+    """Collections whose per-problem changes go to JOURNAL_FILE (see srl.journal)."""
+    return [PROGRESS_FILE, MASTERED_FILE, NEXT_UP_FILE]
 
 
 def load_json(file_path: Path) -> dict:
+    metrics.record_storage("load", file_path)
+    file_path = resolve(file_path)
+    current = _session.get()
+    if current is not None:
+        return current.load(file_path)
+    return _load(file_path)
+
+
+def save_json(file_path: Path, data: dict):
+    metrics.record_storage("save", file_path)
+    file_path = resolve(file_path)
+    current = _session.get()
+    if current is not None:
+        current.save(file_path, data)
+        return
+    _save(file_path, data)
+
+
+def save_json_members(file_path: Path, members: Iterable[tuple[str, Any]]) -> int:
+    """
+    save_json for an object given as (key, value) pairs. Outside a session
+    or store the pairs are streamed straight into the file, so the object is
+    never held in memory as a whole. Returns the number of members.
+    """
+    metrics.record_storage("save", file_path)
+    file_path = resolve(file_path)
+    current = _session.get()
+    if current is not None or current_store() is not None:
+        data = dict(members)
+        if current is not None:
+            current.save(file_path, data)
+        else:
+            _save(file_path, data)
+        return len(data)
+
+    global _commits
+    _commits += 1
+    tmp = _tmp_path(file_path)
+    count = 0
+    try:
+        with open(tmp, "wb") as f:
+            # Same layout and escaping as _write_json's json.dump(indent=2)
+            writer = JSONWriter(f.write, ensure_ascii=True)
+            writer.begin_object()
+            for key, value in members:
+                writer.member(key, value)
+                count += 1
+            writer.end_object()
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    if metrics.enabled():
+        metrics.record_storage("write", file_path, tmp.stat().st_size)
+    # The due index and stats notice the new signature and rebuild lazily
+    os.replace(tmp, file_path)
+    journal_path = _journal_path(file_path)
+    if journal_path is not None:
+        from srl import journal
+
+        journal.append(journal_path, journal.reset(file_path.name))
+    return count
+
+
+def replace_file(file_path: Path, staged: Path, diff: bool = False):
+    """
+    Move `staged`, a complete new copy of the data file file_path written
+    elsewhere on the same filesystem (see srl.staging), into its place. An
+    installed store serves the new copy from then on.
+    Journaled collections are recorded as reset, as by save_json_members(),
+    or with diff=True (merge imports, which keep what was there) as the
+    per-problem changes, which costs reading both copies.
+    """
+    global _commits
+    _commits += 1
+    file_path = resolve(file_path)
+    journal_path = _journal_path(file_path)
+    changes = None
+    if journal_path is not None:
+        from srl import journal
+
+        if diff:
+            old, new = _read_json(file_path), _read_json(staged)
+            changes = journal.diff(file_path.name, old, new)
+        else:
+            changes = journal.reset(file_path.name)
+    store = current_store()
+    if store is not None:
+        store.replace(file_path, staged)
+    else:
+        os.replace(staged, file_path)
+    if changes:
+        journal.append(journal_path, changes)
+
+
+def iter_json_members(file_path: Path) -> Iterator[tuple[str, Any]]:
+    """
+    The (key, value) pairs of a stored object. Outside a session or store
+    they are parsed from the file one at a time rather than loaded whole.
+    """
+    resolved = resolve(file_path)
+    if _session.get() is not None or current_store() is not None:
+        yield from load_json(file_path).items()
+        return
+    metrics.record_storage("load", file_path)
+    try:
+        f = open(resolved, "r")
+    except FileNotFoundError:
+        return
+    with f:
+        stream = JSONStream(f)
+        for key in stream.members():
+            yield key, stream.value()
+
+
+def file_signature(file_path: Path) -> list | None:
+    """Changes whenever file_path changes; None if it doesn't exist."""
+    file_path = resolve(file_path)
+    store = current_store()
+    if store is not None:
+        return store.signature(file_path)
+    try:
+        st = file_path.stat()
+    except FileNotFoundError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def data_version() -> str:
+    """
+    Opaque token that changes whenever anything in DATA_DIR changes: on every
+    save through this process, and on writes by other processes (via the
+    file signatures).
+    """
+    # hashlib is only needed by the server; keep it off the CLI startup path
+    import hashlib
+
+    signatures = [file_signature(path) for path in data_files()]
+    state = repr((str(data_dir()), _commits, signatures))
+    return hashlib.blake2b(state.encode(), digest_size=8).hexdigest()
+
+
+def _load(file_path: Path) -> dict:
+    store = current_store()
+    if store is not None:
+        return store.load(file_path, shared=_shared_reads.get())
+    return _read_json(file_path)
+
+
+def _save(file_path: Path, data: dict):
+    global _commits
+    _commits += 1
+    store = current_store()
+    changes = None
+    journal_path = _journal_path(file_path)
+    if journal_path is not None:
+        from srl import journal
+
+        old = store.load(file_path, shared=True) if store else _read_json(file_path)
+        changes = journal.diff(file_path.name, old, data)
+    if store is not None:
+        store.save(file_path, data)
+    else:
+        _write_json(file_path, data)
+    if changes:
+        journal.append(journal_path, changes)
+
+
+def _journal_path(file_path: Path) -> Path | None:
+    """The journal recording changes to file_path, if one is active."""
+    if file_path.name not in {path.name for path in journaled_files()}:
+        return None
+    # Next to the file rather than resolve(): store writers have no context
+    journal_path = file_path.with_name(JOURNAL_FILE.name)
+    return journal_path if journal_path.exists() else None
+
+
+def _read_json(file_path: Path) -> dict:
     if not file_path.exists():
         return {}
     with open(file_path, "r") as f:
-        return json.load(f)
+        data = json.load(f)
+        if metrics.enabled():
+            metrics.record_storage("read", file_path, os.fstat(f.fileno()).st_size)
+    return data
 
 
-def save_json(file_path: Path, data: dict):
-    with open(file_path, "w") as f:
+def _write_json(file_path: Path, data: dict):
+    # Write to a private temp file and rename it into place so concurrent
+    # readers (server workers, the daemon) never see a half-written file
+    tmp = _tmp_path(file_path)
+    with open(tmp, "w") as f:
         json.dump(data, f, indent=2)
+    if metrics.enabled():
+        metrics.record_storage("write", file_path, tmp.stat().st_size)
+    is_progress = file_path.name == PROGRESS_FILE.name
+    if is_progress:
+        from srl.due import progress_signature, write_index
+
+        # The rename keeps mtime and size: this is the signature of what we wrote
+        signature = progress_signature(tmp)
+    os.replace(tmp, file_path)
+
+    if is_progress:
+        write_index(data, progress_file=file_path, signature=signature)
+
+
+def _tmp_path(file_path: Path) -> Path:
+    return file_path.with_name(
+        f".{file_path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+
+
+class Session:
+    """
+    Keeps every file loaded or saved through load_json/save_json in memory
+    and writes the changed ones once, on commit().
+
+    Loads return the shared in-memory object, so a run of commands costs one
+    parse and one write per file. savepoint()/rollback() undo a single failed
+    command. Nothing is copied up front: while a savepoint is active each
+    file records the entries a command reaches (see _UndoDict), so a
+    savepoint costs what the command touches rather than the file's size.
+    """
+
+    def __init__(self):
+        self.data: dict[Path, dict] = {}
+        self.dirty: dict[Path, None] = {}  # insertion-ordered set
+        self.discarded = False
+        # File -> (its object at the savepoint, or None, and whether it was
+        # dirty) for files loaded or saved since the savepoint
+        self._savepoint: dict[Path, tuple[dict | None, bool]] | None = None
+
+    def load(self, file_path: Path) -> dict:
+        if file_path not in self.data:
+            self._snapshot(file_path)
+            # Always a private copy: commands mutate what they load
+            store = current_store()
+            if store is not None:
+                data = _UndoDict(store.load(file_path))
+            else:
+                data = _UndoDict(_read_json(file_path))
+            if self._savepoint is not None:
+                data.undo = {}
+            self.data[file_path] = data
+        return self.data[file_path]
+
+    def save(self, file_path: Path, data: dict):
+        self._snapshot(file_path)
+        self.data[file_path] = data
+        self.dirty[file_path] = None
+
+    def _snapshot(self, file_path: Path):
+        if self._savepoint is None or file_path in self._savepoint:
+            return
+        self._savepoint[file_path] = (
+            self.data.get(file_path),
+            file_path in self.dirty,
+        )
+
+    def savepoint(self):
+        self._savepoint = {}
+        for file_path, data in self.data.items():
+            if not isinstance(data, _UndoDict):
+                # Saved whole by the previous command; track it from here
+                data = self.data[file_path] = _UndoDict(data)
+            data.undo = {}
+
+    def rollback(self):
+        """Undo every change made since the last savepoint()."""
+        for file_path, (data, was_dirty) in (self._savepoint or {}).items():
+            if data is None:
+                self.data.pop(file_path, None)
+            else:
+                self.data[file_path] = data
+            if not was_dirty:
+                self.dirty.pop(file_path, None)
+        for data in self.data.values():
+            if isinstance(data, _UndoDict) and data.undo:
+                data.restore()
+        self.savepoint()
+
+    def discard(self):
+        """Drop all pending changes; nothing is written on exit."""
+        self.data.clear()
+        self.dirty.clear()
+        self.discarded = True
+
+    def commit(self):
+        for file_path in list(self.dirty):
+            _save(file_path, dict(self.data[file_path]))
+        self.dirty.clear()
+
+
+_MISSING = object()
+
+
+class _UndoDict(dict):
+    """
+    A session's copy of a data file. While `undo` is a dict (a savepoint is
+    active), each key's value is deep-copied into it the first time the key
+    is reached: by lookup, assignment, deletion or iteration over values.
+    Nested values can only be mutated after being reached that way, so
+    restore() puts back exactly what a command may have changed.
+    """
+
+    __slots__ = ("undo",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.undo: dict | None = None
+
+    def _touch(self, key):
+        undo = self.undo
+        if undo is not None and key not in undo:
+            value = dict.get(self, key, _MISSING)
+            undo[key] = value if value is _MISSING else copy.deepcopy(value)
+
+    def _touch_all(self):
+        if self.undo is not None:
+            for key in dict.keys(self):
+                self._touch(key)
+
+    def restore(self):
+        for key, value in self.undo.items():
+            if value is _MISSING:
+                dict.pop(self, key, None)
+            else:
+                dict.__setitem__(self, key, value)
+        self.undo = {}
+
+    def __getitem__(self, key):
+        self._touch(key)
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        self._touch(key)
+        return dict.get(self, key, default)
+
+    def __setitem__(self, key, value):
+        self._touch(key)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        self._touch(key)
+        dict.__delitem__(self, key)
+
+    def setdefault(self, key, default=None):
+        self._touch(key)
+        return dict.setdefault(self, key, default)
+
+    def pop(self, key, *default):
+        self._touch(key)
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        self._touch_all()
+        return dict.popitem(self)
+
+    def update(self, *args, **kwargs):
+        other = dict(*args, **kwargs)
+        for key in other:
+            self._touch(key)
+        dict.update(self, other)
+
+    def clear(self):
+        self._touch_all()
+        dict.clear(self)
+
+    def copy(self):
+        self._touch_all()
+        return dict(self)
+
+    def values(self):
+        if self.undo is None:
+            return dict.values(self)
+        return (self[key] for key in dict.keys(self))
+
+    def items(self):
+        if self.undo is None:
+            return dict.items(self)
+        return ((key, self[key]) for key in dict.keys(self))
+
+
+_session: ContextVar[Session | None] = ContextVar("srl_storage_session", default=None)
+
+
+@contextmanager
+def session():
+    """
+    Buffer storage reads and writes in memory for the duration of the block.
+
+    Changed files are written once when the block exits normally (unless
+    discard() was called); an exception leaves the files on disk untouched.
+    Nested sessions join the outer one.
+    """
+    current = _session.get()
+    if current is not None:
+        yield current
+        return
+
+    current = Session()
+    token = _session.set(current)
+    try:
+        yield current
+    finally:
+        _session.reset(token)
+    if not current.discarded:
+        current.commit()
+
+
+# In-memory authoritative store (see srl.store), installed by server mode
+_store = None
+_shared_reads: ContextVar[bool] = ContextVar("srl_shared_reads", default=False)
+
+
+def install_store(store):
+    """Serve load_json/save_json from `store` (None to go back to disk)."""
+    global _store
+    _store = store
+
+
+def current_store():
+    """The store serving the current context, if any."""
+    if _direct.get():
+        return None
+    return _user_store.get() or _store
+
+
+# Per-request data root and store, set by user_root()
+_data_root: ContextVar[Path | None] = ContextVar("srl_data_root", default=None)
+_user_store: ContextVar = ContextVar("srl_user_store", default=None)
+
+
+@contextmanager
+def user_root(root: Path, store=None):
+    """
+    Read and write data files under `root` instead of DATA_DIR for the
+    duration of the block, optionally served from `store`. The path
+    constants keep working: load_json(PROGRESS_FILE) maps to the file of the
+    same name under root.
+    """
+    root_token = _data_root.set(Path(root))
+    store_token = _user_store.set(store)
+    try:
+        yield
+    finally:
+        _user_store.reset(store_token)
+        _data_root.reset(root_token)
+
+
+def current_root() -> Path | None:
+    """The data root set by user_root() for the current context, if any."""
+    return _data_root.get()
+
+
+_direct: ContextVar[bool] = ContextVar("srl_direct", default=False)
+
+
+@contextmanager
+def on_disk():
+    """
+    Read and write the files themselves for the duration of the block,
+    bypassing any installed store and open session: srl.staging builds new
+    data files this way, under user_root(), before swapping them in.
+    """
+    direct_token = _direct.set(True)
+    session_token = _session.set(None)
+    try:
+        yield
+    finally:
+        _session.reset(session_token)
+        _direct.reset(direct_token)
+
+
+def is_read_only() -> bool:
+    """Whether the current context is inside read_only()."""
+    return _shared_reads.get()
+
+
+@contextmanager
+def read_only():
+    """
+    Promise not to mutate anything loaded in this block, so an installed
+    store can hand out its shared objects instead of copies.
+    """
+    token = _shared_reads.set(True)
+    try:
+        yield
+    finally:
+        _shared_reads.reset(token)
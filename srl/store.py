@@ -0,0 +1,229 @@
+"""
+In-memory authoritative store with write-behind persistence.
+
+While a Store is installed (`srl server --in-memory`), storage.load_json and
+storage.save_json are served from memory. Saved collections are marked dirty
+and a background thread writes them to disk after a debounce interval, so a
+burst of mutations to one file costs a single write. flush_interval=0 is sync
+mode: every save is written through before save_json returns.
+
+Objects handed out to read-only callers (see storage.read_only()) are shared
+and must not be mutated; everyone else gets a private copy. Saved objects are
+owned by the store and must not be mutated after save_json.
+
+A multi-user server keeps one Store per user data root in a StoreCache, an
+LRU bounded by store count and approximate memory.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from srl import storage
+
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_MAX_STORES = 256
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class Store:
+    def __init__(self, flush_interval: float | None = None):
+        if flush_interval is None:
+            flush_interval = float(
+                os.environ.get("SRL_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL)
+            )
+        self.flush_interval = flush_interval
+        self.id = f"{os.getpid()}-{time.time_ns()}"
+        self.data: dict[Path, dict] = {}
+        self.versions: dict[Path, int] = {}
+        self.writes = 0
+        # Serialized size of each collection as last read or written; a
+        # cheap stand-in for its memory footprint
+        self.sizes: dict[Path, int] = {}
+        self._compact: dict[Path, str] = {}
+        self._dirty: dict[Path, float] = {}  # path -> time it was first dirtied
+        self._lock = threading.Lock()
+        # Held while writing, so replace() never races a flush of the old data
+        self._write_lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._closed = False
+        self._thread = None
+        if flush_interval > 0:
+            self._thread = threading.Thread(
+                target=self._flush_loop, name="srl-store-writer", daemon=True
+            )
+            self._thread.start()
+
+    def preload(self, paths):
+        for file_path in paths:
+            self.load(file_path, shared=True)
+
+    def load(self, file_path: Path, shared: bool = False) -> dict:
+        with self._lock:
+            if file_path not in self.data:
+                self.data[file_path] = storage._read_json(file_path)
+                self.sizes[file_path] = _file_size(file_path)
+            if shared:
+                return self.data[file_path]
+            compact = self._compact.get(file_path)
+            if compact is None:
+                compact = self._compact[file_path] = json.dumps(self.data[file_path])
+        return json.loads(compact)
+
+    def save(self, file_path: Path, data: dict):
+        # Serialized up front: sizes the collection, and the next private
+        # copy handed out by load() is parsed from it
+        compact = json.dumps(data)
+        with self._lock:
+            self.data[file_path] = data
+            self.versions[file_path] = self.versions.get(file_path, 0) + 1
+            self._compact[file_path] = compact
+            self.sizes[file_path] = len(compact)
+            if self.flush_interval > 0:
+                self._dirty.setdefault(file_path, time.monotonic())
+                self._wake.notify()
+                return
+        # Sync mode: write through on the caller's thread
+        with self._write_lock:
+            self._write(file_path, data)
+
+    def replace(self, file_path: Path, new_file: Path):
+        """
+        Move new_file into file_path's place (os.replace) and read it from
+        there on the next load, dropping changes to the old data that were
+        never written.
+        """
+        with self._write_lock, self._lock:
+            os.replace(new_file, file_path)
+            self._dirty.pop(file_path, None)
+            self.data.pop(file_path, None)
+            self._compact.pop(file_path, None)
+            self.sizes.pop(file_path, None)
+            self.versions[file_path] = self.versions.get(file_path, 0) + 1
+
+    def signature(self, file_path: Path) -> list:
+        """Changes whenever file_path is saved through this store."""
+        return ["memory", self.id, self.versions.get(file_path, 0)]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(self.sizes.values())
+
+    @property
+    def dirty(self) -> list[Path]:
+        with self._lock:
+            return list(self._dirty)
+
+    def flush(self):
+        """Write every dirty collection now."""
+        with self._write_lock:
+            with self._lock:
+                pending = [(path, self.data[path]) for path in self._dirty]
+                self._dirty.clear()
+            for file_path, data in pending:
+                self._write(file_path, data)
+
+    def close(self):
+        """Stop the background writer and flush whatever is still dirty."""
+        with self._lock:
+            self._closed = True
+            self._wake.notify()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def _write(self, file_path: Path, data: dict):
+        storage._write_json(file_path, data)
+        self.writes += 1
+
+    def _flush_loop(self):
+        while True:
+            with self._lock:
+                while not self._dirty and not self._closed:
+                    self._wake.wait()
+                if self._closed:
+                    return
+                # Debounce from the oldest pending change so a steady stream
+                # of saves still reaches disk within flush_interval
+                due = min(self._dirty.values()) + self.flush_interval
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self._wake.wait(delay)
+                    continue
+            self.flush()
+
+
+class StoreCache:
+    """
+    Open Stores by data root, least recently used first. Once there are more
+    than max_stores or their combined size passes max_bytes, idle stores are
+    flushed and dropped; stores in use by a request (acquired and not yet
+    released) are never evicted.
+    """
+
+    def __init__(
+        self,
+        max_stores: int | None = None,
+        max_bytes: int | None = None,
+        flush_interval: float | None = None,
+    ):
+        self.max_stores = max_stores or DEFAULT_MAX_STORES
+        self.max_bytes = max_bytes or DEFAULT_MAX_BYTES
+        self.flush_interval = flush_interval
+        self.stores: OrderedDict[Path, Store] = OrderedDict()
+        self.pins: dict[Path, int] = {}
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            return sum(store.nbytes for store in self.stores.values())
+
+    def acquire(self, root: Path) -> Store:
+        """The store for root, opened if needed and pinned until release()."""
+        # Held throughout so a root being evicted is fully flushed before it
+        # can be opened again
+        with self._lock:
+            store = self.stores.get(root)
+            if store is None:
+                root.mkdir(parents=True, exist_ok=True)
+                store = self.stores[root] = Store(self.flush_interval)
+                store.preload(root / path.name for path in storage.data_files())
+            self.stores.move_to_end(root)
+            self.pins[root] = self.pins.get(root, 0) + 1
+            self._evict()
+            return store
+
+    def release(self, root: Path):
+        with self._lock:
+            self.pins[root] -= 1
+            if not self.pins[root]:
+                del self.pins[root]
+            self._evict()
+
+    def close(self):
+        with self._lock:
+            for store in self.stores.values():
+                store.close()
+            self.stores.clear()
+
+    def _evict(self):
+        total = sum(store.nbytes for store in self.stores.values())
+        for root in list(self.stores):
+            if len(self.stores) <= self.max_stores and total <= self.max_bytes:
+                return
+            if root in self.pins:
+                continue
+            store = self.stores.pop(root)
+            total -= store.nbytes
+            store.close()
+            self.evictions += 1
+
+
+def _file_size(file_path: Path) -> int:
+    try:
+        return file_path.stat().st_size
+    except FileNotFoundError:
+        return 0
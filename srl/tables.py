@@ -0,0 +1,254 @@
+"""
+Flat, typed tables derived from the data files, for analytics tools
+(`srl export --table attempts`).
+
+The attempts table has one row per history record of every in-progress and
+mastered problem. Rows are read from the data files one problem at a time
+and encoded TABLE_CHUNK_ROWS at a time, so export time is linear in the
+number of attempts and peak memory is bounded by the chunk size.
+
+CSV needs nothing beyond the standard library; Parquet needs `pyarrow` and
+npy needs `numpy`, both optional and only imported when used.
+"""
+import csv
+import io
+from datetime import date
+from itertools import islice
+from typing import Iterator
+from srl import storage
+from srl.formats import FormatError
+
+TABLES = ("attempts",)
+TABLE_FORMATS = ("csv", "parquet", "npy")
+
+# Rows encoded per chunk (a Parquet row group, a block of npy records)
+TABLE_CHUNK_ROWS = 65536
+
+ATTEMPT_COLUMNS = (
+    "problem",
+    "leetcode_id",
+    "status",
+    "date",
+    "rating",
+    "time_spent",
+    "has_note",
+    "has_mistake",
+)
+
+
+def iter_attempts() -> Iterator[tuple]:
+    """One row, in ATTEMPT_COLUMNS order, per recorded attempt."""
+    sources = (
+        ("in_progress", storage.PROGRESS_FILE),
+        ("mastered", storage.MASTERED_FILE),
+    )
+    for status, file_path in sources:
+        for name, problem in storage.iter_json_members(file_path):
+            leetcode_id = _int(problem.get("leetcode_id"))
+            for record in problem.get("history", []):
+                yield (
+                    name,
+                    leetcode_id,
+                    status,
+                    _date(record.get("date")),
+                    _int(record.get("rating")),
+                    _int(record.get("time_spent")),
+                    bool(record.get("note")),
+                    bool(record.get("mistake")),
+                )
+
+
+def table_chunks(table: str, fmt: str, counts: dict | None = None) -> Iterator[bytes]:
+    """
+    Encode `table` in `fmt`, a chunk of rows at a time. counts[table] is
+    kept up to date with the rows written.
+    """
+    if table not in TABLES:
+        raise FormatError(f"Unknown table {table!r}")
+    if fmt not in TABLE_FORMATS:
+        raise FormatError(f"Tables can't be written as {fmt}")
+    counts = {} if counts is None else counts
+    counts[table] = 0
+
+    def rows():
+        for row in iter_attempts():
+            counts[table] += 1
+            yield row
+
+    if fmt == "csv":
+        return _csv_chunks(rows())
+    if fmt == "parquet":
+        return _parquet_chunks(rows())
+    return _npy_chunks(rows())
+
+
+def _batches(rows: Iterator[tuple]) -> Iterator[list[tuple]]:
+    while batch := list(islice(rows, TABLE_CHUNK_ROWS)):
+        yield batch
+
+
+def _csv_chunks(rows: Iterator[tuple]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(ATTEMPT_COLUMNS)
+    for batch in _batches(rows):
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def _parquet_chunks(rows: Iterator[tuple]) -> Iterator[bytes]:
+    pa, pq = _pyarrow()
+    schema = pa.schema(
+        [
+            ("problem", pa.string()),
+            ("leetcode_id", pa.int64()),
+            ("status", pa.dictionary(pa.int8(), pa.string())),
+            ("date", pa.date32()),
+            ("rating", pa.int8()),
+            ("time_spent", pa.int32()),
+            ("has_note", pa.bool_()),
+            ("has_mistake", pa.bool_()),
+        ]
+    )
+    sink = _Sink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+    try:
+        for batch in _batches(rows):
+            columns = list(zip(*batch))
+            arrays = [
+                pa.array(values, type=field.type.value_type).dictionary_encode()
+                if pa.types.is_dictionary(field.type)
+                else pa.array(values, type=field.type)
+                for field, values in zip(schema, columns)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def _npy_chunks(rows: Iterator[tuple]) -> Iterator[bytes]:
+    np = _numpy()
+    from numpy.lib import format as npy_format
+
+    # The header holds the row count and the widest name: one pass to find
+    # them, a second to write the records
+    count = 0
+    widest = 1
+    for row in iter_attempts():
+        count += 1
+        widest = max(widest, len(row[0]))
+    dtype = np.dtype(
+        [
+            ("problem", f"U{widest}"),
+            ("leetcode_id", "i8"),  # -1 if unknown
+            ("status", "U11"),
+            ("date", "M8[D]"),
+            ("rating", "i1"),  # 0 if unknown
+            ("time_spent", "i4"),  # -1 if unknown
+            ("has_note", "?"),
+            ("has_mistake", "?"),
+        ]
+    )
+    header = io.BytesIO()
+    npy_format.write_array_header_1_0(
+        header,
+        {
+            "descr": npy_format.dtype_to_descr(dtype),
+            "fortran_order": False,
+            "shape": (count,),
+        },
+    )
+    yield header.getvalue()
+
+    written = 0
+    for batch in _batches(rows):
+        # Data changed between the passes: keep the file consistent with
+        # the header rather than writing a corrupt array
+        batch = batch[: count - written]
+        written += len(batch)
+        records = [_npy_record(row) for row in batch]
+        yield np.array(records, dtype=dtype).tobytes()
+    if written < count:
+        yield np.zeros(count - written, dtype=dtype).tobytes()
+
+
+def _npy_record(row: tuple) -> tuple:
+    # npy has no nulls: the sentinels noted on the dtype stand in for them
+    problem, leetcode_id, status, day, rating, time_spent, has_note, has_mistake = row
+    return (
+        problem,
+        -1 if leetcode_id is None else leetcode_id,
+        status,
+        day,
+        rating or 0,
+        -1 if time_spent is None else time_spent,
+        has_note,
+        has_mistake,
+    )
+
+
+class _Sink:
+    """Write-only file collecting bytes for the caller to drain."""
+
+    closed = False
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _int(value) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _date(value) -> date | None:
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise FormatError(
+            "parquet needs the pyarrow package (pip install 'srl[formats]')"
+        ) from None
+    return pyarrow, pyarrow.parquet
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise FormatError(
+            "npy needs the numpy package (pip install 'srl[formats]')"
+        ) from None
+    return numpy
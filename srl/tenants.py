@@ -0,0 +1,113 @@
+"""
+Per-user data roots for a server shared by several learners.
+
+A request picks its user with an `X-SRL-User` header or a `/u/<user>` path
+prefix (`/u/alice/due` is served as `/due` for alice). Its data then lives in
+USERS_DIR/<user> instead of DATA_DIR: the middleware runs the rest of the
+request under storage.user_root(), which every load, save, write lock and
+cache key picks up. Requests naming no user use DATA_DIR as before.
+
+Commands a user runs through /run or /batch can only name files inside their
+own root (see confine_paths()).
+"""
+import asyncio
+import json
+import re
+from pathlib import Path
+from srl import storage
+
+USER_HEADER = b"x-srl-user"
+PATH_PREFIX = "/u/"
+VALID_USER = re.compile(r"[A-Za-z0-9_][A-Za-z0-9_.-]{0,63}")
+
+# Parsed arguments naming files a command reads or writes: export --output
+# and --sqlite, import --file, nextup --file
+PATH_ARGUMENTS = ("output", "sqlite", "file")
+
+
+def request_user(scope) -> tuple[str | None, dict]:
+    """The user a request names, and its scope with any /u/<user> stripped."""
+    path = scope["path"]
+    if path.startswith(PATH_PREFIX):
+        user, _, rest = path[len(PATH_PREFIX):].partition("/")
+        rest = "/" + rest
+        return user, {**scope, "path": rest, "raw_path": rest.encode()}
+    for name, value in scope.get("headers", ()):
+        if name == USER_HEADER:
+            return value.decode("latin-1"), scope
+    return None, scope
+
+
+def confine_paths(args, root: Path) -> str | None:
+    """
+    Resolve a user's file arguments inside their data root, in place:
+    relative paths are taken from the root, and anything that ends up outside
+    it (absolute paths, `..`, another user's directory) is refused. Returns
+    the error for the first path refused, or None.
+    """
+    root = Path(root).resolve()
+    for name in PATH_ARGUMENTS:
+        value = getattr(args, name, None)
+        if value is None:
+            continue
+        confined = []
+        for path in value if isinstance(value, list) else [value]:
+            if path == "-":  # stdout
+                confined.append(path)
+                continue
+            resolved = (root / path).resolve()
+            if not resolved.is_relative_to(root):
+                return f"{path} is outside your data directory"
+            confined.append(str(resolved))
+        setattr(args, name, confined if isinstance(value, list) else confined[0])
+    return None
+
+
+class UserRootMiddleware:
+    """ASGI middleware running each request against its user's data root."""
+
+    def __init__(self, app, users_dir: Path, stores=None):
+        self.app = app
+        self.users_dir = Path(users_dir)
+        self.stores = stores  # StoreCache when serving from memory
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        user, scope = request_user(scope)
+        if user is None:
+            await self.app(scope, receive, send)
+            return
+        if not VALID_USER.fullmatch(user):
+            await _reject(send, f"Invalid user name: {user!r}")
+            return
+
+        root = self.users_dir / user
+        store = None
+        if self.stores is not None:
+            # Opening a store reads the user's files; keep that off the loop
+            store = await asyncio.to_thread(self.stores.acquire, root)
+        try:
+            with storage.user_root(root, store):
+                await self.app(scope, receive, send)
+        finally:
+            if store is not None:
+                # Releasing may evict and flush another user's store
+                await asyncio.to_thread(self.stores.release, root)
+
+
+async def _reject(send, error: str):
+    body = json.dumps({"error": error}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 400,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
@@ -1,5 +1,48 @@
+import sys
 from datetime import datetime
 
 
 def today():
     return datetime.today().date()
+
+
+class LazyConsole:
+    """
+    Stand-in for rich.console.Console that only imports Rich on first use,
+    so commands that never print through Rich don't pay for it at startup.
+    """
+
+    def __init__(self, **kwargs):
+        object.__setattr__(self, "_kwargs", kwargs)
+        object.__setattr__(self, "_console", None)
+
+    @property
+    def loaded(self) -> bool:
+        return self._console is not None
+
+    def _get(self):
+        if self._console is None:
+            from rich.console import Console
+
+            object.__setattr__(self, "_console", Console(**self._kwargs))
+        return self._console
+
+    def out(self, *objects, sep=" ", end="\n", **kwargs):
+        """Plain output; bypasses Rich entirely if nothing loaded it yet."""
+        if self._console is None and not kwargs:
+            sys.stdout.write(sep.join(str(o) for o in objects) + end)
+        else:
+            self._get().out(*objects, sep=sep, end=end, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._get(), name, value)
+
+    # Special methods skip __getattr__; Rich's live displays enter the console
+    def __enter__(self):
+        return self._get().__enter__()
+
+    def __exit__(self, *exc_info):
+        return self._get().__exit__(*exc_info)
@@ -0,0 +1,118 @@
+"""
+Bounded worker pool for running blocking commands from the HTTP server.
+
+Command handlers do synchronous file I/O and JSON parsing, so the server
+hands them to a small thread pool instead of running them on the event
+loop. Writers to the same data directory are serialized with a lock, and
+once every worker is busy and the queue is full new work is refused with
+Saturated (mapped to 503 by the server). SingleFlight lets identical
+concurrent reads share one computation.
+"""
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from srl import storage
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_QUEUE = 32
+
+_write_locks: dict[Path, threading.Lock] = {}
+_write_locks_guard = threading.Lock()
+
+
+class Saturated(Exception):
+    """Every worker is busy and the queue is full."""
+
+
+def write_lock(data_dir: Path | None = None) -> threading.Lock:
+    """The lock serializing writers to one data directory."""
+    key = Path(data_dir or storage.data_dir()).resolve()
+    with _write_locks_guard:
+        lock = _write_locks.get(key)
+        if lock is None:
+            lock = _write_locks[key] = threading.Lock()
+        return lock
+
+
+def _locked(lock: threading.Lock, fn, *args):
+    with lock:
+        return fn(*args)
+
+
+def _read_only(fn, *args):
+    with storage.read_only():
+        return fn(*args)
+
+
+class WorkerPool:
+    def __init__(self, workers: int | None = None, max_queue: int | None = None):
+        self.workers = workers or int(
+            os.environ.get("SRL_SERVER_WORKERS", DEFAULT_WORKERS)
+        )
+        if max_queue is None:
+            max_queue = int(os.environ.get("SRL_SERVER_MAX_QUEUE", DEFAULT_MAX_QUEUE))
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            self.workers, thread_name_prefix="srl-worker"
+        )
+        # Running plus queued calls; only touched from the event loop thread
+        self.pending = 0
+
+    async def run(self, fn, *args, write: bool = False):
+        """
+        Run fn(*args) on a worker thread and return its result.
+
+        With write=True the call holds the current data directory's write
+        lock; otherwise it runs under storage.read_only() and must not mutate
+        what it loads. Context variables are carried over to the worker.
+        """
+        if self.pending >= self.workers + self.max_queue:
+            raise Saturated()
+
+        if write:
+            fn = functools.partial(_locked, write_lock(), fn)
+        else:
+            fn = functools.partial(_read_only, fn)
+        ctx = contextvars.copy_context()
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, functools.partial(ctx.run, fn, *args)
+            )
+        finally:
+            self.pending -= 1
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+class SingleFlight:
+    """
+    Coalesce identical in-flight calls: while a call for a key is running,
+    later callers with the same key await its result instead of starting
+    their own. Only touched from the event loop thread.
+    """
+
+    def __init__(self):
+        self.in_flight: dict[tuple, asyncio.Future] = {}
+        self.computations = 0
+        self.coalesced = 0  # callers served by someone else's computation
+
+    async def run(self, key: tuple, fn):
+        """Await fn() (a coroutine function), or the running call for key."""
+        task = self.in_flight.get(key)
+        if task is None:
+            # A task of its own, so a caller that disconnects doesn't cancel
+            # the computation for everyone else waiting on it
+            task = asyncio.ensure_future(fn())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+            self.computations += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
@@ -5,9 +5,19 @@ from rich.console import Console
 from dataclasses import dataclass
 import pathlib
 import json
+import importlib
+import os
 from datetime import datetime, timedelta
 from srl import cli
 
+# Never forward test invocations to a daemon the developer may have running
+os.environ["SRL_NO_DAEMON"] = "1"
+
+# Commands are imported lazily by the CLI; load them all up front so the
+# mock_data fixture can patch their storage paths.
+for module_name, _ in cli.COMMANDS.values():
+    importlib.import_module(module_name)
+
 
 @dataclass
 class Paths:
@@ -16,6 +26,9 @@ class Paths:
     NEXT_UP_FILE: pathlib.Path
     AUDIT_FILE: pathlib.Path
     CONFIG_FILE: pathlib.Path
+    STATS_FILE: pathlib.Path
+    DUE_FILE: pathlib.Path
+    JOURNAL_FILE: pathlib.Path
 
 
 @pytest.fixture
@@ -52,10 +65,15 @@ def mock_data(tmp_path, monkeypatch):
         NEXT_UP_FILE=tmp_path / "next_up.json",
         AUDIT_FILE=tmp_path / "audit.json",
         CONFIG_FILE=tmp_path / "config.json",
+        STATS_FILE=tmp_path / "stats.json",
+        DUE_FILE=tmp_path / "due_count",
+        JOURNAL_FILE=tmp_path / "journal.ndjson",
     )
 
     for name, path in vars(paths).items():
-        path.write_text("{}")
+        # No journal until a test starts one
+        if name != "JOURNAL_FILE":
+            path.write_text("{}")
         for mod in vars(srl.commands).values():
             if hasattr(mod, name):
                 monkeypatch.setattr(f"{mod.__name__}.{name}", path)
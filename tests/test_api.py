@@ -0,0 +1,148 @@
+from fastapi.testclient import TestClient
+
+from srl.commands import list_
+from srl.server import create_app
+
+
+def test_attempts_and_problem_lookup(backdate_problem):
+    client = TestClient(create_app())
+    resp = client.post("/attempts", json={"name": "Two Sum", "rating": 2, "id": 1, "note": "hash map"})
+    assert resp.status_code == 201
+    assert resp.json() == {"status": "added", "name": "Two Sum", "rating": 2, "leetcode_id": 1}
+
+    backdate_problem("Two Sum", 3)
+    due = client.get("/due").json()
+    assert [p["name"] for p in due["problems"]] == ["Two Sum"]
+    assert due["problems"][0]["days_overdue"] == 1
+
+    problem = client.get("/problems/two sum").json()
+    assert problem["name"] == "Two Sum"
+    assert problem["status"] == "In Progress"
+    assert problem["history"][0]["note"] == "hash map"
+
+    assert client.get("/problems/missing").status_code == 404
+
+
+def test_attempt_validation_and_errors():
+    client = TestClient(create_app())
+    assert client.post("/attempts", json={"name": "X", "rating": 6}).status_code == 422
+    assert client.post("/attempts", json={"rating": 3}).status_code == 422
+    assert client.post("/attempts", json={"leetcode_id": 99, "rating": 3}).status_code == 404
+
+
+def test_mastered_and_calendar():
+    client = TestClient(create_app())
+    for _ in range(2):
+        client.post("/attempts", json={"name": "Easy", "rating": 5})
+
+    mastered = client.get("/mastered").json()
+    assert mastered["count"] == 1
+    assert mastered["problems"][0]["attempts"] == 2
+
+    cal = client.get("/calendar", params={"months": 1}).json()
+    assert cal["months"] == 1
+    assert sum(cal["days"].values()) == 2
+    assert cal["summary"]["total"] == 2
+
+
+def test_nextup_crud():
+    client = TestClient(create_app())
+    assert client.post("/nextup", json={"name": "Queued"}).status_code == 201
+    assert client.post("/nextup", json={"name": "Queued"}).status_code == 409
+    assert client.get("/nextup").json() == {"problems": [{"name": "Queued", "leetcode_id": None}]}
+
+    assert client.delete("/nextup/Queued").status_code == 204
+    assert client.delete("/nextup/Queued").status_code == 404
+
+    client.post("/nextup", json={"name": "Other"})
+    assert client.delete("/nextup").status_code == 204
+    assert client.get("/nextup").json() == {"problems": []}
+
+
+def test_read_endpoints_support_conditional_requests(monkeypatch):
+    client = TestClient(create_app())
+    client.post("/attempts", json={"name": "Two Sum", "rating": 3})
+
+    calls = []
+    due_problems = list_.due_problems
+
+    def counting(limit):
+        calls.append(limit)
+        return due_problems(limit)
+
+    monkeypatch.setattr(list_, "due_problems", counting)
+
+    first = client.get("/due")
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert client.get("/due").json() == first.json()
+    assert calls == [None]  # second response came from the cache
+
+    unchanged = client.get("/due", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.headers["ETag"] == etag
+
+    client.post("/attempts", json={"name": "Valid Anagram", "rating": 3})
+    changed = client.get("/due", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert len(calls) == 2
+
+
+def test_large_responses_are_gzipped():
+    client = TestClient(create_app())
+    for i in range(40):
+        client.post("/attempts", json={"name": f"Problem {i}", "rating": 5})
+        client.post("/attempts", json={"name": f"Problem {i}", "rating": 5})
+
+    resp = client.get("/mastered", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert resp.json()["count"] == 40
+
+
+def test_export_download_streams_document(tmp_path):
+    client = TestClient(create_app(users_dir=tmp_path / "users"))
+    client.post("/attempts", json={"name": "Two Sum", "rating": 3})
+    client.post("/u/alice/attempts", json={"name": "Valid Anagram", "rating": 3})
+
+    resp = client.get("/export", params={"type": "progress_only", "compact": True})
+    assert resp.status_code == 200
+    assert "attachment" in resp.headers["Content-Disposition"]
+    assert list(resp.json()["data"]["problems_in_progress"]) == ["Two Sum"]
+
+    alice = client.get("/u/alice/export").json()
+    assert list(alice["data"]["problems_in_progress"]) == ["Valid Anagram"]
+    assert client.get("/export", params={"type": "bogus"}).status_code == 422
+
+
+def test_export_download_runs_on_the_pool():
+    app = create_app()
+    client = TestClient(app)
+    client.post("/attempts", json={"name": "Two Sum", "rating": 3})
+    pool = app.state.pool
+    calls = []
+
+    async def run(fn, *args, write=False):
+        calls.append((fn.__module__, write))
+        return await type(pool).run(pool, fn, *args, write=write)
+
+    pool.run = run
+    resp = client.get("/export")
+    assert list(resp.json()["data"]["problems_in_progress"]) == ["Two Sum"]
+    # Written like `srl export`, under the write lock: it starts the journal
+    assert calls == [("srl.commands.export", True)]
+
+
+def test_export_sqlite_download(tmp_path):
+    import sqlite3
+
+    client = TestClient(create_app())
+    client.post("/attempts", json={"name": "Two Sum", "rating": 3})
+
+    resp = client.get("/export/sqlite")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/vnd.sqlite3"
+    db = tmp_path / "download.db"
+    db.write_bytes(resp.content)
+    conn = sqlite3.connect(db)
+    assert conn.execute("SELECT name FROM problems").fetchall() == [("Two Sum",)]
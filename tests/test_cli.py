@@ -1,4 +1,10 @@
+import argparse
+import io
+import json
+import subprocess
+import sys
 import pytest
+from srl import cli
 
 
 def test_add_by_name(parser):
@@ -223,3 +229,92 @@ def test_random_command_all_flag(parser):
     assert args.command == "random"
     assert hasattr(args, "handler")
     assert args.all
+
+
+def test_build_parser_imports_only_dispatched_command():
+    code = (
+        "import sys\n"
+        "from srl import cli\n"
+        "cli.build_parser().parse_args(['take', '1'])\n"
+        "print(' '.join(sorted(m for m in sys.modules if m.startswith(('srl.commands.', 'rich.')))))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout.split()
+
+    assert "srl.commands.take" in out
+    for heavy in ("srl.commands.calendar", "srl.commands.import_", "rich.table", "rich.prompt"):
+        assert heavy not in out
+
+
+def test_subcommand_help_lists_all_commands(parser, capsys):
+    with pytest.raises(SystemExit):
+        parser.parse_args(["--help"])
+    out, _ = capsys.readouterr()
+    for name in cli.COMMANDS:
+        assert name in out
+
+
+def test_format_before_or_after_command(parser):
+    assert parser.parse_args(["mastered"]).format == "rich"
+    assert parser.parse_args(["--format", "json", "mastered"]).format == "json"
+    assert parser.parse_args(["mastered", "--format", "ndjson"]).format == "ndjson"
+    with pytest.raises(SystemExit):
+        parser.parse_args(["mastered", "--format", "xml"])
+
+
+def test_format_ndjson_does_not_import_rich(tmp_path):
+    code = (
+        "import sys\n"
+        "sys.argv = ['srl', 'mastered', '--format', 'ndjson']\n"
+        "from srl.main import main\n"
+        "main()\n"
+        "print(any(m == 'rich' or m.startswith('rich.') for m in sys.modules))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={"HOME": str(tmp_path), "SRL_NO_DAEMON": "1"},
+    ).stdout.split()
+
+    assert out == ["False"]
+
+
+def test_dispatch_writes_result_as_json(parser):
+    args = parser.parse_args(["nextup", "add", "Dispatched", "--format", "json"])
+    out = io.StringIO()
+    cli.dispatch(parser, args, console=None, out=out)
+
+    result = json.loads(out.getvalue())
+    assert result["type"] == "NextUpResult"
+    assert result["outcomes"] == [{"name": "Dispatched", "status": "added"}]
+
+
+def test_command_modules_leave_help_to_cli(parser):
+    # Every module declares its arguments through _DeclaredParser, which
+    # rejects a second copy of the help kept in COMMANDS
+    cli.preload(parser)
+
+
+def test_declared_parser_rejects_help():
+    stub = argparse.ArgumentParser()
+    with pytest.raises(TypeError, match="COMMANDS"):
+        cli._DeclaredParser(stub).add_parser("add", help="Add a problem")
+
+
+def test_format_only_on_commands_that_support_it(parser):
+    cli.preload(parser)
+    subparsers = next(
+        action
+        for action in parser._actions
+        if isinstance(action, cli.LazySubParsersAction)
+    )
+    for name, subparser in subparsers.choices.items():
+        options = {
+            option for action in subparser._actions for option in action.option_strings
+        }
+        defaults = subparser._defaults
+        supported = "run" in defaults or "records" in defaults
+        assert ("--format" in options) == supported, name
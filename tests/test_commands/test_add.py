@@ -241,3 +241,13 @@ def test_add_by_number_case_insensitive(
     assert problem_upper not in progress_data
     assert len(progress_data[problem_lower]["history"]) == 2
     assert progress_data[problem_lower]["history"][-1]["rating"] == 4
+
+
+def test_run_returns_result_without_rendering(mock_data, load_json):
+    result = add.run(SimpleNamespace(name="Result Problem", rating=5))
+    assert result == add.AddResult("added", "Result Problem", 5)
+    assert add.render_plain(result) == "Added rating 5 for 'Result Problem'"
+
+    result = add.run(SimpleNamespace(name="Result Problem", rating=5))
+    assert result.status == "mastered"
+    assert "Result Problem" in load_json(mock_data.MASTERED_FILE)
@@ -199,3 +199,37 @@ def test_handle_includes_activity_calendar_heading(mock_data, console):
     output = console.export_text()
     # Should include the Activity Calendar heading
     assert "Activity Calendar" in output
+
+
+def test_activity_rows_places_days_by_weekday():
+    """Test week columns are derived from ordinals (Sunday-first rows)"""
+    today = date(2025, 6, 4)  # Wednesday
+    counts = {"2025-06-01": 2, "2025-06-04": 1}
+    colors = {0: "grey", 1: "green", 2: "blue"}
+
+    rows = calendar.activity_rows(
+        calendar.rollup_key(counts),
+        today.toordinal(),
+        ((2025, 6),),
+        tuple(colors.items()),
+    )
+
+    assert len(rows) == 7
+    assert rows[0].plain.startswith("Sun  ■")  # June 1st 2025 was a Sunday
+    assert "⬜" in rows[3].plain  # today is on the Wednesday row
+    assert rows[4].plain.strip() == "Thu"  # nothing after today
+    styles = [str(span.style) for span in rows[0].spans]
+    assert styles == ["blue"]
+
+
+def test_activity_rows_cached_by_rollup_and_date():
+    """Test identical inputs reuse the cached rows"""
+    counts = {"2025-06-01": 2}
+    args = (
+        calendar.rollup_key(counts),
+        date(2025, 6, 4).toordinal(),
+        ((2025, 6),),
+        ((0, "grey"), (1, "green")),
+    )
+
+    assert calendar.activity_rows(*args) is calendar.activity_rows(*args)
@@ -0,0 +1,85 @@
+import subprocess
+import sys
+from srl.commands import add, due_count
+from srl import due
+from srl.utils import LazyConsole
+from types import SimpleNamespace
+from datetime import date, timedelta
+
+
+def test_due_count_zero(console):
+    due_count.handle(SimpleNamespace(), console)
+    assert console.export_text().strip() == "0"
+
+
+def test_due_count_after_backdate(console, backdate_problem):
+    add.handle(SimpleNamespace(name="Due", rating=1), console)
+    add.handle(SimpleNamespace(name="Later", rating=4), console)
+    backdate_problem("Due", 2)
+
+    console.clear()
+    due_count.handle(SimpleNamespace(), console)
+    assert console.export_text().strip() == "1"
+
+
+def test_index_written_on_progress_save(console, mock_data):
+    add.handle(SimpleNamespace(name="A", rating=2), console)
+
+    first_line = mock_data.DUE_FILE.read_text().splitlines()[0]
+    assert first_line.startswith(f"{date.today().isoformat()} 0 ")
+
+
+def test_count_rolls_over_at_midnight(console):
+    add.handle(SimpleNamespace(name="A", rating=2), console)
+    add.handle(SimpleNamespace(name="B", rating=3), console)
+
+    assert due.read_count() == 0
+    assert due.read_count(date.today() + timedelta(days=2)) == 1
+    assert due.read_count(date.today() + timedelta(days=3)) == 2
+
+
+def test_lazy_console_out_does_not_load_rich(capsys):
+    console = LazyConsole()
+    due_count.handle(SimpleNamespace(), console)
+
+    assert not console.loaded
+    assert capsys.readouterr().out == "0\n"
+
+
+def test_due_count_cli_does_not_import_rich(tmp_path):
+    code = (
+        "import sys\n"
+        "sys.argv = ['srl', 'due-count']\n"
+        "from srl.main import main\n"
+        "main()\n"
+        "print(any(m == 'rich' or m.startswith('rich.') for m in sys.modules))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={"HOME": str(tmp_path), "SRL_NO_DAEMON": "1"},
+    ).stdout.split()
+
+    assert out == ["0", "False"]
+
+
+def test_write_during_count_is_not_missed(console, backdate_problem, monkeypatch):
+    from srl import storage
+
+    add.handle(SimpleNamespace(name="A", rating=1), console)
+    backdate_problem("A", 2)
+    storage.resolve(storage.DUE_FILE).unlink()
+    load_json = storage.load_json
+
+    def add_after_reading(file_path):
+        data = load_json(file_path)
+        monkeypatch.setattr(storage, "load_json", load_json)
+        add.handle(SimpleNamespace(name="B", rating=1), console)
+        backdate_problem("B", 2)
+        return data
+
+    monkeypatch.setattr(storage, "load_json", add_after_reading)
+    due.read_count()
+    assert due.read_count() == 2
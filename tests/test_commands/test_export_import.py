@@ -1,4 +1,8 @@
+import pytest
+from srl import storage
 from srl.commands import export, import_
+from srl.staging import StagedImport, staging_dir
+from srl.storage import save_json
 from types import SimpleNamespace
 import json
 import tempfile
@@ -234,6 +238,51 @@ def test_import_merge_mode(mock_data, console, dump_json, load_json):
         assert len(progress) == 2
 
 
+def test_import_merge_combines_histories(mock_data, console, dump_json, load_json):
+    """Merging keeps attempts from both sides and re-derives mastery."""
+    dump_json(
+        mock_data.PROGRESS_FILE,
+        {
+            "Two Sum": {
+                "history": [
+                    {"rating": 3, "date": "2024-01-01"},
+                    {"rating": 5, "date": "2024-01-05", "note": "hash map"},
+                ]
+            }
+        },
+    )
+    import_data = {
+        "exported_at": "2024-01-10T10:00:00",
+        "srl_version": "1.0.0",
+        "export_type": "full",
+        "data": {
+            "problems_in_progress": {
+                "Two Sum": {
+                    "history": [
+                        {"rating": 3, "date": "2024-01-01"},
+                        {"rating": 5, "date": "2024-01-07"},
+                    ],
+                    "leetcode_id": 1,
+                }
+            },
+        },
+    }
+    import_file = mock_data.PROGRESS_FILE.with_name("import.json")
+    import_file.write_text(json.dumps(import_data))
+
+    args = SimpleNamespace(file=str(import_file), merge=True, dry_run=False, force=True)
+    import_.handle(args, console)
+
+    assert load_json(mock_data.PROGRESS_FILE) == {}
+    entry = load_json(mock_data.MASTERED_FILE)["Two Sum"]
+    assert entry["leetcode_id"] == 1
+    assert [r["date"] for r in entry["history"]] == [
+        "2024-01-01",
+        "2024-01-05",
+        "2024-01-07",
+    ]
+
+
 def test_import_dry_run(mock_data, console, load_json):
     """Test import dry run mode."""
     original_data = {"Original": {"history": []}}
@@ -393,4 +442,571 @@ def test_roundtrip_export_import(mock_data, console, dump_json, load_json):
         
         assert new_progress == progress_data
         assert new_mastered == mastered_data
-        assert new_nextup == nextup_data
\ No newline at end of file
+        assert new_nextup == nextup_data
+
+def test_streaming_import_large_file(mock_data, console, monkeypatch, tmp_path):
+    """Big sections are previewed and written without loading the file whole."""
+    progress_data = {
+        f"Problem {i}": {"history": [{"rating": 3, "date": "2024-01-01"}]}
+        for i in range(2500)
+    }
+    import_data = {
+        "exported_at": "2024-01-01T10:00:00",
+        "srl_version": "1.0.0",
+        "export_type": "full",
+        "data": {
+            "problems_in_progress": progress_data,
+            "audit": {"history": [{"date": "2024-01-01", "result": "pass"}] * 3},
+        },
+    }
+    import_file = tmp_path / "import.json"
+    import_file.write_text(json.dumps(import_data))
+
+    summary = import_.scan_import_file(import_file)
+    assert summary["data"] == {"problems_in_progress": 2500, "audit": 3}
+
+    args = SimpleNamespace(file=str(import_file), merge=False, dry_run=True, force=True)
+    import_.handle(args, console)
+    output = console.export_text()
+    assert "2500 problems in progress" in output
+    assert "Audit history (3 entries)" in output
+
+    monkeypatch.setattr(import_, "IMPORT_BATCH_SIZE", 1000)
+    args = SimpleNamespace(
+        file=[str(import_file)], merge=False, dry_run=False, force=True
+    )
+    import_.handle(args, console)
+    # Same layout save_json would have written
+    assert mock_data.PROGRESS_FILE.read_text() == json.dumps(progress_data, indent=2)
+
+
+def test_export_compact_to_stdout(mock_data, console, dump_json, capsys):
+    """`-o -` streams the export to stdout; the summary panel is skipped."""
+    progress_data = {"Two Sum": {"history": [{"rating": 4, "date": "2024-01-01"}]}}
+    dump_json(mock_data.PROGRESS_FILE, progress_data)
+
+    args = SimpleNamespace(
+        output="-",
+        include_config=False,
+        include_audit=False,
+        mastered_only=False,
+        progress_only=True,
+        compact=True,
+    )
+    result = export.run(args)
+    out = capsys.readouterr().out
+    assert "\n" not in out.rstrip("\n")
+    assert json.loads(out)["data"]["problems_in_progress"] == progress_data
+    assert result.counts == {"problems_in_progress": 1}
+    assert result.size == len(out.rstrip("\n").encode())
+
+    export.render(result, console)
+    assert console.export_text() == ""
+
+
+def test_export_size_matches_file(mock_data, console, dump_json, tmp_path):
+    dump_json(mock_data.PROGRESS_FILE, {f"P{i}": {"history": []} for i in range(2000)})
+    output_file = tmp_path / "export.json"
+    args = SimpleNamespace(
+        output=str(output_file),
+        include_config=True,
+        include_audit=True,
+        mastered_only=False,
+        progress_only=False,
+    )
+    result = export.run(args)
+
+    assert result.size == output_file.stat().st_size
+    assert result.counts["problems_in_progress"] == 2000
+    exported = json.loads(output_file.read_text())
+    assert output_file.read_text() == json.dumps(exported, indent=2, ensure_ascii=False)
+
+
+def test_delta_export_round_trip(mock_data, console, load_json, tmp_path):
+    save_json(mock_data.PROGRESS_FILE, {"A": {"history": []}, "B": {"history": []}})
+    args = SimpleNamespace(
+        output=str(tmp_path / "full.json"),
+        include_config=False,
+        include_audit=False,
+        mastered_only=False,
+        progress_only=False,
+    )
+    full = export.run(args)
+    assert full.checkpoint is not None
+
+    # Move B to mastered and add C after the full export
+    save_json(mock_data.PROGRESS_FILE, {"A": {"history": []}, "C": {"history": []}})
+    save_json(mock_data.MASTERED_FILE, {"B": {"history": [{"rating": 5, "date": "2024-01-02"}]}})
+    args.output = str(tmp_path / "delta.json")
+    args.since = full.checkpoint
+    delta = export.run(args)
+    assert delta.error is None
+    assert delta.export_type == "delta"
+    assert delta.counts == {
+        "problems_in_progress": 1,
+        "problems_mastered": 1,
+        "next_up": 0,
+    }
+    assert delta.deleted["problems_in_progress"] == 1
+    exported = json.loads((tmp_path / "delta.json").read_text())
+    assert exported["base"] == full.checkpoint
+    assert exported["deleted"]["problems_in_progress"] == ["B"]
+
+    # A fresh machine catches up from the full export plus the delta
+    save_json(mock_data.PROGRESS_FILE, {})
+    save_json(mock_data.MASTERED_FILE, {})
+    import_args = SimpleNamespace(
+        file=[str(tmp_path / "full.json"), str(tmp_path / "delta.json")],
+        merge=False,
+        dry_run=False,
+        force=True,
+        apply_delta=True,
+    )
+    import_.handle(import_args, console)
+    assert "applied" in console.export_text()
+    assert set(load_json(mock_data.PROGRESS_FILE)) == {"A", "C"}
+    assert load_json(mock_data.MASTERED_FILE) == {"B": {"history": [{"rating": 5, "date": "2024-01-02"}]}}
+
+
+def test_delta_chain_must_be_contiguous(mock_data, console, load_json, tmp_path):
+    save_json(mock_data.PROGRESS_FILE, {"A": {"history": []}})
+    args = SimpleNamespace(
+        output=str(tmp_path / "full.json"),
+        include_config=False,
+        include_audit=False,
+        mastered_only=False,
+        progress_only=False,
+    )
+    full = export.run(args)
+    save_json(
+        mock_data.PROGRESS_FILE, {"A": {"history": [{"rating": 1, "date": "2024-01-02"}]}}
+    )
+    args.output, args.since = str(tmp_path / "d1.json"), full.checkpoint
+    first = export.run(args)
+    save_json(mock_data.PROGRESS_FILE, {})
+    args.output, args.since = str(tmp_path / "d2.json"), first.checkpoint
+    export.run(args)
+
+    import_args = SimpleNamespace(
+        file=[str(tmp_path / "full.json"), str(tmp_path / "d2.json")],
+        merge=False,
+        dry_run=False,
+        force=True,
+        apply_delta=True,
+    )
+    import_.handle(import_args, console)
+    assert "Invalid delta chain" in console.export_text()
+    assert load_json(mock_data.PROGRESS_FILE) == {}
+
+    args.output, args.since = str(tmp_path / "bad.json"), "0000:12"
+    assert "another journal" in export.run(args).error
+
+
+def test_interrupted_delta_leaves_data_unchanged(
+    mock_data, console, load_json, monkeypatch, tmp_path
+):
+    save_json(mock_data.PROGRESS_FILE, {"A": {"history": []}})
+    args = SimpleNamespace(
+        output=str(tmp_path / "full.json"),
+        include_config=True,
+        include_audit=False,
+        mastered_only=False,
+        progress_only=False,
+    )
+    full = export.run(args)
+    save_json(mock_data.PROGRESS_FILE, {"B": {"history": []}})
+    save_json(mock_data.NEXT_UP_FILE, {"C": {}})
+    args.output, args.since = str(tmp_path / "delta.json"), full.checkpoint
+    export.run(args)
+    save_json(mock_data.PROGRESS_FILE, {"A": {"history": []}})
+    save_json(mock_data.NEXT_UP_FILE, {})
+
+    def interrupt(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(import_, "import_config_data", interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        import_.apply_delta(tmp_path / "delta.json")
+    assert load_json(mock_data.PROGRESS_FILE) == {"A": {"history": []}}
+    assert load_json(mock_data.NEXT_UP_FILE) == {}
+
+
+def test_failed_delta_leaves_journal_alone(mock_data, monkeypatch, tmp_path):
+    from srl import journal
+
+    save_json(mock_data.PROGRESS_FILE, {"A": {"history": []}})
+    args = SimpleNamespace(
+        output=str(tmp_path / "full.json"),
+        include_config=False,
+        include_audit=False,
+        mastered_only=False,
+        progress_only=False,
+    )
+    full = export.run(args)
+    save_json(mock_data.PROGRESS_FILE, {"B": {"history": []}})
+    monkeypatch.setattr(journal, "ROTATE_BYTES", 0)
+
+    # The output can't be written: the journal isn't compacted
+    blocker = tmp_path / "blocker"
+    blocker.write_text("")
+    args.output, args.since = str(blocker / "delta.json"), full.checkpoint
+    assert export.run(args).error is not None
+
+    # So the retry still works, and compacts once it has been written
+    args.output = str(tmp_path / "delta.json")
+    delta = export.run(args)
+    assert delta.error is None
+    assert delta.counts["problems_in_progress"] == 1
+    assert journal.checkpoint(mock_data.JOURNAL_FILE) == delta.checkpoint
+    assert delta.checkpoint.split(":")[0] != full.checkpoint.split(":")[0]
+
+
+def test_merge_import_keeps_delta_chain(mock_data, console, load_json, tmp_path):
+    save_json(mock_data.PROGRESS_FILE, {"A": {"history": []}})
+    args = SimpleNamespace(
+        output=str(tmp_path / "full.json"),
+        include_config=False,
+        include_audit=False,
+        mastered_only=False,
+        progress_only=False,
+    )
+    full = export.run(args)
+    backup = tmp_path / "backup.json"
+    write_backup(backup, {"B": {"history": [{"rating": 3, "date": "2024-01-02"}]}})
+    import_args = SimpleNamespace(
+        file=[str(backup)], merge=True, dry_run=False, force=True
+    )
+    import_.handle(import_args, console)
+
+    # A merge is journaled problem by problem, so the next delta carries it
+    args.output, args.since = str(tmp_path / "delta.json"), full.checkpoint
+    delta = export.run(args)
+    assert delta.error is None
+    assert delta.counts["problems_in_progress"] == 1
+
+
+def test_read_only_export_leaves_journal_alone(mock_data, tmp_path):
+    args = SimpleNamespace(
+        output=str(tmp_path / "full.json"),
+        include_config=False,
+        include_audit=False,
+        mastered_only=False,
+        progress_only=False,
+    )
+    with storage.read_only():
+        assert export.run(args).checkpoint is None
+    assert not mock_data.JOURNAL_FILE.exists()
+
+
+def test_import_merges_several_files(mock_data, console, dump_json, load_json, tmp_path):
+    dump_json(
+        mock_data.PROGRESS_FILE,
+        {"Two Sum": {"history": [{"rating": 3, "date": "2024-01-02"}], "leetcode_id": 1}},
+    )
+    backups = [
+        {"Two Sum": {"history": [{"rating": 2, "date": "2024-01-01"}]}},
+        {
+            "Two Sum": {
+                "history": [{"rating": 4, "date": "2024-01-03"}],
+                "leetcode_id": 2,
+            },
+            "Valid Parentheses": {"history": [{"rating": 3, "date": "2024-01-01"}]},
+        },
+    ]
+    files = []
+    for i, problems in enumerate(backups):
+        path = tmp_path / f"backup{i}.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "exported_at": "2024-01-10T10:00:00",
+                    "srl_version": "1.0.0",
+                    "data": {"problems_in_progress": problems},
+                }
+            )
+        )
+        files.append(str(path))
+
+    args = SimpleNamespace(file=files, merge=True, dry_run=False, force=True)
+    import_.handle(args, console)
+
+    progress = load_json(mock_data.PROGRESS_FILE)
+    assert [r["rating"] for r in progress["Two Sum"]["history"]] == [2, 3, 4]
+    assert progress["Two Sum"]["leetcode_id"] == 2
+    assert "Valid Parentheses" in progress
+    output = console.export_text()
+    assert "3 problems in progress merged" in output
+    assert "Two Sum: leetcode_id 1, 2 (kept 2)" in output
+
+
+def test_import_several_files_requires_merge(mock_data, console, tmp_path):
+    args = SimpleNamespace(
+        file=[str(tmp_path / "a.json"), str(tmp_path / "b.json")],
+        merge=False,
+        dry_run=False,
+        force=True,
+    )
+    import_.handle(args, console)
+    assert "--merge" in console.export_text()
+
+
+def test_export_sqlite(mock_data, console, dump_json, tmp_path):
+    import sqlite3
+
+    dump_json(
+        mock_data.PROGRESS_FILE,
+        {
+            "Two Sum": {
+                "leetcode_id": 1,
+                "history": [
+                    {"rating": 3, "date": "2024-01-01", "note": "hash map"},
+                    {"rating": 4, "date": "2024-01-05"},
+                ],
+            }
+        },
+    )
+    dump_json(
+        mock_data.MASTERED_FILE,
+        {"Valid Anagram": {"history": [{"rating": 5, "date": "2024-01-02"}] * 2}},
+    )
+    dump_json(mock_data.NEXT_UP_FILE, {"Jump Game": {"added": "2024-01-03"}})
+    dump_json(
+        mock_data.AUDIT_FILE,
+        {
+            "history": [
+                {"date": "2024-01-04", "problem": "Valid Anagram", "result": "pass"}
+            ]
+        },
+    )
+
+    db = tmp_path / "srl.db"
+    result = export.run(SimpleNamespace(output=None, sqlite=str(db)))
+    assert result.error is None
+    assert result.counts == {"problems": 3, "attempts": 4, "audits": 1, "next_up": 1}
+
+    conn = sqlite3.connect(db)
+    rows = conn.execute(
+        "SELECT p.name, p.status, count(a.id), max(a.rating) FROM problems p "
+        "LEFT JOIN attempts a ON a.problem_id = p.id GROUP BY p.id ORDER BY p.id"
+    ).fetchall()
+    assert rows == [
+        ("Two Sum", "in_progress", 2, 4),
+        ("Valid Anagram", "mastered", 2, 5),
+        ("Jump Game", "queued", 0, None),
+    ]
+    assert conn.execute(
+        "SELECT p.name FROM audits JOIN problems p ON p.id = audits.problem_id"
+    ).fetchall() == [("Valid Anagram",)]
+    indexes = {
+        row[0]
+        for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    }
+    assert "attempts_problem" in indexes
+
+    export.render(result, console)
+    assert "4 attempts" in console.export_text()
+
+
+def test_export_sqlite_merges_problem_in_both_files(mock_data, dump_json, tmp_path):
+    import sqlite3
+
+    shared = {"rating": 3, "date": "2024-01-01"}
+    dump_json(mock_data.PROGRESS_FILE, {"Two Sum": {"history": [shared]}})
+    dump_json(
+        mock_data.MASTERED_FILE,
+        {
+            "Two Sum": {
+                "history": [shared] + [{"rating": 5, "date": "2024-01-02"}] * 2
+            }
+        },
+    )
+
+    db = tmp_path / "srl.db"
+    result = export.run(SimpleNamespace(output=None, sqlite=str(db)))
+    assert result.counts["problems"] == 1
+    assert result.counts["attempts"] == 3
+    conn = sqlite3.connect(db)
+    assert conn.execute("SELECT date, rating FROM attempts ORDER BY date").fetchall() == [
+        ("2024-01-01", 3),
+        ("2024-01-02", 5),
+        ("2024-01-02", 5),
+    ]
+
+
+def write_backup(path, progress_data, **data):
+    path.write_text(
+        json.dumps(
+            {
+                "exported_at": "2024-01-01T10:00:00",
+                "srl_version": "1.0.0",
+                "export_type": "full",
+                "data": {"problems_in_progress": progress_data, **data},
+            }
+        )
+    )
+
+
+def test_interrupted_import_resumes(
+    mock_data, console, dump_json, load_json, monkeypatch, tmp_path
+):
+    """An interrupted import leaves the data alone and resumes at its checkpoint."""
+    existing = {"Old": {"history": [{"rating": 3, "date": "2024-01-01"}]}}
+    dump_json(mock_data.PROGRESS_FILE, existing)
+    progress_data = {
+        f"Problem {i}": {"history": [{"rating": 3, "date": "2024-01-01"}]}
+        for i in range(35)
+    }
+    import_file = tmp_path / "backup.json"
+    write_backup(import_file, progress_data, config={"theme": "dark"})
+    monkeypatch.setattr(import_, "IMPORT_BATCH_SIZE", 10)
+
+    checkpoint = StagedImport._checkpoint
+    checkpoints = []
+
+    def interrupt(self, f, section, count):
+        checkpoint(self, f, section, count)
+        checkpoints.append(count)
+        if count == 20:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(StagedImport, "_checkpoint", interrupt)
+    args = SimpleNamespace(
+        file=[str(import_file)], merge=False, dry_run=False, force=True
+    )
+    with pytest.raises(KeyboardInterrupt):
+        import_.handle(args, console)
+    assert load_json(mock_data.PROGRESS_FILE) == existing
+    assert load_json(mock_data.CONFIG_FILE) == {}
+
+    skipped = []
+    unstaged_members = import_.unstaged_members
+
+    def record_skip(stream, skip):
+        skipped.append(skip)
+        return unstaged_members(stream, skip)
+
+    monkeypatch.setattr(import_, "unstaged_members", record_skip)
+    import_.handle(SimpleNamespace(file=None, resume=True), console)
+
+    assert skipped == [20]
+    assert checkpoints == [10, 20, 30]
+    assert load_json(mock_data.PROGRESS_FILE) == progress_data
+    assert load_json(mock_data.CONFIG_FILE) == {"theme": "dark"}
+    assert not staging_dir().exists()
+    assert "35 problems in progress imported" in console.export_text()
+
+
+def test_staged_import_with_store_installed(mock_data, console, load_json, tmp_path):
+    from srl.store import Store
+
+    import_file = tmp_path / "backup.json"
+    write_backup(import_file, {"B": {"history": [{"rating": 3, "date": "2024-01-02"}]}})
+    store = Store(flush_interval=60)
+    storage.install_store(store)
+    try:
+        # A change the store hasn't written yet survives a merge import
+        storage.save_json(mock_data.PROGRESS_FILE, {"A": {"history": []}})
+        args = SimpleNamespace(
+            file=[str(import_file)], merge=True, dry_run=False, force=True
+        )
+        import_.handle(args, console)
+        assert set(storage.load_json(mock_data.PROGRESS_FILE)) == {"A", "B"}
+        assert set(load_json(mock_data.PROGRESS_FILE)) == {"A", "B"}
+
+        # Replacing drops the store's copy and serves the new file
+        storage.save_json(mock_data.PROGRESS_FILE, {"C": {"history": []}})
+        args.merge = False
+        import_.handle(args, console)
+        assert set(storage.load_json(mock_data.PROGRESS_FILE)) == {"B"}
+        assert store.dirty == []
+        assert not any(path.is_relative_to(staging_dir()) for path in store.data)
+    finally:
+        storage.install_store(None)
+        store.close()
+    assert set(load_json(mock_data.PROGRESS_FILE)) == {"B"}
+    assert not staging_dir().exists()
+
+
+def test_interrupted_swap_is_finished(
+    mock_data, console, load_json, monkeypatch, tmp_path
+):
+    """A swap cut short is completed before anything else touches the data."""
+    progress_data = {"Two Sum": {"history": [{"rating": 3, "date": "2024-01-01"}]}}
+    audit = {"history": [{"date": "2024-01-01", "result": "pass"}]}
+    import_file = tmp_path / "backup.json"
+    write_backup(import_file, progress_data, audit=audit)
+
+    replace_file = storage.replace_file
+    moved = []
+
+    def crash_after_first(file_path, staged, diff=False):
+        if moved:
+            raise KeyboardInterrupt
+        moved.append(file_path.name)
+        replace_file(file_path, staged, diff)
+
+    monkeypatch.setattr(storage, "replace_file", crash_after_first)
+    args = SimpleNamespace(
+        file=[str(import_file)], merge=False, dry_run=False, force=True
+    )
+    with pytest.raises(KeyboardInterrupt):
+        import_.handle(args, console)
+    monkeypatch.setattr(storage, "replace_file", replace_file)
+
+    assert StagedImport.load().swapping
+    import_.handle(SimpleNamespace(file=None, resume=True), console)
+    assert load_json(mock_data.PROGRESS_FILE) == progress_data
+    assert load_json(mock_data.AUDIT_FILE) == audit
+    assert not staging_dir().exists()
+    assert "Finished applying the interrupted import" in console.export_text()
+
+
+def test_any_command_finishes_interrupted_swap(
+    mock_data, console, load_json, monkeypatch, tmp_path
+):
+    import_file = tmp_path / "backup.json"
+    progress_data = {"Two Sum": {"history": [{"rating": 3, "date": "2024-01-01"}]}}
+    write_backup(import_file, progress_data, audit={"history": []})
+
+    replace_file = storage.replace_file
+
+    def crash_after_first(file_path, staged, diff=False):
+        replace_file(file_path, staged, diff)
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(storage, "replace_file", crash_after_first)
+    args = SimpleNamespace(
+        file=[str(import_file)], merge=False, dry_run=False, force=True
+    )
+    with pytest.raises(KeyboardInterrupt):
+        import_.handle(args, console)
+    monkeypatch.setattr(storage, "replace_file", replace_file)
+    assert StagedImport.load().swapping
+
+    # Every entry point calls ensure_data_dir before running a command
+    storage.ensure_data_dir()
+    assert load_json(mock_data.PROGRESS_FILE) == progress_data
+    assert load_json(mock_data.AUDIT_FILE) == {"history": []}
+    assert not staging_dir().exists()
+
+
+def test_resume_refuses_changed_backup(mock_data, console, monkeypatch, tmp_path):
+    import_file = tmp_path / "backup.json"
+    write_backup(import_file, {"Two Sum": {"history": []}})
+    monkeypatch.setattr(
+        StagedImport,
+        "stage_members",
+        lambda *args: (_ for _ in ()).throw(OSError("No space left on device")),
+    )
+    args = SimpleNamespace(
+        file=[str(import_file)], merge=False, dry_run=False, force=True
+    )
+    import_.handle(args, console)
+    output = console.export_text()
+    assert "No space left on device" in output
+    assert "--resume` to continue" in output
+
+    write_backup(import_file, {"Three Sum": {"history": []}})
+    import_.handle(SimpleNamespace(file=None, resume=True), console)
+    assert "changed since the import started" in console.export_text()
+    assert StagedImport.load() is not None
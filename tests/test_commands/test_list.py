@@ -210,3 +210,20 @@ def test_list_no_legend_when_no_overdue(console, monkeypatch, backdate_problem):
     assert "🟡" not in output  # No yellow indicators
     assert "🔴" not in output  # No red indicators
     assert problem in output
+
+
+def test_list_records(console, backdate_problem):
+    args = SimpleNamespace(name="Due Problem", rating=1)
+    add.handle(args=args, console=console)
+    backdate_problem("Due Problem", 3)
+
+    records = list(list_.records(SimpleNamespace(n=None)))
+    assert records == [
+        {
+            "index": 1,
+            "leetcode_id": None,
+            "name": "Due Problem",
+            "days_overdue": 2,
+            "mastery_candidate": False,
+        }
+    ]
@@ -1,6 +1,9 @@
 from srl.commands import mastered, add
 from srl.commands import list_
+from srl import output
 from types import SimpleNamespace
+import io
+import json
 
 
 def test_mastered_count(console, monkeypatch):
@@ -70,3 +73,52 @@ def test_get_mastered_problems_filters_empty_history(console, today_string, monk
     result = mastered.get_mastered_problems()
     assert len(result) == 1
     assert (problem_a, 2, today_string) in result
+
+
+def test_mastered_records_ndjson(console, today_string):
+    for name in ("Problem A", "Problem B"):
+        args = SimpleNamespace(name=name, rating=5)
+        add.handle(args, console)
+        add.handle(args, console)
+
+    out = io.StringIO()
+    output.write_records(mastered.records(SimpleNamespace(c=False)), "ndjson", out)
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["name"] for r in lines] == ["Problem A", "Problem B"]
+    assert lines[0] == {
+        "leetcode_id": None,
+        "name": "Problem A",
+        "attempts": 2,
+        "mastered_date": today_string,
+    }
+
+    out = io.StringIO()
+    output.write_records(mastered.records(SimpleNamespace(c=True)), "plain", out)
+    assert out.getvalue() == "2\n"
+
+
+def test_mastered_records_json_empty():
+    out = io.StringIO()
+    output.write_records(mastered.records(SimpleNamespace(c=False)), "json", out)
+    assert json.loads(out.getvalue()) == []
+
+
+def test_mastered_records_stream_from_file(mock_data, dump_json, monkeypatch):
+    dump_json(
+        mock_data.MASTERED_FILE,
+        {
+            "Two Sum": {"history": [{"rating": 5, "date": "2024-01-02"}] * 2},
+            "Empty": {"history": []},
+        },
+    )
+    monkeypatch.setattr(mastered, "load_json", None)  # never loaded whole
+
+    records = mastered.records(SimpleNamespace(c=False))
+    assert next(records) == {
+        "leetcode_id": None,
+        "name": "Two Sum",
+        "attempts": 2,
+        "mastered_date": "2024-01-02",
+    }
+    assert list(records) == []
+    assert list(mastered.records(SimpleNamespace(c=True))) == [{"count": 1}]
@@ -0,0 +1,88 @@
+import json
+from types import SimpleNamespace
+from srl import container
+from srl.commands import export, import_
+
+
+def export_container(mock_data, dump_json, tmp_path):
+    history = [{"rating": 3, "date": "2024-01-01"}]
+    dump_json(mock_data.PROGRESS_FILE, {f"P{i}": {"history": history} for i in range(300)})
+    dump_json(mock_data.MASTERED_FILE, {"Two Sum": {"history": []}})
+    dump_json(
+        mock_data.AUDIT_FILE, {"history": [{"date": "2024-01-01", "result": "pass"}]}
+    )
+    output = tmp_path / "backup.srlb"
+    args = SimpleNamespace(
+        output=str(output),
+        include_config=True,
+        include_audit=True,
+        mastered_only=False,
+        progress_only=False,
+    )
+    result = export.run(args)
+    assert result.error is None
+    assert result.size == output.stat().st_size
+    return output
+
+
+def import_args(output, **kwargs):
+    return SimpleNamespace(
+        file=str(output), merge=False, dry_run=False, force=True, **kwargs
+    )
+
+
+def test_container_index(mock_data, dump_json, tmp_path):
+    output = export_container(mock_data, dump_json, tmp_path)
+    with open(output, "rb") as f:
+        assert f.read(4) == container.MAGIC
+        index = container.read_index(f)
+    assert index["export_type"] == "full"
+    sections = {s["name"]: s for s in index["sections"]}
+    assert list(sections) == [
+        "problems_in_progress",
+        "problems_mastered",
+        "next_up",
+        "config",
+        "audit",
+    ]
+    assert sections["problems_in_progress"]["count"] == 300
+    assert sections["audit"]["count"] == 1
+
+    # Each section is a standalone JSON value at its offset
+    raw = output.read_bytes()
+    meta = sections["problems_mastered"]
+    section = raw[meta["offset"] : meta["offset"] + meta["length"]]
+    assert json.loads(section) == {"Two Sum": {"history": []}}
+
+
+def test_container_round_trip(mock_data, console, dump_json, load_json, tmp_path):
+    output = export_container(mock_data, dump_json, tmp_path)
+    expected = load_json(mock_data.PROGRESS_FILE)
+    summary = import_.scan_import_file(output)
+    assert summary["data"]["problems_in_progress"] == 300
+
+    dump_json(mock_data.PROGRESS_FILE, {})
+    import_.handle(import_args(output), console)
+    assert load_json(mock_data.PROGRESS_FILE) == expected
+    assert load_json(mock_data.MASTERED_FILE) == {"Two Sum": {"history": []}}
+
+
+def test_corrupted_section_detected(mock_data, console, dump_json, load_json, tmp_path):
+    output = export_container(mock_data, dump_json, tmp_path)
+    with open(output, "rb") as f:
+        index = container.read_index(f)
+    meta = next(s for s in index["sections"] if s["name"] == "problems_in_progress")
+    raw = bytearray(output.read_bytes())
+    raw[meta["offset"] + 10] ^= 0x01
+    output.write_bytes(bytes(raw))
+    dump_json(mock_data.AUDIT_FILE, {})
+    dump_json(mock_data.PROGRESS_FILE, {})
+
+    import_.handle(import_args(output), console)
+    assert "Corrupted sections: problems_in_progress" in console.export_text()
+    assert load_json(mock_data.AUDIT_FILE) == {}
+
+    # The intact sections can still be restored on their own
+    import_.handle(import_args(output, only=["audit"]), console)
+    assert len(load_json(mock_data.AUDIT_FILE)["history"]) == 1
+    assert load_json(mock_data.PROGRESS_FILE) == {}
@@ -0,0 +1,93 @@
+import socket
+import threading
+from srl import client, daemon
+
+
+def start_daemon(tmp_path, monkeypatch):
+    monkeypatch.setattr("srl.storage.DATA_DIR", tmp_path)
+    monkeypatch.chdir(tmp_path)  # the daemon runs commands in the client's cwd
+    thread = threading.Thread(target=daemon.serve, daemon=True)
+    thread.start()
+    for _ in range(200):
+        if daemon.is_running():
+            break
+        thread.join(0.01)
+    return thread
+
+
+def stop_daemon(thread):
+    list(client.request({"op": "stop"}, timeout=5))
+    thread.join(5)
+
+
+def run(argv, tmp_path):
+    frames = list(
+        client.request({"op": "run", "argv": argv, "cwd": str(tmp_path)}, timeout=5)
+    )
+    out = "".join(f.get("out", "") for f in frames)
+    err = "".join(f.get("err", "") for f in frames)
+    return out, err, frames[-1]["exit"]
+
+
+def test_forward_skipped_when_disabled(monkeypatch):
+    monkeypatch.setenv("SRL_NO_DAEMON", "1")
+    assert client.forward(["list"]) is None
+
+
+def test_forward_falls_back_without_daemon(tmp_path, monkeypatch):
+    monkeypatch.delenv("SRL_NO_DAEMON", raising=False)
+    monkeypatch.setattr("srl.storage.DATA_DIR", tmp_path)
+    assert client.forward(["list"]) is None
+
+
+def test_forward_skips_interactive_commands(monkeypatch):
+    monkeypatch.delenv("SRL_NO_DAEMON", raising=False)
+    assert client.forward(["import", "-f", "backup.json"]) is None
+
+
+def test_daemon_runs_commands(tmp_path, monkeypatch, mock_data, load_json):
+    thread = start_daemon(tmp_path, monkeypatch)
+    try:
+        out, _, code = run(["add", "Daemon Problem", "3"], tmp_path)
+        assert code == 0
+        assert "Added rating 3" in out
+        assert "Daemon Problem" in load_json(mock_data.PROGRESS_FILE)
+
+        out, err, code = run(["add", "Bad Rating", "7"], tmp_path)
+        assert code == 2
+        assert "invalid choice" in err
+    finally:
+        stop_daemon(thread)
+
+    assert not daemon.is_running()
+    assert not (tmp_path / "daemon.sock").exists()
+
+
+def test_daemon_survives_handler_exit(tmp_path, monkeypatch, mock_data):
+    from srl.commands import add
+
+    def exits(args, console):
+        raise SystemExit("add: giving up")
+
+    monkeypatch.setattr(add, "handle", exits)
+    thread = start_daemon(tmp_path, monkeypatch)
+    try:
+        _, err, code = run(["add", "Two Sum", "3"], tmp_path)
+        assert code == 1
+        assert "giving up" in err
+        assert daemon.is_running()
+    finally:
+        stop_daemon(thread)
+
+
+def test_idle_client_is_dropped(tmp_path, monkeypatch, mock_data):
+    monkeypatch.setattr(daemon, "CLIENT_TIMEOUT", 0.2)
+    thread = start_daemon(tmp_path, monkeypatch)
+    idle = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        idle.connect(str(client.socket_path()))  # and never sends a request
+        out, _, code = run(["mastered"], tmp_path)
+        assert code == 0
+    finally:
+        idle.close()
+        stop_daemon(thread)
@@ -0,0 +1,94 @@
+import gzip
+import json
+import sys
+import pytest
+from types import SimpleNamespace
+from srl import formats
+from srl.commands import export, import_
+
+
+def export_args(output, **kwargs):
+    return SimpleNamespace(
+        output=str(output),
+        include_config=False,
+        include_audit=True,
+        mastered_only=False,
+        progress_only=False,
+        **kwargs,
+    )
+
+
+def test_format_from_flag_or_extension():
+    assert formats.format_for("backup.json") == "json"
+    assert formats.format_for("backup.JSON.GZ") == "json.gz"
+    assert formats.format_for("backup.zst") == "json.zst"
+    assert formats.format_for("backup.mpk") == "msgpack"
+    assert formats.format_for("backup.json", "msgpack") == "msgpack"
+    with pytest.raises(formats.FormatError):
+        formats.format_for("backup.json", "xml")
+
+
+def test_gzip_export_is_sniffed_on_import(
+    mock_data, console, dump_json, load_json, tmp_path
+):
+    progress = {
+        f"P{i}": {"history": [{"rating": 3, "date": "2024-01-01"}]} for i in range(500)
+    }
+    dump_json(mock_data.PROGRESS_FILE, progress)
+    audit = {"history": [{"date": "2024-01-01", "result": "pass"}]}
+    dump_json(mock_data.AUDIT_FILE, audit)
+
+    # Misleading name: the format comes from the flag, the import sniffs it
+    output = tmp_path / "backup.bin"
+    result = export.run(export_args(output, file_format="json.gz"))
+    assert result.error is None
+    assert result.format == "json.gz"
+    assert result.size == output.stat().st_size
+    exported = json.loads(gzip.decompress(output.read_bytes()))
+    assert exported["data"]["problems_in_progress"] == progress
+
+    assert import_.scan_import_file(output)["data"]["problems_in_progress"] == 500
+    dump_json(mock_data.PROGRESS_FILE, {})
+    args = SimpleNamespace(file=str(output), merge=False, dry_run=False, force=True)
+    import_.handle(args, console)
+    assert load_json(mock_data.PROGRESS_FILE) == progress
+
+
+def test_object_stream_matches_json_stream():
+    doc = {"a": [1, {"b": None}], "c": {"d": "x", "e": True}}
+    stream = formats.ObjectStream(doc)
+    seen = []
+    for key in stream.members():
+        seen.append((key, stream.peek()))
+        if key == "a":
+            for _ in stream.items():
+                seen.append(stream.value())
+        else:
+            for inner in stream.members():
+                seen.append((inner, stream.value()))
+    assert seen == [("a", "["), 1, {"b": None}, ("c", "{"), ("d", "x"), ("e", True)]
+    assert stream.peek() is None
+
+
+def test_msgpack_round_trip(mock_data, console, dump_json, load_json, tmp_path):
+    msgpack = pytest.importorskip("msgpack")
+    progress = {"Two Sum": {"history": [{"rating": 5, "date": "2024-01-01"}]}}
+    dump_json(mock_data.PROGRESS_FILE, progress)
+
+    output = tmp_path / "backup.msgpack"
+    result = export.run(export_args(output))
+    assert result.error is None
+    exported = msgpack.unpackb(output.read_bytes())
+    assert exported["data"]["problems_in_progress"] == progress
+
+    dump_json(mock_data.PROGRESS_FILE, {})
+    args = SimpleNamespace(file=str(output), merge=False, dry_run=False, force=True)
+    import_.handle(args, console)
+    assert load_json(mock_data.PROGRESS_FILE) == progress
+
+
+def test_missing_optional_package(mock_data, tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "zstandard", None)
+    result = export.run(export_args(tmp_path / "backup.json.zst"))
+    assert "pip install 'srl[formats]'" in result.error
+    assert not (tmp_path / "backup.json.zst").exists()
@@ -0,0 +1,67 @@
+import pytest
+from srl import journal
+from srl.storage import replace_file, save_json, save_json_members
+
+
+def test_changes_since_checkpoint(mock_data):
+    save_json(mock_data.PROGRESS_FILE, {"A": {"history": []}})
+    # Nothing is recorded until a journal is started
+    assert not mock_data.JOURNAL_FILE.exists()
+
+    start = journal.start(mock_data.JOURNAL_FILE)
+    save_json(mock_data.PROGRESS_FILE, {"A": {"history": []}, "B": {"history": []}})
+    save_json(mock_data.PROGRESS_FILE, {"B": {"history": [], "x": 1}})
+    middle = journal.checkpoint(mock_data.JOURNAL_FILE)
+    save_json(mock_data.NEXT_UP_FILE, {"C": {}})
+
+    changes, end = journal.changes_since(mock_data.JOURNAL_FILE, start)
+    assert changes == {
+        mock_data.PROGRESS_FILE.name: {"A": None, "B": {"history": [], "x": 1}},
+        mock_data.NEXT_UP_FILE.name: {"C": {}},
+    }
+    changes, _ = journal.changes_since(mock_data.JOURNAL_FILE, middle)
+    assert changes == {mock_data.NEXT_UP_FILE.name: {"C": {}}}
+    assert journal.changes_since(mock_data.JOURNAL_FILE, end) == ({}, end)
+
+
+def test_checkpoint_invalidated(mock_data, monkeypatch):
+    start = journal.start(mock_data.JOURNAL_FILE)
+    save_json_members(mock_data.PROGRESS_FILE, iter([("A", {})]))
+    with pytest.raises(journal.JournalError, match="replaced"):
+        journal.changes_since(mock_data.JOURNAL_FILE, start)
+
+    # A full export past the size limit starts over with a new journal
+    monkeypatch.setattr(journal, "ROTATE_BYTES", 0)
+    rotated = journal.start(mock_data.JOURNAL_FILE)
+    assert rotated.split(":")[0] != start.split(":")[0]
+    with pytest.raises(journal.JournalError, match="another journal"):
+        journal.changes_since(mock_data.JOURNAL_FILE, start)
+
+
+def test_compact_keeps_changes_after_checkpoint(mock_data, monkeypatch):
+    start = journal.start(mock_data.JOURNAL_FILE)
+    save_json(mock_data.PROGRESS_FILE, {"A": {"history": []}})
+    _, middle = journal.changes_since(mock_data.JOURNAL_FILE, start)
+    save_json(mock_data.PROGRESS_FILE, {"A": {"history": []}, "B": {}})
+
+    # Below the limit a delta's checkpoint stands
+    assert journal.plan_compaction(mock_data.JOURNAL_FILE, middle) is None
+    monkeypatch.setattr(journal, "ROTATE_BYTES", 0)
+    compacted = journal.plan_compaction(mock_data.JOURNAL_FILE, middle)
+    # Nothing changes until the compaction is carried out
+    assert journal.checkpoint(mock_data.JOURNAL_FILE).startswith(middle.split(":")[0])
+    journal.compact(mock_data.JOURNAL_FILE, middle, compacted)
+    assert compacted.split(":")[0] != middle.split(":")[0]
+    changes, _ = journal.changes_since(mock_data.JOURNAL_FILE, compacted)
+    assert changes == {mock_data.PROGRESS_FILE.name: {"B": {}}}
+
+
+def test_replace_file_can_journal_a_diff(mock_data, tmp_path):
+    save_json(mock_data.PROGRESS_FILE, {"A": {"history": []}})
+    start = journal.start(mock_data.JOURNAL_FILE)
+    staged = tmp_path / "staged.json"
+    staged.write_text('{"A": {"history": []}, "B": {"history": []}}')
+    replace_file(mock_data.PROGRESS_FILE, staged, diff=True)
+
+    changes, _ = journal.changes_since(mock_data.JOURNAL_FILE, start)
+    assert changes == {mock_data.PROGRESS_FILE.name: {"B": {"history": []}}}
@@ -0,0 +1,52 @@
+import io
+import json
+import pytest
+
+from srl.jsonstream import JSONStream
+
+DOC = {
+    "exported_at": "2024-01-01T10:00:00",
+    "data": {
+        "problems_in_progress": {
+            f"Problem {i}": {"history": [{"rating": i % 5 + 1, "note": "é \"q\" " * i}]}
+            for i in range(50)
+        },
+        "audit": {"history": [{"result": "pass"}, {"result": "fail"}]},
+    },
+    "count": 1234567,
+    "ok": True,
+}
+
+
+def read_all(stream: JSONStream) -> dict:
+    out = {}
+    for key in stream.members():
+        if stream.peek() == "{" and key == "data":
+            out[key] = {section: stream.value() for section in stream.members()}
+        else:
+            out[key] = stream.value()
+    return out
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_stream_matches_json_load(chunk_size):
+    text = json.dumps(DOC, indent=2)
+    stream = JSONStream(io.StringIO(text), chunk_size)
+    assert read_all(stream) == DOC
+    assert stream.peek() is None
+
+
+def test_items_steps_through_arrays():
+    stream = JSONStream(io.StringIO('{"history": [1, {"a": 2}, []], "empty": []}'), 3)
+    seen = {}
+    for key in stream.members():
+        seen[key] = [stream.value() for _ in stream.items()]
+    assert seen == {"history": [1, {"a": 2}, []], "empty": []}
+
+
+@pytest.mark.parametrize(
+    "text", ["invalid json", '{"a": 1,}', '{"a" 1}', '{"a": tru}', '{"a": "abc']
+)
+def test_malformed_input_raises_decode_error(text):
+    with pytest.raises(json.JSONDecodeError):
+        read_all(JSONStream(io.StringIO(text), 2))
@@ -55,3 +55,27 @@ def test_main_calls_ensure_data_dir(monkeypatch):
     main.main()
 
     assert called["called"] is True
+
+
+def test_main_import_shows_progress(monkeypatch, tmp_path, mock_data, capsys):
+    """The CLI console is a LazyConsole; Rich's progress bar must be able to use it."""
+    import json
+
+    backup = tmp_path / "backup.json"
+    progress = {"Two Sum": {"history": [{"rating": 3, "date": "2024-01-01"}]}}
+    backup.write_text(
+        json.dumps(
+            {
+                "exported_at": "2024-01-01T10:00:00",
+                "srl_version": "1.0.0",
+                "data": {"problems_in_progress": progress},
+            }
+        )
+    )
+    monkeypatch.setattr(main, "forward", lambda argv: None)
+    monkeypatch.setattr(sys, "argv", ["srl", "import", "-f", str(backup), "--force"])
+
+    main.main()
+
+    assert "Import completed successfully" in capsys.readouterr().out
+    assert json.loads(mock_data.PROGRESS_FILE.read_text()) == progress
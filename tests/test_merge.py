@@ -0,0 +1,49 @@
+from srl import merge
+
+
+def test_merge_histories_dedups_same_attempt():
+    local = [
+        {"rating": 2, "date": "2024-01-01", "note": "brute force"},
+        {"rating": 4, "date": "2024-01-03"},
+    ]
+    incoming = [
+        {"rating": 2, "date": "2024-01-01", "note": "brute force"},
+        {"rating": 2, "date": "2024-01-01", "note": "sorting"},
+        {"rating": 3, "date": "2024-01-02"},
+    ]
+    merged = merge.merge_histories(local, incoming)
+    assert [(r["date"], r["rating"], r.get("note")) for r in merged] == [
+        ("2024-01-01", 2, "brute force"),
+        ("2024-01-01", 2, "sorting"),
+        ("2024-01-02", 3, None),
+        ("2024-01-03", 4, None),
+    ]
+
+
+def test_merge_histories_keeps_repeats_within_a_copy():
+    # Two genuine 5s on one day: the problem is mastered in that copy
+    local = [
+        {"rating": 3, "date": "2024-01-01"},
+        {"rating": 5, "date": "2024-01-02"},
+        {"rating": 5, "date": "2024-01-02"},
+    ]
+    incoming = [{"rating": 3, "date": "2024-01-01"}, {"rating": 5, "date": "2024-01-02"}]
+    merged = merge.merge_histories(local, incoming)
+    assert [r["rating"] for r in merged] == [3, 5, 5]
+    assert merge.is_mastered(merged)
+    assert merge.merge_histories(local, local) == local
+
+
+def test_merge_histories_sorts_hand_edited():
+    history = [{"rating": 3, "date": "2024-02-01"}, {"rating": 1, "date": "2024-01-01"}]
+    merged = merge.merge_histories(history, [])
+    assert [r["date"] for r in merged] == ["2024-01-01", "2024-02-01"]
+
+
+def test_merge_into_moves_between_progress_and_mastered():
+    progress = {}
+    mastered = {"A": {"history": [{"rating": 5, "date": "1"}, {"rating": 5, "date": "2"}]}}
+    # A failed attempt after the local mastery sends it back to progress
+    merge.merge_into(progress, mastered, "A", {"history": [{"rating": 1, "date": "3"}]})
+    assert list(progress) == ["A"] and mastered == {}
+    assert len(progress["A"]["history"]) == 3
@@ -0,0 +1,66 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from srl import metrics, server as server_mod
+from srl.server import create_app
+
+
+@pytest.fixture
+def registry():
+    metrics.disable()
+    yield metrics.enable()
+    metrics.disable()
+
+
+def test_disabled_hooks_record_nothing():
+    metrics.disable()
+    assert metrics.instrument("list", lambda x: x + 1, 1) == 2
+    metrics.inc("srl_commands_total", ())
+    assert "srl_commands_total" not in metrics.render()
+
+
+def test_instrument_counts_and_times_commands(registry):
+    metrics.instrument("add", lambda: None)
+    with pytest.raises(ValueError):
+        metrics.instrument("add", int, "x")
+
+    text = metrics.render()
+    assert "# TYPE srl_command_duration_seconds histogram" in text
+    assert 'srl_commands_total{command="add",outcome="ok"} 1' in text
+    assert 'srl_commands_total{command="add",outcome="error"} 1' in text
+    assert 'srl_command_duration_seconds_bucket{command="add",le="+Inf"} 2' in text
+    assert 'srl_command_duration_seconds_count{command="add"} 2' in text
+
+
+def test_metrics_endpoint(registry):
+    server_mod.parser = None
+    client = TestClient(create_app())
+    client.post("/attempts", json={"name": "Two Sum", "rating": 3})
+    client.post("/run", json={"argv": ["inprogress"]})
+    client.get("/due")
+    client.get("/due")
+
+    resp = client.get("/metrics")
+    assert resp.headers["content-type"].startswith("text/plain")
+    text = resp.text
+    assert 'srl_commands_total{command="inprogress",outcome="ok"} 1' in text
+    assert 'srl_http_requests_total{method="GET",route="/due",status="200"} 2' in text
+    assert "srl_response_cache_hits_total 1" in text
+    assert 'srl_storage_io_total{file="problems_in_progress.json",op="write"}' in text
+    assert 'srl_data_file_bytes{file="problems_in_progress.json"}' in text
+
+
+def test_metrics_endpoint_disabled():
+    client = TestClient(create_app(collect_metrics=False))
+    assert client.get("/metrics").status_code == 404
+
+
+def test_data_file_samples_follow_user_root(mock_data, tmp_path):
+    from srl import storage
+
+    root = tmp_path / "alice"
+    root.mkdir()
+    (root / mock_data.PROGRESS_FILE.name).write_text('{"A": {}}' + " " * 100)
+    with storage.user_root(root):
+        sizes = {labels[0][1]: size for _, labels, size in metrics.data_file_samples()}
+    assert sizes == {mock_data.PROGRESS_FILE.name: 109}
@@ -1,7 +1,7 @@
 from types import SimpleNamespace
 from fastapi.testclient import TestClient
 
-from srl import server as server_mod
+from srl import server as server_mod, storage
 from srl.server import create_app
 
 
@@ -54,3 +54,143 @@ def test_run_handler_exception_returns_500():
     body = resp.json()
     assert "error" in body
     assert "Error executing handler" in body["error"]
+
+
+def test_stats_endpoint_returns_summary():
+    server_mod.parser = None
+    client = TestClient(create_app())
+    client.post("/run", json={"cmd": 'add "Stats Problem" 3'})
+    resp = client.get("/stats")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["total"] == 1
+    assert body["current_streak"] == 1
+
+
+def test_run_with_format_returns_records():
+    server_mod.parser = None
+    client = TestClient(create_app())
+    client.post("/run", json={"cmd": 'add "Record Problem" 5'})
+    client.post("/run", json={"cmd": 'add "Record Problem" 5'})
+
+    resp = client.post("/run", json={"argv": ["mastered", "--format", "json"]})
+    assert resp.status_code == 200
+    records = resp.json()["records"]
+    assert [r["name"] for r in records] == ["Record Problem"]
+
+    resp = client.post("/run", json={"argv": ["daemon", "status", "--format", "json"]})
+    assert resp.status_code == 400
+
+
+def test_run_returns_structured_result():
+    server_mod.parser = None
+    client = TestClient(create_app())
+    client.post("/run", json={"cmd": 'nextup add "Queued Problem"'})
+
+    resp = client.post("/run", json={"argv": ["nextup", "list"]})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["result"]["type"] == "NextUpResult"
+    assert body["result"]["problems"] == [
+        {"name": "Queued Problem", "leetcode_id": None}
+    ]
+    assert "Queued Problem" in body["output"]
+
+
+def test_batch_runs_in_one_session(monkeypatch, mock_data, load_json):
+    server_mod.parser = None
+    writes = []
+    real_write = storage._write_json
+    monkeypatch.setattr(
+        storage, "_write_json", lambda path, data: (writes.append(path), real_write(path, data))
+    )
+    client = TestClient(create_app())
+
+    commands = [{"cmd": f'add "Batch {i}" 3 --time 20'} for i in range(20)]
+    resp = client.post("/batch", json={"commands": commands})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["committed"] is True
+    assert [r["status"] for r in body["results"]] == [200] * 20
+    assert "Added rating 3 for 'Batch 19'" in body["results"][-1]["output"]
+
+    assert len(load_json(mock_data.PROGRESS_FILE)) == 20
+    assert writes.count(mock_data.PROGRESS_FILE) == 1
+
+
+def test_batch_atomic_discards_everything_on_failure(mock_data, load_json):
+    server_mod.parser = None
+    client = TestClient(create_app())
+
+    commands = [{"cmd": 'add "Kept?" 3'}, {"cmd": 'add "Bad" 9'}, {"cmd": 'add "Later" 3'}]
+    resp = client.post("/batch", json={"commands": commands, "atomic": True})
+    assert resp.status_code == 409
+    body = resp.json()
+    assert body["committed"] is False
+    assert [r["status"] for r in body["results"]] == [200, 400, 424]
+    assert load_json(mock_data.PROGRESS_FILE) == {}
+
+
+def test_batch_rolls_back_only_the_failing_command(monkeypatch, mock_data, load_json):
+    from srl.commands import remove
+
+    def broken_run(args):
+        data = storage.load_json(mock_data.PROGRESS_FILE)
+        data.clear()
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(remove, "run", broken_run)
+    server_mod.parser = None
+    client = TestClient(create_app())
+
+    commands = [{"cmd": 'add "Survivor" 3'}, {"cmd": 'remove "Survivor"'}, {"cmd": 'add "After" 2'}]
+    resp = client.post("/batch", json={"commands": commands})
+    assert [r["status"] for r in resp.json()["results"]] == [200, 500, 200]
+    assert set(load_json(mock_data.PROGRESS_FILE)) == {"Survivor", "After"}
+    server_mod.parser = None
+
+
+def test_batch_savepoint_copies_only_touched_entries(mock_data, dump_json, load_json):
+    progress = {
+        f"Problem {i}": {"history": [{"rating": 3, "date": "2024-01-01"}]}
+        for i in range(1000)
+    }
+    dump_json(mock_data.PROGRESS_FILE, progress)
+
+    with storage.session() as session:
+        session.savepoint()
+        data = storage.load_json(mock_data.PROGRESS_FILE)
+        data["Problem 7"]["history"].append({"rating": 5, "date": "2024-01-02"})
+        data["New"] = {"history": []}
+        del data["Problem 8"]
+        storage.save_json(mock_data.PROGRESS_FILE, data)
+        # Only what the command reached was copied, not the whole file
+        assert set(data.undo) == {"Problem 7", "New", "Problem 8"}
+
+        session.rollback()
+        data = storage.load_json(mock_data.PROGRESS_FILE)
+        data["Problem 1"]["history"].append({"rating": 4, "date": "2024-01-03"})
+        storage.save_json(mock_data.PROGRESS_FILE, data)
+
+    progress["Problem 1"]["history"].append({"rating": 4, "date": "2024-01-03"})
+    assert load_json(mock_data.PROGRESS_FILE) == progress
+
+
+def test_export_runs_under_the_write_lock(parser, tmp_path):
+    import asyncio
+
+    calls = []
+
+    class RecordingPool:
+        async def run(self, fn, *args, write=False):
+            calls.append(write)
+            return 200, {}
+
+    app = SimpleNamespace(
+        state=SimpleNamespace(pool=RecordingPool(), single_flight=None)
+    )
+    args = parser.parse_args(["export", "-o", str(tmp_path / "backup.json")])
+    asyncio.run(server_mod.dispatch_command(app, args))
+
+    # It writes the output file and the journal: never concurrent or coalesced
+    assert calls == [True]
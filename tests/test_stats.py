@@ -0,0 +1,113 @@
+from srl import stats
+from srl.commands import add, audit
+from types import SimpleNamespace
+from datetime import date, timedelta
+
+
+def test_rebuild_from_history(mock_data, dump_json):
+    dump_json(
+        mock_data.PROGRESS_FILE,
+        {
+            "A": {
+                "history": [
+                    {"rating": 3, "date": "2024-06-01"},
+                    {"rating": 3, "date": "2024-06-02"},
+                ]
+            }
+        },
+    )
+    dump_json(
+        mock_data.MASTERED_FILE,
+        {"B": {"history": [{"rating": 5, "date": "2024-06-02"}]}},
+    )
+    dump_json(
+        mock_data.AUDIT_FILE,
+        {
+            "history": [
+                {"date": "2024-06-04", "problem": "B", "result": "pass"},
+                {"date": "2024-06-05", "problem": "B", "result": "fail"},
+            ]
+        },
+    )
+
+    result = stats.load()
+
+    assert result["days"] == {"2024-06-01": 1, "2024-06-02": 2, "2024-06-04": 1}
+    assert result["total"] == 4
+    assert result["active_days"] == 3
+    assert result["best_streak"] == 2
+    assert result["months"]["2024-06"]["max"] == [2, "2024-06-02"]
+    assert result["weeks"]["2024-W22"] == 3
+
+
+def test_add_updates_stats_incrementally(mock_data, console, load_json, monkeypatch):
+    add.handle(SimpleNamespace(name="A", rating=3), console)
+    add.handle(SimpleNamespace(name="B", rating=2), console)
+
+    def fail_rebuild():
+        raise AssertionError("stats should not be rebuilt")
+
+    monkeypatch.setattr(stats, "rebuild", fail_rebuild)
+    add.handle(SimpleNamespace(name="C", rating=2), console)
+
+    result = stats.load()
+    today = date.today()
+    assert result["days"] == {today.isoformat(): 3}
+    assert stats.current_streak(result, today) == 1
+    assert stats.summary(result, today)["this_month"] == 3
+
+
+def test_external_change_triggers_rebuild(mock_data, console, dump_json):
+    add.handle(SimpleNamespace(name="A", rating=3), console)
+    assert stats.load()["total"] == 1
+
+    dump_json(mock_data.PROGRESS_FILE, {})
+
+    assert stats.load()["total"] == 0
+
+
+def test_write_during_rebuild_is_not_missed(mock_data, dump_json, monkeypatch):
+    attempt = {"rating": 3, "date": "2024-06-01"}
+    dump_json(mock_data.PROGRESS_FILE, {"A": {"history": [attempt]}})
+    collect = stats.collect_day_counts
+
+    def write_after_reading():
+        counts = collect()
+        dump_json(mock_data.PROGRESS_FILE, {"A": {"history": [attempt] * 2}})
+        return counts
+
+    monkeypatch.setattr(stats, "collect_day_counts", write_after_reading)
+    assert stats.load()["total"] == 1
+    monkeypatch.setattr(stats, "collect_day_counts", collect)
+    assert stats.load()["total"] == 2
+
+
+def test_audit_pass_counts_as_activity(mock_data, console, dump_json):
+    add.handle(SimpleNamespace(name="A", rating=5), console)
+    add.handle(SimpleNamespace(name="A", rating=5), console)
+    audit.random_audit()
+    audit.audit_pass("A")
+
+    assert stats.load()["total"] == 3
+
+
+def test_current_streak_survives_until_end_of_next_day():
+    today = date(2024, 6, 10)
+    result = stats.empty()
+    for offset in (3, 2, 1):
+        stats._apply(result, (today - timedelta(days=offset)).isoformat())
+
+    assert stats.current_streak(result, today) == 3
+    assert stats.current_streak(result, today + timedelta(days=1)) == 0
+
+
+def test_period_summary_clips_streak_to_range():
+    result = stats.empty()
+    for day in ("2024-05-30", "2024-05-31", "2024-06-01", "2024-06-02"):
+        stats._apply(result, day)
+
+    period = stats.period_summary(result, [(2024, 6)], date(2024, 6, 15))
+
+    assert period["total"] == 2
+    assert period["best_streak"] == 2
+    assert stats.rolling_average(result, date(2024, 6, 2), 7) == 4 / 7
@@ -0,0 +1,85 @@
+import json
+import time
+from fastapi.testclient import TestClient
+
+from srl import server as server_mod, storage
+from srl.server import create_app
+from srl.store import Store
+
+
+def test_saves_are_coalesced_into_one_write(mock_data, load_json):
+    store = Store(flush_interval=60)
+    storage.install_store(store)
+    try:
+        for i in range(5):
+            data = storage.load_json(mock_data.NEXT_UP_FILE)
+            data[f"Problem {i}"] = {}
+            storage.save_json(mock_data.NEXT_UP_FILE, data)
+
+        assert load_json(mock_data.NEXT_UP_FILE) == {}
+        assert len(storage.load_json(mock_data.NEXT_UP_FILE)) == 5
+        assert store.dirty == [mock_data.NEXT_UP_FILE]
+    finally:
+        storage.install_store(None)
+        store.close()
+
+    assert store.writes == 1
+    assert len(load_json(mock_data.NEXT_UP_FILE)) == 5
+
+
+def test_background_writer_flushes_after_interval(mock_data, load_json):
+    store = Store(flush_interval=0.05)
+    store.save(mock_data.NEXT_UP_FILE, {"Two Sum": {}})
+    deadline = time.monotonic() + 5
+    while store.dirty and time.monotonic() < deadline:
+        time.sleep(0.01)
+    store.close()
+
+    assert load_json(mock_data.NEXT_UP_FILE) == {"Two Sum": {}}
+    assert store.writes == 1
+
+
+def test_sync_mode_writes_through(mock_data, load_json):
+    store = Store(flush_interval=0)
+    store.save(mock_data.NEXT_UP_FILE, {"Two Sum": {}})
+
+    assert load_json(mock_data.NEXT_UP_FILE) == {"Two Sum": {}}
+    assert not store.dirty
+    store.close()
+
+
+def test_reads_are_served_from_memory(mock_data, dump_json):
+    store = Store(flush_interval=60)
+    store.preload([mock_data.NEXT_UP_FILE])
+    storage.install_store(store)
+    try:
+        dump_json(mock_data.NEXT_UP_FILE, {"Edited on disk": {}})
+        assert storage.load_json(mock_data.NEXT_UP_FILE) == {}
+
+        # Writers get a private copy, read_only() callers the shared object
+        copy = storage.load_json(mock_data.NEXT_UP_FILE)
+        copy["Scratch"] = {}
+        with storage.read_only():
+            shared = storage.load_json(mock_data.NEXT_UP_FILE)
+        assert shared == {}
+        assert shared is store.data[mock_data.NEXT_UP_FILE]
+    finally:
+        storage.install_store(None)
+        store.close()
+
+
+def test_in_memory_server_flushes_on_shutdown(mock_data, load_json):
+    server_mod.parser = None
+    app = create_app(in_memory=True, flush_interval=60)
+
+    with TestClient(app) as client:
+        for name in ("Two Sum", "Valid Anagram"):
+            resp = client.post("/attempts", json={"name": name, "rating": 3})
+            assert resp.status_code == 201
+        assert set(load_json(mock_data.PROGRESS_FILE)) == set()
+        due = client.post("/run", json={"argv": ["inprogress"]})
+        assert "Two Sum" in due.json()["output"]
+
+    assert storage._store is None
+    assert set(load_json(mock_data.PROGRESS_FILE)) == {"Two Sum", "Valid Anagram"}
+    assert json.loads(mock_data.STATS_FILE.read_text())["total"] == 2
@@ -0,0 +1,102 @@
+import csv
+import pytest
+from types import SimpleNamespace
+from srl import tables
+from srl.commands import export
+
+PROGRESS = {
+    "Two Sum": {
+        "leetcode_id": 1,
+        "history": [
+            {"rating": 3, "date": "2024-01-01", "note": "hash map"},
+            {"rating": 4, "date": "2024-01-05", "time_spent": 12},
+        ],
+    },
+}
+MASTERED = {
+    "Valid Parentheses": {
+        "history": [
+            {"rating": 5, "date": "2024-01-02", "mistake": "empty stack"},
+            {"rating": 5, "date": "2024-01-09"},
+        ],
+    },
+}
+
+
+@pytest.fixture
+def attempts(mock_data, dump_json):
+    dump_json(mock_data.PROGRESS_FILE, PROGRESS)
+    dump_json(mock_data.MASTERED_FILE, MASTERED)
+
+
+def table_args(output, **kwargs):
+    return SimpleNamespace(
+        output=str(output),
+        include_config=False,
+        include_audit=False,
+        mastered_only=False,
+        progress_only=False,
+        table="attempts",
+        **kwargs,
+    )
+
+
+def test_attempts_csv(attempts, tmp_path, monkeypatch):
+    monkeypatch.setattr(tables, "TABLE_CHUNK_ROWS", 1)
+    output = tmp_path / "attempts.csv"
+    result = export.run(table_args(output))
+    assert result.error is None
+    assert result.format == "csv"
+    assert result.counts == {"attempts": 4}
+    assert result.size == output.stat().st_size
+
+    with open(output, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["problem"] for row in rows] == [
+        "Two Sum",
+        "Two Sum",
+        "Valid Parentheses",
+        "Valid Parentheses",
+    ]
+    assert rows[0] == {
+        "problem": "Two Sum",
+        "leetcode_id": "1",
+        "status": "in_progress",
+        "date": "2024-01-01",
+        "rating": "3",
+        "time_spent": "",
+        "has_note": "True",
+        "has_mistake": "False",
+    }
+    assert rows[2]["status"] == "mastered" and rows[2]["has_mistake"] == "True"
+
+
+def test_attempts_parquet(attempts, tmp_path, monkeypatch):
+    pq = pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setattr(tables, "TABLE_CHUNK_ROWS", 3)
+    output = tmp_path / "attempts.parquet"
+    assert export.run(table_args(output)).error is None
+
+    parquet = pq.ParquetFile(output)
+    assert parquet.num_row_groups == 2
+    table = parquet.read()
+    assert table.column_names == list(tables.ATTEMPT_COLUMNS)
+    assert table.column("time_spent").to_pylist() == [None, 12, None, None]
+    assert str(table.schema.field("date").type) == "date32[day]"
+
+
+def test_attempts_npy(attempts, tmp_path):
+    np = pytest.importorskip("numpy")
+    output = tmp_path / "attempts.npy"
+    assert export.run(table_args(output)).error is None
+
+    array = np.load(output)
+    assert array.shape == (4,)
+    assert list(array["rating"]) == [3, 4, 5, 5]
+    assert list(array["leetcode_id"]) == [1, 1, -1, -1]
+    assert array["date"][1] == np.datetime64("2024-01-05")
+
+
+def test_table_rejects_document_format(attempts, tmp_path):
+    result = export.run(table_args(tmp_path / "a.json", file_format="json"))
+    assert "csv, parquet or npy" in result.error
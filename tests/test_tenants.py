@@ -0,0 +1,100 @@
+import json
+from fastapi.testclient import TestClient
+
+from srl import server as server_mod, storage
+from srl.server import create_app
+from srl.store import StoreCache
+
+
+def test_users_get_separate_data_roots(tmp_path, mock_data, load_json):
+    server_mod.parser = None
+    users = tmp_path / "users"
+    client = TestClient(create_app(users_dir=users))
+
+    resp = client.post(
+        "/attempts",
+        json={"name": "Two Sum", "rating": 3},
+        headers={"X-SRL-User": "alice"},
+    )
+    assert resp.status_code == 201
+    client.post("/u/bob/run", json={"argv": ["add", "Valid Anagram", "3"]})
+
+    alice = json.loads((users / "alice" / "problems_in_progress.json").read_text())
+    bob = json.loads((users / "bob" / "problems_in_progress.json").read_text())
+    assert list(alice) == ["Two Sum"]
+    assert list(bob) == ["Valid Anagram"]
+    assert load_json(mock_data.PROGRESS_FILE) == {}
+
+    problem = client.get("/u/alice/problems/two sum")
+    assert problem.status_code == 200
+    assert client.get("/u/bob/problems/two sum").status_code == 404
+    assert client.get("/problems/two sum").status_code == 404
+
+
+def test_invalid_user_is_rejected(tmp_path):
+    client = TestClient(create_app(users_dir=tmp_path / "users"))
+    assert client.get("/due", headers={"X-SRL-User": "../etc"}).status_code == 400
+    assert client.get("/u/.hidden/due").status_code == 400
+
+
+def test_store_cache_evicts_idle_stores(tmp_path):
+    cache = StoreCache(max_stores=1, flush_interval=60)
+    alice, bob = tmp_path / "alice", tmp_path / "bob"
+
+    store = cache.acquire(alice)
+    with storage.user_root(alice, store):
+        storage.save_json(storage.NEXT_UP_FILE, {"Two Sum": {}})
+    assert not (alice / "next_up.json").exists()
+
+    # alice is still pinned, so opening bob can't evict her
+    cache.acquire(bob)
+    assert list(cache.stores) == [alice, bob]
+
+    cache.release(alice)
+    assert list(cache.stores) == [bob]
+    assert cache.evictions == 1
+    assert json.loads((alice / "next_up.json").read_text()) == {"Two Sum": {}}
+
+    cache.release(bob)
+    cache.close()
+
+
+def test_in_memory_users_are_flushed_on_shutdown(tmp_path):
+    server_mod.parser = None
+    users = tmp_path / "users"
+    app = create_app(in_memory=True, flush_interval=60, users_dir=users)
+
+    with TestClient(app) as client:
+        client.post("/u/alice/nextup", json={"name": "Two Sum"})
+        queue = client.get("/u/alice/nextup").json()["problems"]
+        assert [p["name"] for p in queue] == ["Two Sum"]
+        assert app.state.user_stores.nbytes > 0
+
+    assert "Two Sum" in json.loads((users / "alice" / "next_up.json").read_text())
+
+
+def test_user_paths_are_confined_to_their_root(tmp_path, mock_data):
+    server_mod.parser = None
+    users = tmp_path / "users"
+    client = TestClient(create_app(users_dir=users))
+    client.post("/u/bob/run", json={"argv": ["add", "Valid Anagram", "3"]})
+    bob_progress = users / "bob" / "problems_in_progress.json"
+    before = bob_progress.read_text()
+
+    for argv in (
+        ["export", "-o", str(bob_progress)],
+        ["export", "-o", "../bob/problems_in_progress.json"],
+        ["export", "--sqlite", str(tmp_path / "outside.db")],
+        ["import", "-f", str(bob_progress), "--force"],
+        ["nextup", "add", "-f", "/etc/passwd"],
+    ):
+        resp = client.post("/u/alice/run", json={"argv": argv})
+        assert resp.status_code == 400, argv
+        assert "outside your data directory" in resp.json()["error"]
+    assert bob_progress.read_text() == before
+    assert not (tmp_path / "outside.db").exists()
+
+    # Relative paths land in the user's own directory
+    resp = client.post("/u/alice/run", json={"argv": ["export", "-o", "backup.json"]})
+    assert resp.status_code == 200
+    assert (users / "alice" / "backup.json").exists()
@@ -0,0 +1,120 @@
+import asyncio
+import threading
+import time
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from srl import server as server_mod
+from srl.commands import show
+from srl.server import create_app
+from srl.workers import Saturated, SingleFlight, WorkerPool
+
+
+def max_overlap(write: bool) -> int:
+    pool = WorkerPool(workers=4, max_queue=0)
+    active = []
+    seen = []
+
+    def job():
+        active.append(1)
+        seen.append(len(active))
+        time.sleep(0.05)
+        active.pop()
+
+    async def main():
+        await asyncio.gather(*(pool.run(job, write=write) for _ in range(4)))
+
+    asyncio.run(main())
+    pool.shutdown()
+    return max(seen)
+
+
+def test_writers_are_serialized():
+    assert max_overlap(write=True) == 1
+
+
+def test_readers_run_concurrently():
+    assert max_overlap(write=False) > 1
+
+
+def test_pool_rejects_when_queue_is_full():
+    pool = WorkerPool(workers=1, max_queue=1)
+    gate = threading.Event()
+
+    async def main():
+        running = [asyncio.ensure_future(pool.run(gate.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(Saturated):
+            await pool.run(gate.wait)
+        gate.set()
+        await asyncio.gather(*running)
+
+    asyncio.run(main())
+    pool.shutdown()
+
+
+def test_saturated_server_returns_503():
+    server_mod.parser = None
+    app = create_app(workers=1, max_queue=0)
+    app.state.pool.pending = 1
+    client = TestClient(app)
+
+    resp = client.post("/run", json={"argv": ["inprogress"]})
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
+    assert client.get("/due").status_code == 503
+
+
+def test_single_flight_shares_one_computation():
+    flight = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"due": 3}
+
+    async def main():
+        runs = [flight.run(("list",), compute) for _ in range(5)]
+        return await asyncio.gather(*runs)
+
+    results = asyncio.run(main())
+    assert results == [{"due": 3}] * 5
+    assert len(calls) == 1
+    assert (flight.computations, flight.coalesced) == (1, 4)
+    assert not flight.in_flight
+
+
+def test_server_coalesces_identical_reads(monkeypatch):
+    server_mod.parser = None
+    calls = []
+
+    def slow_run(args):
+        calls.append(args.name)
+        time.sleep(0.1)
+        return original_run(args)
+
+    original_run = show.run
+    monkeypatch.setattr(show, "run", slow_run)
+    app = create_app()
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://srl"
+        ) as client:
+            bodies = [
+                {"argv": ["show", "Two Sum"]},
+                {"cmd": "show 'Two Sum'"},
+                {"argv": ["show", "Two Sum"]},
+            ]
+            replies = await asyncio.gather(
+                *(client.post("/run", json=body) for body in bodies)
+            )
+            return replies, (await client.get("/server/stats")).json()
+
+    replies, server_stats = asyncio.run(main())
+    assert len({r.text for r in replies}) == 1
+    assert calls == ["Two Sum"]
+    assert server_stats["single_flight"]["coalesced"] == 2